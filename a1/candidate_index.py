@@ -0,0 +1,203 @@
+"""
+Bitset index for narrowing Wordle candidates.
+
+Word i of the indexed list is bit i of a Python int. The index stores, for each
+letter, one bitset per position (words with that letter there) and one bitset
+per count (words with at least that many copies). Applying a round of feedback
+to a candidate bitset is then a handful of ANDs rather than a rescan of every
+word, and the narrowed bitset carries forward to the next guess.
+"""
+
+from __future__ import annotations
+from string import ascii_lowercase
+from time import perf_counter
+from typing import Sequence
+
+from a1_support import load_words, VOCAB_FILE, ANSWERS_FILE
+from feedback import (
+    decode,
+    parse,
+    score_all,
+    encode_words,
+    WORD_LENGTH,
+    CORRECT_DIGIT,
+    INCORRECT_DIGIT,
+)
+
+
+class WordIndex:
+    """ Positional and letter-count bitsets over a fixed list of words. """
+    def __init__(self, words: Sequence[str]) -> None:
+        """ Builds the bitsets for words.
+
+        Parameters:
+            words (Sequence<str>): Words of WORD_LENGTH lowercase letters.
+        """
+        self._words = words
+        self._all = (1 << len(words)) - 1
+        # letter -> position -> words with letter at that position
+        self._positions = {letter: [0] * WORD_LENGTH for letter in ascii_lowercase}
+        # letter -> k -> words with at least k copies of letter
+        self._counts = {letter: [self._all] + [0] * WORD_LENGTH
+                        for letter in ascii_lowercase}
+
+        for word_id, word in enumerate(words):
+            bit = 1 << word_id
+            for position, letter in enumerate(word):
+                self._positions[letter][position] |= bit
+                self._counts[letter][word.count(letter, 0, position) + 1] |= bit
+
+    def get_words(self) -> Sequence[str]:
+        """ Returns the indexed words. """
+        return self._words
+
+    def all_words(self) -> int:
+        """ Returns the bitset containing every indexed word. """
+        return self._all
+
+    def with_letter_at(self, letter: str, position: int) -> int:
+        """ Returns the bitset of words with letter at the given position. """
+        return self._positions[letter][position]
+
+    def with_at_least(self, letter: str, count: int) -> int:
+        """ Returns the bitset of words with at least count copies of letter.
+        """
+        if count > WORD_LENGTH:
+            return 0
+        return self._counts[letter][count]
+
+    def narrow(self, candidates: int, guess: str, pattern: int) -> int:
+        """ Removes the words that would not have given pattern for guess.
+
+        Parameters:
+            candidates (int): Bitset of the words still possible.
+            guess (str): The word that was guessed.
+            pattern (int): The feedback code received for guess.
+
+        Returns:
+            int: The bitset of remaining candidates.
+        """
+        shown = {}
+        blacked = set()
+        for position, (letter, digit) in enumerate(zip(guess, decode(pattern))):
+            at_position = self._positions[letter][position]
+            if digit == CORRECT_DIGIT:
+                candidates &= at_position
+            else:
+                candidates &= ~at_position
+            if digit == INCORRECT_DIGIT:
+                blacked.add(letter)
+            else:
+                shown[letter] = shown.get(letter, 0) + 1
+
+        # Coloured copies give a lower bound on the count of each letter, and a
+        # black copy means that bound is exact
+        for letter in set(guess):
+            count = shown.get(letter, 0)
+            if count:
+                candidates &= self.with_at_least(letter, count)
+            if letter in blacked:
+                candidates &= ~self.with_at_least(letter, count + 1)
+        return candidates
+
+    def ids(self, candidates: int) -> list[int]:
+        """ Returns the ids of the words in the bitset, in ascending order. """
+        bits = bin(candidates)[:1:-1]
+        return [word_id for word_id, bit in enumerate(bits) if bit == '1']
+
+    def words(self, candidates: int) -> list[str]:
+        """ Returns the words in the bitset, in index order. """
+        return [self._words[word_id] for word_id in self.ids(candidates)]
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __repr__(self) -> str:
+        return f"WordIndex({len(self._words)} words)"
+
+
+class Candidates:
+    """ The words still consistent with every guess made so far in a round. """
+    def __init__(self, index: WordIndex) -> None:
+        """ Starts a round in which every indexed word is possible.
+
+        Parameters:
+            index (WordIndex): The index over the possible words.
+        """
+        self._index = index
+        self._bits = index.all_words()
+
+    def apply(self, guess: str, pattern: int) -> None:
+        """ Narrows the candidates with the feedback for one guess.
+
+        Parameters:
+            guess (str): The word that was guessed.
+            pattern (int): The feedback code received for guess.
+        """
+        self._bits = self._index.narrow(self._bits, guess, pattern)
+
+    def apply_history(self, history: tuple[tuple[str, str], ...]) -> None:
+        """ Narrows the candidates with every (guess, processed guess) pair.
+        """
+        for guess, processed in history:
+            self.apply(guess, parse(processed))
+
+    def get_bits(self) -> int:
+        """ Returns the bitset of remaining candidates. """
+        return self._bits
+
+    def words(self) -> list[str]:
+        """ Returns the remaining candidate words. """
+        return self._index.words(self._bits)
+
+    def __len__(self) -> int:
+        return bin(self._bits).count('1')
+
+    def __repr__(self) -> str:
+        return f"Candidates({len(self)} of {len(self._index)})"
+
+
+def benchmark(num_rounds: int = 200) -> None:
+    """ Compares narrowing the vocabulary by rescanning it with narrowing the
+        bitset index, over the first two guesses of several rounds.
+
+    Parameters:
+        num_rounds (int): The number of answers to play against.
+    """
+    vocab = load_words(VOCAB_FILE)
+    answers = load_words(ANSWERS_FILE)[:num_rounds]
+    guesses = ('larned', 'python')
+
+    start = perf_counter()
+    index = WordIndex(vocab)
+    print(f'index built in {perf_counter() - start:.3f}s')
+
+    start = perf_counter()
+    rescanned = []
+    for answer in answers:
+        words = list(vocab)
+        for guess in guesses:
+            pattern = score_all(guess, encode_words([answer]))[0]
+            words = [word for word, word_pattern
+                     in zip(words, score_all(guess, encode_words(words)))
+                     if word_pattern == pattern]
+        rescanned.append(words)
+    rescan_time = perf_counter() - start
+
+    start = perf_counter()
+    narrowed = []
+    for answer in answers:
+        candidates = Candidates(index)
+        for guess in guesses:
+            candidates.apply(guess, score_all(guess, encode_words([answer]))[0])
+        narrowed.append(candidates.words())
+    index_time = perf_counter() - start
+
+    assert rescanned == narrowed
+    print(f'rescan: {1000 * rescan_time / len(answers):8.3f}ms per round')
+    print(f'index:  {1000 * index_time / len(answers):8.3f}ms per round '
+          f'({rescan_time / index_time:.0f}x)')
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,282 @@
+"""
+Integer-coded Wordle feedback for offline scoring.
+
+A feedback pattern is stored as a base-3 integer with one digit per letter of
+the guess. Digit i (weight 3 ** i) is 0 for INCORRECT, 1 for MISPLACED and 2 for
+CORRECT, so every pattern for a six letter word fits in range(3 ** 6). The emoji
+strings shown to the user are produced from these codes by render().
+
+Letters in the correct position are green. The remaining occurrences of each
+letter are yellow, from left to right, while the answer still has unmatched
+copies of that letter, and black after that.
+
+This deliberately departs from the assignment's process_guess rule, under
+which each distinct letter of the guess receives at most one non-black square.
+That rule can never score an answer with a repeated letter as all green (the
+guess 'afloat' against the answer 'afloat' would get one black 'a'), so the
+game could not be won on such answers. For answers with six unique letters
+both rules give the same feedback.
+"""
+
+from __future__ import annotations
+from string import ascii_lowercase
+from time import perf_counter
+from typing import Sequence
+
+from a1_support import (
+    load_words,
+    VOCAB_FILE,
+    ANSWERS_FILE,
+    CORRECT,
+    MISPLACED,
+    INCORRECT,
+)
+
+WORD_LENGTH = 6
+ALPHABET_SIZE = len(ascii_lowercase)
+
+INCORRECT_DIGIT = 0
+MISPLACED_DIGIT = 1
+CORRECT_DIGIT = 2
+SQUARES = (INCORRECT, MISPLACED, CORRECT)
+
+NUM_PATTERNS = 3 ** WORD_LENGTH
+ALL_CORRECT = NUM_PATTERNS - 1
+
+# Letter counts are stored above the (position, letter) bits of a lookup key
+COUNT_SHIFT = WORD_LENGTH * ALPHABET_SIZE
+
+EncodedWord = tuple[int, int]
+
+
+def encode_word(word: str) -> EncodedWord:
+    """ Encodes a word as a pair of bitsets used for fast scoring.
+
+    Parameters:
+        word (str): A lowercase word of WORD_LENGTH letters.
+
+    Returns:
+        tuple<int, int>: (positions, counts), where bit
+                         (i * ALPHABET_SIZE + letter) of positions is set for
+                         the letter at index i, and bit
+                         (k * ALPHABET_SIZE + letter) of counts is set when the
+                         word has more than k copies of letter.
+    """
+    positions = counts = 0
+    for index, char in enumerate(word):
+        letter = ord(char) - ord('a')
+        positions |= 1 << (index * ALPHABET_SIZE + letter)
+        copies = word.count(char, 0, index)
+        counts |= 1 << (copies * ALPHABET_SIZE + letter)
+    return positions, counts
+
+
+def encode_words(words: Sequence[str]) -> list[EncodedWord]:
+    """ Encodes every word in words with encode_word.
+
+    Parameters:
+        words (Sequence<str>): The words to encode, e.g. from load_words.
+
+    Returns:
+        list<tuple<int, int>>: The encoded words, in the same order as words.
+    """
+    return [encode_word(word) for word in words]
+
+
+class _PatternTable(dict):
+    """ Maps lookup keys for a single guess to feedback codes, computing each
+        code the first time its key is seen.
+    """
+    def __init__(self, guess: str) -> None:
+        """ Sets up an empty table for guess.
+
+        Parameters:
+            guess (str): The guess whose feedback codes are stored.
+        """
+        super().__init__()
+        self._letters = []
+        for index, char in enumerate(guess):
+            letter = ord(char) - ord('a')
+            self._letters.append((
+                char,
+                1 << (index * ALPHABET_SIZE + letter),
+                1 << (COUNT_SHIFT + letter),
+            ))
+
+    def __missing__(self, key: int) -> int:
+        """ Computes the feedback code for key from the bits shared by the guess
+            and the answer, as built by score_all.
+        """
+        digits = [INCORRECT_DIGIT] * len(self._letters)
+        unmatched = {}
+        for index, (char, position_bit, count_bit) in enumerate(self._letters):
+            if char not in unmatched:
+                # Copies of the letter shared by the guess and the answer
+                unmatched[char] = 0
+                while key & count_bit:
+                    unmatched[char] += 1
+                    count_bit <<= ALPHABET_SIZE
+            if key & position_bit:
+                digits[index] = CORRECT_DIGIT
+                unmatched[char] -= 1
+
+        for index, (char, _, _) in enumerate(self._letters):
+            if digits[index] != CORRECT_DIGIT and unmatched[char] > 0:
+                digits[index] = MISPLACED_DIGIT
+                unmatched[char] -= 1
+
+        pattern = self[key] = encode_digits(digits)
+        return pattern
+
+
+def score_all(guess: str, answers: Sequence[EncodedWord]) -> list[int]:
+    """ Scores a single guess against every encoded answer.
+
+    Each answer costs two bitwise ANDs and a table lookup; the table only holds
+    the few distinct (green positions, shared letter counts) combinations for
+    guess.
+
+    Parameters:
+        guess (str): The guessed word.
+        answers (Sequence<tuple<int, int>>): Answers encoded by encode_words.
+
+    Returns:
+        list<int>: The feedback code for guess against each answer, in order.
+    """
+    guess_positions, guess_counts = encode_word(guess)
+    table = _PatternTable(guess)
+    return [
+        table[(positions & guess_positions)
+              | ((counts & guess_counts) << COUNT_SHIFT)]
+        for positions, counts in answers
+    ]
+
+
+def score(guess: str, answer: str) -> int:
+    """ Returns the feedback code for guess against answer.
+
+    Parameters:
+        guess (str): The guessed word.
+        answer (str): The answer for the round.
+    """
+    return score_all(guess, [encode_word(answer)])[0]
+
+
+def encode_digits(digits: Sequence[int]) -> int:
+    """ Packs per-letter feedback digits into a single base-3 code.
+
+    Parameters:
+        digits (Sequence<int>): The digit for each letter of the guess.
+
+    Returns:
+        int: The feedback code.
+    """
+    pattern = 0
+    for digit in reversed(digits):
+        pattern = pattern * 3 + digit
+    return pattern
+
+
+def decode(pattern: int, length: int = WORD_LENGTH) -> tuple[int, ...]:
+    """ Unpacks a feedback code into its per-letter digits.
+
+    Parameters:
+        pattern (int): The feedback code.
+        length (int): The number of letters in the guess.
+
+    Returns:
+        tuple<int>: The digit for each letter of the guess.
+    """
+    digits = []
+    for _ in range(length):
+        pattern, digit = divmod(pattern, 3)
+        digits.append(digit)
+    return tuple(digits)
+
+
+def render(pattern: int, length: int = WORD_LENGTH) -> str:
+    """ Renders a feedback code as the coloured squares shown to the user.
+
+    Parameters:
+        pattern (int): The feedback code.
+        length (int): The number of letters in the guess.
+
+    Returns:
+        str: One of CORRECT, MISPLACED or INCORRECT for each letter.
+    """
+    return ''.join(SQUARES[digit] for digit in decode(pattern, length))
+
+
+def parse(processed: str) -> int:
+    """ Converts a string of coloured squares back into a feedback code.
+
+    Parameters:
+        processed (str): Feedback as produced by render.
+
+    Returns:
+        int: The feedback code.
+    """
+    return encode_digits([SQUARES.index(square) for square in processed])
+
+
+def naive_feedback(guess: str, answer: str) -> str:
+    """ Scores guess against answer one character at a time.
+
+    This is the straightforward string implementation that score_all replaces;
+    it is kept as a reference for benchmarking and checking results.
+
+    Parameters:
+        guess (str): The guessed word.
+        answer (str): The answer for the round.
+
+    Returns:
+        str: The coloured squares for each letter of guess.
+    """
+    result = ''
+    for index, char in enumerate(guess):
+        if char == answer[index]:
+            result += CORRECT
+            continue
+
+        # Copies of char in the answer not used by greens or earlier yellows
+        unmatched = answer.count(char) - sum(
+            1 for i in range(len(guess)) if guess[i] == answer[i] == char
+        ) - sum(
+            1 for i in range(index)
+            if guess[i] == char and answer[i] != char
+        )
+        result += MISPLACED if unmatched > 0 else INCORRECT
+    return result
+
+
+def benchmark(num_guesses: int = 500) -> None:
+    """ Prints the pairs scored per second by naive_feedback and score_all.
+
+    Parameters:
+        num_guesses (int): The number of vocabulary words to score against
+                           every answer.
+    """
+    guesses = load_words(VOCAB_FILE)[:num_guesses]
+    answers = load_words(ANSWERS_FILE)
+    num_pairs = len(guesses) * len(answers)
+
+    start = perf_counter()
+    naive = [naive_feedback(guess, answer)
+             for guess in guesses for answer in answers]
+    naive_time = perf_counter() - start
+
+    start = perf_counter()
+    encoded = encode_words(answers)
+    batched = [pattern for guess in guesses
+               for pattern in score_all(guess, encoded)]
+    batched_time = perf_counter() - start
+
+    assert naive == [render(pattern) for pattern in batched]
+    print(f'{num_pairs} guess/answer pairs')
+    print(f'naive:   {num_pairs / naive_time:12,.0f} pairs/s')
+    print(f'batched: {num_pairs / batched_time:12,.0f} pairs/s '
+          f'({naive_time / batched_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    benchmark()
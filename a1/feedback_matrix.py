@@ -0,0 +1,231 @@
+"""
+On-disk cache of the feedback for every (guess, answer) pair.
+
+The matrix holds one row per vocabulary word and one column per answer. It is
+written next to the word lists the first time it is needed and memory-mapped on
+later runs, so every pattern lookup is a single array read. The header records
+a hash of both word lists, and a cache built from different lists is rebuilt.
+"""
+
+from __future__ import annotations
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from time import perf_counter
+from typing import Optional
+
+from a1_support import load_words, VOCAB_FILE, ANSWERS_FILE
+from feedback import encode_words, score_all, NUM_PATTERNS
+
+MATRIX_FILE = "feedback_matrix.bin"
+MAGIC = b"WFBM"
+# Bumped whenever the scoring rules or file layout change
+VERSION = 2
+# magic, version, SHA-256 of the word lists, #guesses, #answers
+HEADER = struct.Struct("<4sH32sII")
+
+# Feedback codes range over 3 ** 6 = 729 values, too many for a single byte
+PATTERN_TYPECODE = "H"
+assert NUM_PATTERNS <= 2 ** (8 * array(PATTERN_TYPECODE).itemsize)
+
+
+def cache_key(*filenames: str) -> bytes:
+    """ Returns a digest of the contents of the given files.
+
+    Parameters:
+        filenames (str): The files the cached matrix was built from.
+
+    Returns:
+        bytes: A SHA-256 digest that changes whenever any file changes.
+    """
+    digest = hashlib.sha256(sys.byteorder.encode())
+    for filename in filenames:
+        with open(filename, 'rb') as file:
+            digest.update(hashlib.sha256(file.read()).digest())
+    return digest.digest()
+
+
+class FeedbackMatrix:
+    """ A read-only guess x answer matrix of feedback codes. """
+    def __init__(
+        self,
+        guesses: tuple[str, ...],
+        answers: tuple[str, ...],
+        patterns: memoryview,
+        source: Optional[mmap.mmap] = None,
+    ) -> None:
+        """ Wraps a flat buffer of feedback codes.
+
+        Parameters:
+            guesses (tuple<str>): The words indexing the rows.
+            answers (tuple<str>): The words indexing the columns.
+            patterns (memoryview): len(guesses) * len(answers) codes in row
+                                   major order.
+            source (mmap): The mapping backing patterns, if any.
+        """
+        self._guesses = guesses
+        self._answers = answers
+        self._patterns = patterns
+        self._source = source
+        self._guess_ids = {word: i for i, word in enumerate(guesses)}
+        self._answer_ids = {word: i for i, word in enumerate(answers)}
+
+    def get_guesses(self) -> tuple[str, ...]:
+        """ Returns the words indexing the rows of the matrix. """
+        return self._guesses
+
+    def get_answers(self) -> tuple[str, ...]:
+        """ Returns the words indexing the columns of the matrix. """
+        return self._answers
+
+    def guess_id(self, guess: str) -> int:
+        """ Returns the row index of guess. Raises KeyError if it is not in the
+            vocabulary.
+        """
+        return self._guess_ids[guess]
+
+    def answer_id(self, answer: str) -> int:
+        """ Returns the column index of answer. Raises KeyError if it is not an
+            answer.
+        """
+        return self._answer_ids[answer]
+
+    def get(self, guess_id: int, answer_id: int) -> int:
+        """ Returns the feedback code for the given row and column.
+
+        Parameters:
+            guess_id (int): Row index of the guess.
+            answer_id (int): Column index of the answer.
+        """
+        return self._patterns[guess_id * len(self._answers) + answer_id]
+
+    def row(self, guess_id: int) -> memoryview:
+        """ Returns the feedback codes of one guess against every answer.
+
+        Parameters:
+            guess_id (int): Row index of the guess.
+        """
+        start = guess_id * len(self._answers)
+        return self._patterns[start:start + len(self._answers)]
+
+    def pattern(self, guess: str, answer: str) -> int:
+        """ Returns the feedback code for guess against answer.
+
+        Parameters:
+            guess (str): A word from the vocabulary.
+            answer (str): A word from the answers.
+        """
+        return self.get(self._guess_ids[guess], self._answer_ids[answer])
+
+    def close(self) -> None:
+        """ Releases the memory mapping backing this matrix. """
+        self._patterns.release()
+        if self._source is not None:
+            self._source.close()
+
+    def __repr__(self) -> str:
+        return f"FeedbackMatrix({len(self._guesses)}x{len(self._answers)})"
+
+
+def build_matrix(
+    guesses: tuple[str, ...],
+    answers: tuple[str, ...],
+    filename: str,
+    key: bytes,
+) -> None:
+    """ Computes the feedback for every pair and writes it to filename.
+
+    The file is written one row at a time under a temporary name and moved into
+    place once complete, so readers never see a partial matrix.
+
+    Parameters:
+        guesses (tuple<str>): The words indexing the rows.
+        answers (tuple<str>): The words indexing the columns.
+        filename (str): Where to write the matrix.
+        key (bytes): The cache key of the word lists.
+    """
+    encoded = encode_words(answers)
+    temp_name = f"{filename}.{os.getpid()}.tmp"
+    with open(temp_name, 'wb') as file:
+        file.write(HEADER.pack(
+            MAGIC, VERSION, key, len(guesses), len(answers)
+        ))
+        for guess in guesses:
+            array(PATTERN_TYPECODE, score_all(guess, encoded)).tofile(file)
+    os.replace(temp_name, filename)
+
+
+def _read_matrix(
+    filename: str,
+    key: bytes,
+    guesses: tuple[str, ...],
+    answers: tuple[str, ...],
+) -> Optional[FeedbackMatrix]:
+    """ Memory-maps a cached matrix, if one exists for the given key.
+
+    Returns:
+        FeedbackMatrix: The cached matrix, or None if the file is missing, out
+                        of date or truncated.
+    """
+    try:
+        file = open(filename, 'rb')
+    except FileNotFoundError:
+        return None
+    with file:
+        header = file.read(HEADER.size)
+        expected = HEADER.pack(
+            MAGIC, VERSION, key, len(guesses), len(answers)
+        )
+        size = HEADER.size + (len(guesses) * len(answers)
+                              * array(PATTERN_TYPECODE).itemsize)
+        if header != expected or os.fstat(file.fileno()).st_size != size:
+            return None
+        source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    patterns = memoryview(source)[HEADER.size:].cast(PATTERN_TYPECODE)
+    return FeedbackMatrix(guesses, answers, patterns, source)
+
+
+def load_matrix(
+    vocab_file: str = VOCAB_FILE,
+    answers_file: str = ANSWERS_FILE,
+) -> FeedbackMatrix:
+    """ Loads the feedback matrix for the given word lists, building and caching
+        it next to vocab_file first if no up-to-date cache exists.
+
+    Parameters:
+        vocab_file (str): The file of valid guesses.
+        answers_file (str): The file of possible answers.
+
+    Returns:
+        FeedbackMatrix: The memory-mapped matrix.
+    """
+    guesses = load_words(vocab_file)
+    answers = load_words(answers_file)
+    key = cache_key(vocab_file, answers_file)
+    filename = os.path.join(os.path.dirname(vocab_file), MATRIX_FILE)
+
+    matrix = _read_matrix(filename, key, guesses, answers)
+    if matrix is None:
+        build_matrix(guesses, answers, filename, key)
+        matrix = _read_matrix(filename, key, guesses, answers)
+    return matrix
+
+
+def main() -> None:
+    """ Builds the cache if needed and reports how long loading takes. """
+    start = perf_counter()
+    matrix = load_matrix()
+    print(f'{matrix} ready in {perf_counter() - start:.3f}s')
+    matrix.close()
+
+    start = perf_counter()
+    matrix = load_matrix()
+    print(f'reloaded in {perf_counter() - start:.3f}s')
+    matrix.close()
+
+
+if __name__ == '__main__':
+    main()
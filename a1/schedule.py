@@ -0,0 +1,163 @@
+"""
+Deterministic answer scheduling.
+
+Rather than calling random.choice for every round, the answers are shuffled
+once with a private, seeded random generator and the resulting order is stored
+next to the answers file. Game n then plays answer n of the stored order, so
+selection is a constant-time lookup that does not touch the global random
+state and is safe to share between threads.
+"""
+
+from __future__ import annotations
+import hashlib
+import os
+import struct
+from array import array
+from datetime import date
+from random import Random
+from typing import Sequence
+
+from a1_support import load_words, ANSWERS_FILE
+from feedback_matrix import cache_key
+
+# The seed hinted at by the commented-out call in a1_support
+SEED = 1001.2022
+
+SCHEDULE_FILE = "answer_schedule.bin"
+MAGIC = b"WSCH"
+VERSION = 1
+# magic, version, SHA-256 of the answers and seed, #answers
+HEADER = struct.Struct("<4sH32sI")
+ORDER_TYPECODE = "I"
+
+# The date of game 0 for date-based lookups
+EPOCH = date(2022, 1, 1)
+
+# Maps (answers file, seed) to schedules already loaded by this process
+_schedules = {}
+
+
+class AnswerSchedule:
+    """ A fixed order in which answers are played. """
+    def __init__(self, answers: Sequence[str], order: array) -> None:
+        """ Sets up a schedule over answers.
+
+        Parameters:
+            answers (Sequence<str>): The possible answers.
+            order (array<int>): A permutation of range(len(answers)).
+        """
+        self._answers = answers
+        self._order = order
+
+    def get_answer(self, game_num: int) -> str:
+        """ Returns the answer for the given game. After every answer has been
+            played once the schedule repeats from the start.
+
+        Parameters:
+            game_num (int): The number of the game, starting from 0.
+        """
+        return self._answers[self._order[game_num % len(self._order)]]
+
+    def get_daily_answer(self, day: date) -> str:
+        """ Returns the answer for the game played on day, with the game on
+            EPOCH being game 0.
+        """
+        return self.get_answer((day - EPOCH).days)
+
+    def __getitem__(self, game_num: int) -> str:
+        return self.get_answer(game_num)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __repr__(self) -> str:
+        return f"AnswerSchedule({len(self)} answers)"
+
+
+def build_order(num_answers: int, schedule_seed: float = SEED) -> array:
+    """ Returns a seeded permutation of range(num_answers).
+
+    Parameters:
+        num_answers (int): The number of answers to order.
+        schedule_seed (float): Seed for the private random generator.
+    """
+    order = array(ORDER_TYPECODE, range(num_answers))
+    Random(schedule_seed).shuffle(order)
+    return order
+
+
+def load_schedule(
+    answers_file: str = ANSWERS_FILE,
+    schedule_seed: float = SEED,
+) -> AnswerSchedule:
+    """ Loads the answer schedule for answers_file, shuffling and storing it
+        next to the file the first time, or whenever the answers or seed
+        change.
+
+    Parameters:
+        answers_file (str): The file of possible answers.
+        schedule_seed (float): Seed used to shuffle the answers.
+
+    Returns:
+        AnswerSchedule: The stored schedule.
+    """
+    answers = load_words(answers_file)
+    key = hashlib.sha256(
+        cache_key(answers_file) + repr(schedule_seed).encode()
+    ).digest()
+    header = HEADER.pack(MAGIC, VERSION, key, len(answers))
+    filename = os.path.join(os.path.dirname(answers_file), SCHEDULE_FILE)
+
+    order = array(ORDER_TYPECODE)
+    try:
+        with open(filename, 'rb') as file:
+            if file.read(HEADER.size) == header:
+                order.fromfile(file, len(answers))
+    except (FileNotFoundError, EOFError):
+        order = array(ORDER_TYPECODE)
+
+    if len(order) != len(answers):
+        order = build_order(len(answers), schedule_seed)
+        temp_name = f"{filename}.{os.getpid()}.tmp"
+        with open(temp_name, 'wb') as file:
+            file.write(header)
+            order.tofile(file)
+        os.replace(temp_name, filename)
+    return AnswerSchedule(answers, order)
+
+
+def get_schedule(
+    answers_file: str = ANSWERS_FILE,
+    schedule_seed: float = SEED,
+) -> AnswerSchedule:
+    """ Returns the schedule for answers_file, loading it with load_schedule
+        the first time it is asked for in this process.
+
+    Parameters:
+        answers_file (str): The file of possible answers.
+        schedule_seed (float): Seed used to shuffle the answers.
+    """
+    key = answers_file, schedule_seed
+    schedule = _schedules.get(key)
+    if schedule is None:
+        schedule = _schedules[key] = load_schedule(answers_file, schedule_seed)
+    return schedule
+
+
+def choose_answer(
+    game_num: int,
+    answers_file: str = ANSWERS_FILE,
+    schedule_seed: float = SEED,
+) -> str:
+    """ Chooses the answer for a game from the stored schedule. Takes the place
+        of a1_support.choose_word, without calling random.choice.
+
+    Parameters:
+        game_num (int): The number of the game, starting from 0.
+        answers_file (str): The file of possible answers.
+        schedule_seed (float): Seed used to shuffle the answers.
+
+    Returns:
+        str: The answer for the game.
+    """
+    return get_schedule(answers_file, schedule_seed).get_answer(game_num)
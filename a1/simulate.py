@@ -0,0 +1,160 @@
+"""
+Headless Wordle simulation.
+
+Plays rounds of the A1 game without a terminal: a strategy callable takes the
+place of the user's input. Rounds are spread over a process pool and each is
+seeded from its position in the batch, so strategies that use random produce
+the same results however the rounds are scheduled. Results are written to a
+JSONL file as they arrive.
+"""
+
+from __future__ import annotations
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from random import seed
+from time import perf_counter
+from typing import Callable, Optional, Sequence
+
+from a1_support import load_words, VOCAB_FILE
+from feedback import score, render, ALL_CORRECT
+from schedule import SEED, choose_answer, get_schedule
+from solver import guess_next
+
+MAX_GUESSES = 6
+RESULTS_FILE = "results.jsonl"
+
+History = tuple[tuple[str, str], ...]
+Strategy = Callable[[tuple[str, ...], History], Optional[str]]
+
+_worker_state = {}
+
+
+def play_round(
+    answer: str,
+    strategy: Strategy,
+    vocab: tuple[str, ...],
+) -> dict:
+    """ Plays one round of Wordle against answer.
+
+    Parameters:
+        answer (str): The word to guess.
+        strategy (Strategy): Called as strategy(vocab, history) for each guess,
+                             like guess_next. Returning None or a word outside
+                             vocab forfeits the round.
+        vocab (tuple<str>): The valid guesses.
+
+    Returns:
+        dict: The answer, the guesses made, whether the round was won and how
+              long the strategy took in seconds.
+    """
+    history = ()
+    won = False
+    start = perf_counter()
+    while not won and len(history) < MAX_GUESSES:
+        guess = strategy(vocab, history)
+        if guess is None or guess not in vocab:
+            break
+        pattern = score(guess, answer)
+        history += ((guess, render(pattern)),)
+        won = pattern == ALL_CORRECT
+    return {
+        'answer': answer,
+        'guesses': [guess for guess, _ in history],
+        'won': won,
+        'seconds': perf_counter() - start,
+    }
+
+
+def _init_worker(strategy: Strategy, vocab_file: str, base_seed: float) -> None:
+    """ Loads the vocabulary once in each worker process. """
+    _worker_state['strategy'] = strategy
+    _worker_state['vocab'] = load_words(vocab_file)
+    _worker_state['seed'] = base_seed
+
+
+def _play_game(game: tuple[int, str]) -> dict:
+    """ Seeds random for one game and plays it in a worker process.
+
+    Parameters:
+        game (tuple<int, str>): The game number and its answer.
+    """
+    game_num, answer = game
+    seed(_worker_state['seed'] + game_num)
+    result = play_round(answer, _worker_state['strategy'], _worker_state['vocab'])
+    result['game'] = game_num
+    return result
+
+
+def run_batch(
+    strategy: Strategy = guess_next,
+    answers: Optional[Sequence[str]] = None,
+    results_file: str = RESULTS_FILE,
+    workers: Optional[int] = None,
+    base_seed: float = SEED,
+    vocab_file: str = VOCAB_FILE,
+) -> list[dict]:
+    """ Plays a round against each answer across a pool of processes.
+
+    Parameters:
+        strategy (Strategy): A module-level function choosing each guess.
+        answers (Sequence<str>): The answers to play, in order. Defaults to
+                                 every word in ANSWERS_FILE, in the order
+                                 the answer schedule plays them.
+        results_file (str): Where to write one JSON result per line.
+        workers (int): The number of processes. Defaults to the CPU count.
+        base_seed (float): Game n seeds random with base_seed + n.
+        vocab_file (str): The file of valid guesses.
+
+    Returns:
+        list<dict>: The result of each round, in game order.
+    """
+    if answers is None:
+        answers = [choose_answer(game_num)
+                   for game_num in range(len(get_schedule()))]
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, len(answers) // (workers * 8))
+
+    results = []
+    with ProcessPoolExecutor(
+        workers,
+        initializer=_init_worker,
+        initargs=(strategy, vocab_file, base_seed),
+    ) as pool, open(results_file, 'w') as file:
+        for result in pool.map(_play_game, enumerate(answers),
+                               chunksize=chunk_size):
+            file.write(json.dumps(result) + '\n')
+            results.append(result)
+    return results
+
+
+def print_report(results: list[dict], elapsed: float) -> None:
+    """ Prints throughput and the distribution of rounds won by guess count.
+
+    Parameters:
+        results (list<dict>): Results from run_batch.
+        elapsed (float): Wall-clock seconds taken by the batch.
+    """
+    won_in = Counter(len(result['guesses']) for result in results
+                     if result['won'])
+    num_won = sum(won_in.values())
+    print(f'{len(results)} games in {elapsed:.2f}s '
+          f'({len(results) / elapsed:.1f} games/s)')
+    print(f'Win rate: {100 * num_won / len(results):.1f}%')
+    print('Games won in:')
+    for num_guesses in range(1, MAX_GUESSES + 1):
+        print(f'{num_guesses} moves: {won_in[num_guesses]}')
+    print(f'Games lost: {len(results) - num_won}')
+
+
+def main() -> None:
+    """ Plays every answer with the solver strategy and reports the results.
+    """
+    start = perf_counter()
+    results = run_batch()
+    print_report(results, perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
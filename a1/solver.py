@@ -0,0 +1,332 @@
+"""
+Entropy-maximising Wordle solver.
+
+The solver keeps the ids of the answers that are still consistent with every
+piece of feedback seen so far, and picks the vocabulary word whose feedback
+splits those candidates most evenly, i.e. the guess with the highest expected
+information. Feedback is read from the cached FeedbackMatrix, and the search
+over the vocabulary is split across a process pool.
+"""
+
+from __future__ import annotations
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from math import log2
+from operator import itemgetter
+from time import perf_counter
+from typing import Iterable, Optional, Sequence
+
+from a1_support import load_words, VOCAB_FILE, ANSWERS_FILE
+from candidate_index import WordIndex, Candidates
+from feedback import ALL_CORRECT
+from feedback_matrix import FeedbackMatrix, load_matrix, cache_key
+
+OPENING_FILE = "opening_guess.txt"
+
+# Below this many (guess, candidate) pairs a search is cheaper in one process
+PARALLEL_THRESHOLD = 200_000
+CHUNKS_PER_WORKER = 4
+
+# (split cost, 0 if the guess could be the answer else 1, guess id)
+Rank = tuple[float, int, int]
+
+_worker_matrix: Optional[FeedbackMatrix] = None
+
+
+def _split_cost(patterns: Sequence[int]) -> float:
+    """ Returns sum(n * log2(n)) over the sizes n of the groups that patterns
+        splits the candidates into. The expected information of a guess is
+        log2(#candidates) - cost / #candidates, so lower cost is better.
+    """
+    return sum(size * log2(size) for size in Counter(patterns).values())
+
+
+def _rank_guesses(
+    matrix: FeedbackMatrix,
+    guess_ids: Iterable[int],
+    candidates: list[int],
+) -> Rank:
+    """ Finds the best guess among guess_ids for the given candidates.
+
+    Parameters:
+        matrix (FeedbackMatrix): The feedback for every guess and answer.
+        guess_ids (Iterable<int>): Row indices of the guesses to consider.
+        candidates (list<int>): At least two answer ids still possible.
+
+    Returns:
+        tuple<float, int, int>: The rank of the best guess; see Rank.
+    """
+    select = itemgetter(*candidates)
+    possible = _candidate_guess_ids(matrix, candidates)
+    return min(
+        (_split_cost(select(matrix.row(guess_id))),
+         guess_id not in possible,
+         guess_id)
+        for guess_id in guess_ids
+    )
+
+
+def _candidate_guess_ids(matrix: FeedbackMatrix, candidates: list[int]) -> set:
+    """ Returns the row indices of the candidates that are also valid guesses.
+    """
+    answers = matrix.get_answers()
+    guess_ids = set()
+    for answer_id in candidates:
+        try:
+            guess_ids.add(matrix.guess_id(answers[answer_id]))
+        except KeyError:
+            pass
+    return guess_ids
+
+
+def _init_worker(vocab_file: str, answers_file: str) -> None:
+    """ Memory-maps the feedback matrix once in each worker process. """
+    global _worker_matrix
+    _worker_matrix = load_matrix(vocab_file, answers_file)
+
+
+def _rank_chunk(start: int, stop: int, candidates: list[int]) -> Rank:
+    """ Runs _rank_guesses for one chunk of the vocabulary in a worker. """
+    return _rank_guesses(_worker_matrix, range(start, stop), candidates)
+
+
+class Solver:
+    """ Chooses guesses that maximise the expected information gained. """
+    def __init__(
+        self,
+        vocab_file: str = VOCAB_FILE,
+        answers_file: str = ANSWERS_FILE,
+        workers: Optional[int] = None,
+    ) -> None:
+        """ Loads (building if necessary) the feedback matrix for the word
+            lists.
+
+        Parameters:
+            vocab_file (str): The file of valid guesses.
+            answers_file (str): The file of possible answers.
+            workers (int): Number of processes for the guess search. Defaults
+                           to the number of CPUs; 1 searches in this process.
+        """
+        self._vocab_file = vocab_file
+        self._answers_file = answers_file
+        self._matrix = load_matrix(vocab_file, answers_file)
+        self._workers = workers or os.cpu_count() or 1
+        self._pool = None
+        self._opening = None
+        # Maps candidate sets already searched to their best guess
+        self._best_guesses = {}
+
+    def get_matrix(self) -> FeedbackMatrix:
+        """ Returns the feedback matrix used by this solver. """
+        return self._matrix
+
+    def initial_candidates(self) -> list[int]:
+        """ Returns the ids of every answer, before any feedback is known. """
+        return list(range(len(self._matrix.get_answers())))
+
+    def filter(self, candidates: list[int], guess: str, pattern: int) -> list[int]:
+        """ Narrows candidates to the answers that would give pattern for guess.
+
+        Parameters:
+            candidates (list<int>): Answer ids still possible.
+            guess (str): The word that was guessed.
+            pattern (int): The feedback code received for guess.
+
+        Returns:
+            list<int>: The remaining candidate answer ids.
+        """
+        row = self._matrix.row(self._matrix.guess_id(guess))
+        return [answer_id for answer_id in candidates if row[answer_id] == pattern]
+
+    def best_guess(self, candidates: list[int]) -> str:
+        """ Returns the vocabulary word with the highest expected information
+            about candidates, preferring words that could be the answer.
+
+        Parameters:
+            candidates (list<int>): Answer ids still possible. Must not be
+                                    empty.
+        """
+        answers = self._matrix.get_answers()
+        if len(candidates) <= 2:
+            return answers[candidates[0]]
+
+        key = tuple(candidates)
+        if key in self._best_guesses:
+            return self._best_guesses[key]
+
+        num_guesses = len(self._matrix.get_guesses())
+        if self._workers == 1 or num_guesses * len(candidates) < PARALLEL_THRESHOLD:
+            rank = _rank_guesses(self._matrix, range(num_guesses), candidates)
+        else:
+            rank = min(self._get_pool().map(
+                _rank_chunk, *zip(*self._chunks(num_guesses)),
+                [candidates] * (self._workers * CHUNKS_PER_WORKER)
+            ))
+        guess = self._best_guesses[key] = self._matrix.get_guesses()[rank[-1]]
+        return guess
+
+    def _chunks(self, size: int) -> list[tuple[int, int]]:
+        """ Splits range(size) into (start, stop) chunks for the pool. """
+        num_chunks = self._workers * CHUNKS_PER_WORKER
+        bounds = [size * i // num_chunks for i in range(num_chunks + 1)]
+        return list(zip(bounds, bounds[1:]))
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """ Returns the worker pool, starting it on first use. """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                self._workers,
+                initializer=_init_worker,
+                initargs=(self._vocab_file, self._answers_file),
+            )
+        return self._pool
+
+    def opening_guess(self) -> str:
+        """ Returns the best first guess. It only depends on the word lists, so
+            it is cached next to them and only searched for once.
+        """
+        if self._opening is not None:
+            return self._opening
+
+        key = cache_key(self._vocab_file, self._answers_file).hex()
+        filename = os.path.join(os.path.dirname(self._vocab_file), OPENING_FILE)
+        try:
+            with open(filename, 'r') as file:
+                cached_key, _, guess = file.read().strip().partition(' ')
+        except FileNotFoundError:
+            cached_key = guess = None
+
+        if cached_key != key or guess not in self._matrix.get_guesses():
+            guess = self.best_guess(self.initial_candidates())
+            with open(filename, 'w') as file:
+                file.write(f'{key} {guess}\n')
+        self._opening = guess
+        return guess
+
+    def next_guess(self, candidates: list[int]) -> str:
+        """ Returns the guess to make for the given candidates, using the cached
+            opening guess when nothing is known yet.
+        """
+        if len(candidates) == len(self._matrix.get_answers()):
+            return self.opening_guess()
+        return self.best_guess(candidates)
+
+    def solve(self, answer: str) -> list[str]:
+        """ Plays a game against answer until it is guessed.
+
+        Parameters:
+            answer (str): A word from the answers file.
+
+        Returns:
+            list<str>: Every guess made, ending with answer.
+        """
+        answer_id = self._matrix.answer_id(answer)
+        candidates = self.initial_candidates()
+        guesses = []
+        while True:
+            guess = self.next_guess(candidates)
+            guesses.append(guess)
+            pattern = self._matrix.pattern(guess, answer)
+            if pattern == ALL_CORRECT:
+                return guesses
+            candidates = self.filter(candidates, guess, pattern)
+            assert answer_id in candidates
+
+    def close(self) -> None:
+        """ Shuts down the worker pool and releases the feedback matrix. """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self._matrix.close()
+
+    def __enter__(self) -> 'Solver':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+@lru_cache(maxsize=2)
+def _word_index(vocab: tuple[str, ...]) -> WordIndex:
+    """ Returns the bitset index over vocab, building it on first use. """
+    return WordIndex(vocab)
+
+
+@lru_cache(maxsize=None)
+def _default_solver() -> Solver:
+    """ Returns a single-process solver for the default word lists, shared by
+        every call to guess_next in this process.
+    """
+    return Solver(workers=1)
+
+
+def guess_next(
+    vocab: tuple[str, ...],
+    history: tuple[tuple[str, str], ...],
+) -> Optional[str]:
+    """ Returns a guess from vocab that is consistent with every guess and its
+        processed feedback in history, or None if no such word exists.
+
+    Among the consistent words, the one with the highest expected information
+    about the remaining answers is chosen.
+
+    Parameters:
+        vocab (tuple<str>): The valid guesses.
+        history (tuple<tuple<str, str>>): (guess, processed guess) pairs.
+    """
+    solver = _default_solver()
+    if not history and vocab == solver.get_matrix().get_guesses():
+        return solver.opening_guess()
+
+    candidate_words = Candidates(_word_index(vocab))
+    candidate_words.apply_history(history)
+    consistent = candidate_words.words()
+    if not consistent:
+        return None
+
+    matrix = solver.get_matrix()
+    answers = matrix.get_answers()
+    answer_words, guesses = set(answers), set(matrix.get_guesses())
+    candidates = [matrix.answer_id(word) for word in consistent
+                  if word in answer_words]
+    if not candidates:
+        return consistent[0]
+    elif len(candidates) <= 2:
+        return answers[candidates[0]]
+
+    guess_ids = [matrix.guess_id(word) for word in consistent
+                 if word in guesses]
+    rank = _rank_guesses(matrix, guess_ids, candidates)
+    return matrix.get_guesses()[rank[-1]]
+
+
+def benchmark(workers: Optional[int] = None) -> None:
+    """ Solves every answer and reports solve time and guesses per game.
+
+    Parameters:
+        workers (int): Number of processes for the guess search.
+    """
+    answers = load_words(ANSWERS_FILE)
+    with Solver(workers=workers) as solver:
+        start = perf_counter()
+        opening = solver.opening_guess()
+        print(f'opening guess: {opening} ({perf_counter() - start:.2f}s)')
+
+        counts = Counter()
+        start = perf_counter()
+        for answer in answers:
+            counts[len(solver.solve(answer))] += 1
+        elapsed = perf_counter() - start
+
+    total_guesses = sum(guesses * games for guesses, games in counts.items())
+    print(f'{len(answers)} games in {elapsed:.2f}s')
+    print(f'average solve time: {1000 * elapsed / len(answers):.2f}ms')
+    print(f'average guesses per game: {total_guesses / len(answers):.3f}')
+    for guesses in sorted(counts):
+        print(f'{guesses} guesses: {counts[guesses]}')
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,204 @@
+"""
+Compact word list loading.
+
+load_word_list reads a word file in large binary chunks and packs the words
+into a single buffer of fixed-width records, validating word length and
+characters as it goes. The returned WordList behaves like the tuple returned by
+a1_support.load_words, but only creates a str when a word is requested.
+"""
+
+from __future__ import annotations
+import tracemalloc
+from collections.abc import Sequence
+from time import perf_counter
+from typing import Iterator, Union
+
+from a1_support import load_words, VOCAB_FILE
+from feedback import WORD_LENGTH
+
+CHUNK_SIZE = 1 << 16
+
+
+class WordList(Sequence):
+    """ An immutable sequence of equal-length words stored as fixed-width
+        ASCII records in one buffer.
+    """
+    def __init__(self, records: bytes, length: int = WORD_LENGTH) -> None:
+        """ Wraps a buffer of concatenated words.
+
+        Parameters:
+            records (bytes): The words joined with no separators.
+            length (int): The number of letters in every word.
+        """
+        self._records = records
+        self._length = length
+
+    def get_length(self) -> int:
+        """ Returns the number of letters in each word. """
+        return self._length
+
+    def get_record(self, index: int) -> bytes:
+        """ Returns the word at index as ASCII bytes, without decoding it. """
+        start = self._position(index)
+        return self._records[start:start + self._length]
+
+    def _position(self, index: int) -> int:
+        """ Returns the offset in the buffer of the word at index. """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('WordList index out of range')
+        return index * self._length
+
+    def __len__(self) -> int:
+        return len(self._records) // self._length
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, 'WordList']:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                records = self._records[start * self._length:stop * self._length]
+            else:
+                records = b''.join(self.get_record(i)
+                                   for i in range(start, stop, step))
+            return WordList(records, self._length)
+        return self.get_record(index).decode('ascii')
+
+    def __iter__(self) -> Iterator[str]:
+        records, length = self._records, self._length
+        for start in range(0, len(records), length):
+            yield records[start:start + length].decode('ascii')
+
+    def index(self, word: str, start: int = 0, stop: int = None) -> int:
+        """ Returns the index of the first occurrence of word. Raises ValueError
+            if word is not present.
+        """
+        record = word.encode('ascii', errors='replace')
+        if len(record) == self._length:
+            stop = len(self) if stop is None else min(stop, len(self))
+            offset = self._records.find(record, start * self._length,
+                                        stop * self._length)
+            # Only matches aligned to a record boundary are whole words
+            while offset != -1 and offset % self._length:
+                offset = self._records.find(record, offset + 1,
+                                            stop * self._length)
+            if offset != -1:
+                return offset // self._length
+        raise ValueError(f'{word!r} is not in WordList')
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        try:
+            self.index(word)
+        except ValueError:
+            return False
+        return True
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, WordList):
+            return (self._length, self._records) == (other._length, other._records)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self._length, self._records))
+
+    def __repr__(self) -> str:
+        return f"WordList({len(self)} words of length {self._length})"
+
+
+def _check_words(
+    lines: list[bytes],
+    length: int,
+    filename: str,
+    first_line: int,
+) -> None:
+    """ Raises ValueError unless every line is a word of length lowercase ASCII
+        letters.
+
+    Parameters:
+        lines (list<bytes>): The stripped, non-empty lines to check.
+        length (int): The required number of letters.
+        filename (str): The file the lines came from, for the error message.
+        first_line (int): The line number of the first line in the file.
+    """
+    joined = b''.join(lines)
+    if (len(joined) == length * len(lines) and set(map(len, lines)) <= {length}
+            and (not joined or (joined.isalpha() and joined.islower()))):
+        return
+
+    # Only search for the offending word once a chunk is known to be bad
+    for line_num, line in enumerate(lines, first_line):
+        if len(line) != length or not (line.isalpha() and line.islower()):
+            raise ValueError(
+                f'{filename}, word {line_num}: {line!r} is not a word of '
+                f'{length} lowercase letters'
+            )
+
+
+def load_word_list(
+    filename: str,
+    length: int = WORD_LENGTH,
+    chunk_size: int = CHUNK_SIZE,
+) -> WordList:
+    """ Loads all words from the file with the given name.
+
+    Parameters:
+        filename (str): The name of the file to load from. Each word must be on
+                        a separate line; blank lines are ignored.
+        length (int): The number of letters every word must have.
+        chunk_size (int): The number of bytes to read at a time.
+
+    Returns:
+        WordList: The words in the file, in order.
+
+    Raises:
+        ValueError: If a word has the wrong length or contains anything other
+                    than lowercase ASCII letters.
+    """
+    records = bytearray()
+    num_words = 0
+    remainder = b''
+    with open(filename, 'rb') as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if chunk:
+                # Keep a partial last line for the next chunk
+                chunk = remainder + chunk
+                end = chunk.rfind(b'\n') + 1
+                chunk, remainder = chunk[:end], chunk[end:]
+            else:
+                chunk, remainder = remainder, b''
+
+            lines = [line for line in map(bytes.strip, chunk.splitlines())
+                     if line]
+            _check_words(lines, length, filename, num_words + 1)
+            records += b''.join(lines)
+            num_words += len(lines)
+            if not chunk and not remainder:
+                break
+    return WordList(bytes(records), length)
+
+
+def benchmark(filename: str = VOCAB_FILE) -> None:
+    """ Compares the time and memory used to load filename with load_words and
+        load_word_list.
+
+    Parameters:
+        filename (str): The word file to load.
+    """
+    for loader in (load_words, load_word_list):
+        tracemalloc.start()
+        start = perf_counter()
+        words = loader(filename)
+        elapsed = perf_counter() - start
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'{loader.__name__:>15}: {len(words)} words in '
+              f'{1000 * elapsed:7.2f}ms, {retained / 1024:8.1f} KiB retained, '
+              f'{peak / 1024:8.1f} KiB peak')
+        del words
+
+
+if __name__ == '__main__':
+    benchmark()
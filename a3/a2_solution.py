@@ -1,7 +1,12 @@
 from __future__ import annotations
-from typing import Optional
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from heapq import heappop, heappush
+from typing import Callable, Iterable, Optional
 from a2_support import UserInterface, TextInterface
 from constants import *
+from level_pack import LevelPack, is_level_pack
 
 
 class Tile:
@@ -73,6 +78,10 @@ class Door(Tile):
         """ Unlocks the door by setting it to be non-blocking. """
         self._blocking = False
 
+    def lock(self) -> None:
+        """ Locks the door again, e.g. when restoring an earlier game state. """
+        self._blocking = True
+
 
 
 class Entity:
@@ -202,6 +211,16 @@ class Inventory:
         """
         return self._items
 
+    def set_items(self, items: dict[str, list[Item]]) -> None:
+        """ Replaces all items in the inventory, e.g. when restoring a saved
+            game.
+
+        Parameters:
+            items: A mapping from item names to the instances of that item.
+        """
+        self._items = {name: list(instances) for name, instances in items.items()
+                       if instances}
+
     def remove_item(self, item_name: str) -> Optional['Item']:
         """ Removes one instance of the item with the given name from inventory,
             if one exists.
@@ -350,15 +369,92 @@ def load_game(filename: str) -> list['Level']:
                 levels[-1].add_row(line)
     return levels
 
+class TileRow:
+    """ A read-only view of one row of tiles in a Maze. """
+    def __init__(self, maze: 'Maze', row: int) -> None:
+        """ Sets up a view of the given row of maze.
+
+        Parameters:
+            maze: The maze containing the row.
+            row: The index of the row.
+        """
+        self._maze = maze
+        self._row = row
+
+    def __getitem__(self, col: int) -> Tile:
+        return self._maze.get_tile((self._row, col))
+
+    def __len__(self) -> int:
+        return self._maze.get_dimensions()[1]
+
+    def __iter__(self):
+        return (self[col] for col in range(len(self)))
+
+    def get_ids(self) -> str:
+        """ Returns the IDs of the tiles in this row as a string. """
+        return self._maze.get_row_ids(self._row)
+
+
+def tile_row_ids(row: list[Tile]) -> str:
+    """ Returns the IDs of a row of tiles as a string, without building any
+        Tile instances if the row is a TileRow of a Maze.
+
+    Parameters:
+        row: A row of tiles, either a TileRow or a list of Tile instances.
+    """
+    if isinstance(row, TileRow):
+        return row.get_ids()
+    return ''.join(tile.get_id() for tile in row)
+
+
+class TileGrid:
+    """ A read-only view of the tiles in a Maze as a sequence of rows, so that
+        tiles[row][col] works as it would for a list of lists.
+    """
+    def __init__(self, maze: 'Maze') -> None:
+        """ Sets up a view of the tiles in maze.
+
+        Parameters:
+            maze: The maze to view.
+        """
+        self._maze = maze
+
+    def __getitem__(self, row: int) -> TileRow:
+        if not -len(self) <= row < len(self):
+            raise IndexError('row index out of range')
+        return TileRow(self._maze, row % len(self))
+
+    def __len__(self) -> int:
+        return self._maze.get_num_rows()
+
+    def __iter__(self):
+        return (self[row] for row in range(len(self)))
+
+
 class Maze:
     """ Models a single map for one level. Only includes ground information,
-        excluding information about entities. """
+        excluding information about entities.
+
+        Tiles are stored as one byte per cell holding the tile's ID. Stateless
+        tiles are shared between every cell of their type, and only doors,
+        which can be unlocked, have an instance per position.
+    """
     TILES = {
         WALL: Wall,
         EMPTY: Empty,
         DOOR: Door,
         LAVA: Lava,
     }
+    _SHARED_TILES = {
+        ord(WALL): Wall(),
+        ord(EMPTY): Empty(),
+        ord(LAVA): Lava(),
+    }
+    # Maps every byte to itself if it is a tile ID, else to the empty tile
+    _TILE_CODES = bytes(
+        code if chr(code) in (WALL, EMPTY, DOOR, LAVA) else ord(EMPTY)
+        for code in range(256)
+    )
 
     def __init__(self, dimensions: tuple[int, int]) -> None:
         """Sets up an empty maze of given dimensions.
@@ -367,11 +463,18 @@ class Maze:
             dimensions: (#rows, #columns)
         """
         self._dimensions = dimensions
-        self._tiles = []
+        self._codes = bytearray()
+        self._num_rows = 0
+        self._doors = {} # Maps positions to Door instances
+        self._doors_unlocked = False
     
     def get_dimensions(self) -> tuple[int, int]:
         """ Returns the dimensions of this maze. """
         return self._dimensions
+
+    def get_num_rows(self) -> int:
+        """ Returns the number of rows added to this maze so far. """
+        return self._num_rows
     
     def add_row(self, row: str) -> None:
         """ Adds a row of tiles to the maze.
@@ -379,21 +482,57 @@ class Maze:
         Parameters:
             row: String of the tile IDs from which to construct Tile instances.
         """
-        # If there is an entity in a spot, assume the ground underneath is empty
-        self._tiles.append([self.TILES.get(tile, Empty)() for tile in row])
+        # Rows of the wrong width are accepted, padded with empty tiles or cut
+        # to the maze's width so every row takes the same number of bytes
+        num_cols = self._dimensions[1]
+        row = row[:num_cols].ljust(num_cols, EMPTY)
 
-    def get_tiles(self) -> list[list[Tile]]:
+        # If there is an entity in a spot, assume the ground underneath is empty
+        codes = row.encode('ascii', errors='replace').translate(self._TILE_CODES)
+        col = codes.find(ord(DOOR))
+        while col != -1:
+            self._doors[(self._num_rows, col)] = Door()
+            col = codes.find(ord(DOOR), col + 1)
+        self._codes += codes
+        self._num_rows += 1
+
+    def get_tiles(self) -> TileGrid:
         """ Returns the Tile instances in this maze. Each element is a row of
             Tile instances in order.
         """
-        return self._tiles
+        return TileGrid(self)
     
+    def get_door_positions(self) -> list[tuple[int, int]]:
+        """ Returns the (row, column) positions of the doors in this maze. """
+        return list(self._doors)
+
+    def is_unlocked(self) -> bool:
+        """ Returns True iff the doors in this maze have been unlocked. """
+        return self._doors_unlocked
+
     def unlock_door(self) -> None:
-        """ Unlocks any doors that exist in the maze. """
-        for row in self._tiles:
-            for tile in row:
-                if isinstance(tile, Door):
-                    tile.unlock()
+        """ Unlocks any doors that exist in the maze. Only the first call has
+            any effect.
+        """
+        if self._doors_unlocked:
+            return
+        for door in self._doors.values():
+            door.unlock()
+        self._doors_unlocked = True
+
+    def set_unlocked(self, unlocked: bool) -> None:
+        """ Unlocks or locks every door in the maze, e.g. when restoring an
+            earlier game state.
+
+        Parameters:
+            unlocked: True to unlock the doors, False to lock them.
+        """
+        if unlocked:
+            self.unlock_door()
+        elif self._doors_unlocked:
+            for door in self._doors.values():
+                door.lock()
+            self._doors_unlocked = False
     
     def get_tile(self, position: tuple[int, int]) -> Tile:
         """ Returns the Tile instance at the given position.
@@ -402,12 +541,39 @@ class Maze:
             position: The (row, column) position from which to find the tile.
         """
         row, col = position
-        return self._tiles[row][col]
+        num_rows, num_cols = self._num_rows, self._dimensions[1]
+        if not (0 <= row < num_rows and 0 <= col < num_cols):
+            # Negative indices count from the end, as they would in a list
+            if not (-num_rows <= row < num_rows and -num_cols <= col < num_cols):
+                raise IndexError('maze position out of range')
+            row, col = row % num_rows, col % num_cols
+        tile = self._SHARED_TILES.get(self._codes[row * num_cols + col])
+        return tile if tile is not None else self._doors[(row, col)]
+
+    def get_row_ids(self, row: int) -> str:
+        """ Returns the IDs of the tiles in a row as a string, without building
+            any Tile instances.
+
+        Parameters:
+            row: The index of the row.
+        """
+        num_cols = self._dimensions[1]
+        codes = self._codes[row * num_cols:(row + 1) * num_cols]
+        for (door_row, col), door in self._doors.items():
+            if door_row == row:
+                codes[col] = ord(door.get_id())
+        return codes.decode('ascii')
     
     def __str__(self) -> str:
         """ Returns the string representation of this maze. """
+        codes = bytearray(self._codes)
+        num_cols = self._dimensions[1]
+        for (row, col), door in self._doors.items():
+            codes[row * num_cols + col] = ord(door.get_id())
+        text = codes.decode('ascii')
         return '\n'.join(
-            [''.join([tile.get_id() for tile in row]) for row in self._tiles]
+            text[start:start + num_cols]
+            for start in range(0, len(text), num_cols)
         )
     
     def __repr__(self) -> str:
@@ -415,6 +581,151 @@ class Maze:
         return f"Maze({self._dimensions})"
 
 
+class DistanceField:
+    """ The number of moves from every cell of a maze to the nearest of a set
+        of source cells, such as coins or doors.
+
+        Distances are kept in a flat array with one entry per cell, along with
+        the source each cell is nearest to, so that removing a source only
+        recomputes the cells that were nearest to it.
+    """
+    UNREACHABLE = -1
+
+    def __init__(self, maze: Maze, sources: Iterable[tuple[int, int]]) -> None:
+        """ Finds the distance from every cell to the nearest source with a
+            breadth first search. Moves cannot pass through walls or locked
+            doors, but can start from a source on one.
+
+        Parameters:
+            maze: The maze to measure distances in.
+            sources: The (row, column) positions to measure distances to.
+        """
+        self._num_rows, self._num_cols = maze.get_num_rows(), maze.get_dimensions()[1]
+        tiles = str(maze).replace('\n', '')
+        self._open = bytes(tile not in (WALL, DOOR) for tile in tiles)
+        num_cells = len(tiles)
+        self._distances = array('i', [self.UNREACHABLE]) * num_cells
+        self._nearest = array('i', [self.UNREACHABLE]) * num_cells
+        self._sources = set()
+
+        queue = deque()
+        for position in sources:
+            cell = self._cell(position)
+            if cell not in self._sources:
+                self._sources.add(cell)
+                self._distances[cell] = 0
+                self._nearest[cell] = cell
+                queue.append(cell)
+        distances, nearest = self._distances, self._nearest
+        while queue:
+            cell = queue.popleft()
+            distance = distances[cell] + 1
+            for neighbour in self._neighbours(cell):
+                if distances[neighbour] == self.UNREACHABLE:
+                    distances[neighbour] = distance
+                    nearest[neighbour] = nearest[cell]
+                    queue.append(neighbour)
+
+    def get_distance(self, position: tuple[int, int]) -> Optional[int]:
+        """ Returns the fewest moves from position to a source, or None if no
+            source can be reached.
+
+        Parameters:
+            position: A (row, column) position within the maze.
+        """
+        distance = self._distances[self._cell(position)]
+        return None if distance == self.UNREACHABLE else distance
+
+    def get_next_position(self, position: tuple[int, int]) -> Optional[tuple[int, int]]:
+        """ Returns the neighbouring position one move closer to a source, or
+            None if position is a source or no source can be reached.
+
+        Parameters:
+            position: A (row, column) position within the maze.
+        """
+        cell = self._cell(position)
+        distance = self._distances[cell]
+        if distance <= 0:
+            return None
+        for neighbour in self._neighbours(cell):
+            if self._distances[neighbour] == distance - 1:
+                return divmod(neighbour, self._num_cols)
+        return None
+
+    def get_sources(self) -> list[tuple[int, int]]:
+        """ Returns the positions distances are measured to. """
+        return [divmod(cell, self._num_cols) for cell in self._sources]
+
+    def remove_source(self, position: tuple[int, int]) -> None:
+        """ Stops measuring distances to position, recomputing only the cells
+            that were nearest to it.
+
+        Parameters:
+            position: The (row, column) position of a source.
+        """
+        removed = self._cell(position)
+        if removed not in self._sources:
+            return
+        self._sources.remove(removed)
+        distances, nearest = self._distances, self._nearest
+
+        # The cells nearest to the removed source form a connected region
+        region, queue = [removed], deque([removed])
+        nearest[removed] = distances[removed] = self.UNREACHABLE
+        while queue:
+            for neighbour in self._neighbours(queue.popleft()):
+                if nearest[neighbour] == removed:
+                    nearest[neighbour] = distances[neighbour] = self.UNREACHABLE
+                    region.append(neighbour)
+                    queue.append(neighbour)
+
+        # Refill the region from its edge, nearest cells first. Sources on
+        # closed cells, such as doors, can still start paths into the region
+        heap = []
+        for cell in region:
+            if not self._open[cell]:
+                continue
+            for neighbour in self._adjacent(cell):
+                if distances[neighbour] != self.UNREACHABLE:
+                    heappush(heap, (distances[neighbour] + 1, cell, nearest[neighbour]))
+        while heap:
+            distance, cell, source = heappop(heap)
+            if distances[cell] != self.UNREACHABLE:
+                continue
+            distances[cell] = distance
+            nearest[cell] = source
+            for neighbour in self._neighbours(cell):
+                if distances[neighbour] == self.UNREACHABLE:
+                    heappush(heap, (distance + 1, neighbour, source))
+
+    def _cell(self, position: tuple[int, int]) -> int:
+        """ Returns the index of position in the flattened maze. """
+        row, col = position
+        if not (0 <= row < self._num_rows and 0 <= col < self._num_cols):
+            raise IndexError('maze position out of range')
+        return row * self._num_cols + col
+
+    def _adjacent(self, cell: int) -> list[int]:
+        """ Returns the cells one move away from cell. """
+        num_cols = self._num_cols
+        row, col = divmod(cell, num_cols)
+        adjacent = []
+        if row > 0:
+            adjacent.append(cell - num_cols)
+        if row < self._num_rows - 1:
+            adjacent.append(cell + num_cols)
+        if col > 0:
+            adjacent.append(cell - 1)
+        if col < num_cols - 1:
+            adjacent.append(cell + 1)
+        return adjacent
+
+    def _neighbours(self, cell: int) -> list[int]:
+        """ Returns the open cells one move away from cell. """
+        is_open = self._open
+        return [neighbour for neighbour in self._adjacent(cell) if is_open[neighbour]]
+
+
 class Level:
     """ Models one level of a game, including maze and entities. """
     ENTITIES = {
@@ -433,20 +744,64 @@ class Level:
         """
         self._maze = Maze(dimensions)
         self._items = {} # Maps positions to Item instances
+        self._num_coins = 0 # Number of coins in self._items
         self._player_start = None
+        # Distance fields are built when first asked for, and kept up to date
+        self._door_field = None
+        self._coin_field = None
+        # Gives each item a bit in the state, built when first asked for
+        self._item_table = None  # ((position, item), ...)
+        self._item_bits = 0  # Bit i is set iff item i is still in the level
+        self._item_indices = {}  # Maps positions to indices in the table
     
     def get_maze(self) -> Maze:
         """ Returns the Maze instance for this level. """
         return self._maze
+
+    def get_door_field(self) -> DistanceField:
+        """ Returns the distances from every cell to the nearest door. """
+        if self._door_field is None:
+            self._door_field = DistanceField(self._maze, self._maze.get_door_positions())
+        return self._door_field
+
+    def get_coin_field(self) -> DistanceField:
+        """ Returns the distances from every cell to the nearest coin left in
+            this level.
+        """
+        if self._coin_field is None:
+            coins = [position for position, item in self._items.items()
+                     if item.get_id() == COIN]
+            self._coin_field = DistanceField(self._maze, coins)
+        return self._coin_field
+
+    def get_distance_to_door(self, position: tuple[int, int]) -> Optional[int]:
+        """ Returns the fewest moves from position to a door, or None if no
+            door can be reached.
+
+        Parameters:
+            position: A (row, column) position within the maze.
+        """
+        return self.get_door_field().get_distance(position)
+
+    def get_distance_to_coin(self, position: tuple[int, int]) -> Optional[int]:
+        """ Returns the fewest moves from position to a coin, or None if no
+            coin can be reached.
+
+        Parameters:
+            position: A (row, column) position within the maze.
+        """
+        return self.get_coin_field().get_distance(position)
     
     def _contains_coins(self) -> bool:
         """ Returns True iff there are any more coins left in this level. """
-        return any([item.get_id() == COIN for item in self._items.values()])
+        return self._num_coins > 0
 
     def attempt_unlock_door(self) -> None:
         """ Unlocks the doors in the maze if there are no coins remaining. """
-        if not self._contains_coins():
+        if self._num_coins == 0 and not self._maze.is_unlocked():
             self._maze.unlock_door()
+            # Paths can now pass through the doors
+            self._door_field = self._coin_field = None
     
     def add_row(self, row: str) -> None:
         """ Adds the tiles and entities from the row to this level.
@@ -456,6 +811,7 @@ class Level:
         """
         row_num = len(self._maze.get_tiles())
         self._maze.add_row(row)
+        self._door_field = self._coin_field = None
         for col_num, char in enumerate(row):
             self.add_entity((row_num, col_num), char)
     
@@ -467,7 +823,13 @@ class Level:
             entity_id: The ID of the entity to add.
         """
         if self.ENTITIES.get(entity_id) is not None:
+            if position in self._items:
+                self.remove_item(position)
             self._items[position] = self.ENTITIES.get(entity_id)(position)
+            if entity_id == COIN:
+                self._num_coins += 1
+                self._coin_field = None
+            self._item_table = None
         if entity_id == PLAYER:
             self.add_player_start(position)
 
@@ -481,6 +843,19 @@ class Level:
         """
         return self._items
 
+    def set_items(self, items: dict[tuple[int, int], Item]) -> None:
+        """ Replaces all items in this level, e.g. when restoring a saved game.
+
+        Parameters:
+            items: A mapping from position to the Item at that position.
+        """
+        self._items = dict(items)
+        self._num_coins = sum(
+            1 for item in self._items.values() if item.get_id() == COIN
+        )
+        self._coin_field = None
+        self._item_table = None
+
     def remove_item(self, position: tuple[int, int]) -> None:
         """ Deletes the item from the given position.
         
@@ -490,7 +865,67 @@ class Level:
         Parameters:
             position: the (row, column) position from which to delete an item.
         """
-        del self._items[position]
+        if self._item_table is not None:
+            self._item_bits &= ~(1 << self._item_indices[position])
+        if self._items.pop(position).get_id() == COIN:
+            self._num_coins -= 1
+            if self._coin_field is not None:
+                self._coin_field.remove_source(position)
+
+    def get_state(self) -> tuple[tuple[tuple[tuple[int, int], Item], ...], int, bool]:
+        """ Returns the parts of this level that change during a game, as
+            (item table, item bits, doors unlocked). The item table holds
+            every (position, item) the level had when it was first asked for,
+            and is shared by every state taken until items are added, and bit
+            i of the item bits is set iff the i-th item is still in the level.
+        """
+        if self._item_table is None:
+            self._set_item_table(tuple(self._items.items()))
+            self._item_bits = (1 << len(self._item_table)) - 1
+        return self._item_table, self._item_bits, self._maze.is_unlocked()
+
+    def set_state(self, state: tuple[tuple[tuple[tuple[int, int], Item], ...], int, bool]) -> None:
+        """ Returns this level to a state from get_state. Only the items that
+            differ are added or removed if the state shares this level's item
+            table.
+
+        Parameters:
+            state: (item table, item bits, doors unlocked)
+        """
+        table, bits, unlocked = state
+        if table is not self._item_table:
+            self._set_item_table(table)
+            self._items = {position: item for i, (position, item) in enumerate(table)
+                           if bits >> i & 1}
+            self._num_coins = sum(1 for item in self._items.values() if item.get_id() == COIN)
+            self._coin_field = None
+        else:
+            changed = bits ^ self._item_bits
+            while changed:
+                bit = changed & -changed
+                changed ^= bit
+                position, item = table[bit.bit_length() - 1]
+                if bits & bit:
+                    self._items[position] = item
+                    if item.get_id() == COIN:
+                        self._num_coins += 1
+                        self._coin_field = None
+                else:
+                    del self._items[position]
+                    if item.get_id() == COIN:
+                        self._num_coins -= 1
+                        if self._coin_field is not None:
+                            self._coin_field.remove_source(position)
+        self._item_bits = bits
+
+        if unlocked != self._maze.is_unlocked():
+            self._maze.set_unlocked(unlocked)
+            self._door_field = self._coin_field = None
+
+    def _set_item_table(self, table: tuple[tuple[tuple[int, int], Item], ...]) -> None:
+        """ Gives each item in table the bit at its index. """
+        self._item_table = table
+        self._item_indices = {position: i for i, (position, _) in enumerate(table)}
     
     def add_player_start(self, position: tuple[int, int]) -> None:
         """ Adds the start position for the player in this level.
@@ -514,21 +949,317 @@ class Level:
         return f"Level({self.get_dimensions()})"
 
 
+class ChangeSet:
+    """ Describes how the game changed over one or more model updates, so that
+        views can redraw only what changed.
+    """
+    def __init__(self) -> None:
+        """ Sets up an empty change set. """
+        self._moved = {}  # Maps entity IDs to (old position, new position)
+        self._removed_items = {}  # Maps positions to the Items removed there
+        self._unlocked_doors = []
+        self._stat_deltas = (0, 0, 0)
+        self._inventory_deltas = {}  # Maps item names to changes in quantity
+        self._new_level = False
+
+    def get_moved(self) -> dict[str, tuple[tuple[int, int], tuple[int, int]]]:
+        """ Returns a mapping from entity ID to the (old, new) positions of the
+            entities that moved.
+        """
+        return self._moved
+
+    def get_removed_items(self) -> dict[tuple[int, int], Item]:
+        """ Returns a mapping from position to the Items removed from the
+            level.
+        """
+        return self._removed_items
+
+    def get_unlocked_doors(self) -> list[tuple[int, int]]:
+        """ Returns the positions of doors that were unlocked. """
+        return self._unlocked_doors
+
+    def get_stat_deltas(self) -> tuple[int, int, int]:
+        """ Returns the change in the player's (HP, hunger, thirst). """
+        return self._stat_deltas
+
+    def get_inventory_deltas(self) -> dict[str, int]:
+        """ Returns a mapping from item name to the change in the quantity of
+            that item in the player's inventory.
+        """
+        return self._inventory_deltas
+
+    def is_new_level(self) -> bool:
+        """ Returns True iff the level changed, in which case everything about
+            the level must be redrawn.
+        """
+        return self._new_level
+
+    def is_empty(self) -> bool:
+        """ Returns True iff nothing changed. """
+        return not (self._moved or self._removed_items or self._unlocked_doors
+                    or any(self._stat_deltas) or self._inventory_deltas
+                    or self._new_level)
+
+    def add_move(
+        self,
+        entity_id: str,
+        old_position: tuple[int, int],
+        new_position: tuple[int, int],
+    ) -> None:
+        """ Records that an entity moved.
+
+        Parameters:
+            entity_id: The ID of the entity.
+            old_position: Where the entity moved from.
+            new_position: Where the entity moved to.
+        """
+        old_position = self._moved.get(entity_id, (old_position,))[0]
+        if old_position == new_position:
+            self._moved.pop(entity_id, None)
+        else:
+            self._moved[entity_id] = old_position, new_position
+
+    def add_removed_item(self, position: tuple[int, int], item: Item) -> None:
+        """ Records that an item was removed from the level.
+
+        Parameters:
+            position: The position the item was removed from.
+            item: The removed item.
+        """
+        self._removed_items[position] = item
+
+    def add_unlocked_doors(self, positions: list[tuple[int, int]]) -> None:
+        """ Records that the doors at the given positions were unlocked. """
+        self._unlocked_doors.extend(positions)
+
+    def add_stat_deltas(self, deltas: tuple[int, int, int]) -> None:
+        """ Records a change in the player's (HP, hunger, thirst). """
+        self._stat_deltas = tuple(
+            total + delta for total, delta in zip(self._stat_deltas, deltas)
+        )
+
+    def add_inventory_delta(self, item_name: str, amount: int) -> None:
+        """ Records a change in the quantity of an item in the inventory.
+
+        Parameters:
+            item_name: The name of the item.
+            amount: The number of items gained, or negative if used.
+        """
+        amount += self._inventory_deltas.get(item_name, 0)
+        if amount == 0:
+            self._inventory_deltas.pop(item_name, None)
+        else:
+            self._inventory_deltas[item_name] = amount
+
+    def set_new_level(self) -> None:
+        """ Records that the level changed. """
+        self._new_level = True
+
+    def merge(self, other: 'ChangeSet') -> None:
+        """ Adds the changes in other, which happened after these, to this
+            change set.
+        """
+        for entity_id, (old_position, new_position) in other.get_moved().items():
+            self.add_move(entity_id, old_position, new_position)
+        for position, item in other.get_removed_items().items():
+            self.add_removed_item(position, item)
+        self.add_unlocked_doors(other.get_unlocked_doors())
+        self.add_stat_deltas(other.get_stat_deltas())
+        for item_name, amount in other.get_inventory_deltas().items():
+            self.add_inventory_delta(item_name, amount)
+        if other.is_new_level():
+            self.set_new_level()
+
+    def __repr__(self) -> str:
+        return (f'ChangeSet(moved={self._moved}, '
+                f'removed_items={self._removed_items}, '
+                f'unlocked_doors={self._unlocked_doors}, '
+                f'stat_deltas={self._stat_deltas}, '
+                f'inventory_deltas={self._inventory_deltas}, '
+                f'new_level={self._new_level})')
+
+
+class Snapshot:
+    """ The state of a game at one moment, from Model.snapshot. Snapshots
+        never change, so can be kept, compared and hashed, and they share the
+        mazes and items of the game rather than copying them.
+    """
+    def __init__(
+        self,
+        level_num: int,
+        won: bool,
+        did_level_up: bool,
+        num_moves: int,
+        position: tuple[int, int],
+        stats: tuple[int, int, int],
+        inventory: tuple[tuple[str, tuple[Item, ...]], ...],
+        level_state: Optional[tuple[tuple[tuple[tuple[int, int], Item], ...], int, bool]],
+    ) -> None:
+        """ Records the state of a game.
+
+        Parameters:
+            level_num: The index of the current level.
+            won: True iff every level has been completed.
+            did_level_up: True iff the last move completed a level.
+            num_moves: The number of moves the player has made.
+            position: The player's (row, column) position.
+            stats: The player's (HP, hunger, thirst).
+            inventory: (item name, items) for each item the player holds.
+            level_state: The state of the current level from Level.get_state,
+                         or None once the game has been won.
+        """
+        self._level_num = level_num
+        self._won = won
+        self._did_level_up = did_level_up
+        self._num_moves = num_moves
+        self._position = position
+        self._stats = stats
+        self._inventory = inventory
+        self._level_state = level_state
+
+    def get_level_num(self) -> int:
+        """ Returns the index of the current level. """
+        return self._level_num
+
+    def has_won(self) -> bool:
+        """ Returns True iff every level has been completed. """
+        return self._won
+
+    def did_level_up(self) -> bool:
+        """ Returns True iff the last move completed a level. """
+        return self._did_level_up
+
+    def get_num_moves(self) -> int:
+        """ Returns the number of moves the player has made. """
+        return self._num_moves
+
+    def get_player_position(self) -> tuple[int, int]:
+        """ Returns the player's (row, column) position. """
+        return self._position
+
+    def get_player_stats(self) -> tuple[int, int, int]:
+        """ Returns the player's (HP, hunger, thirst). """
+        return self._stats
+
+    def get_inventory(self) -> tuple[tuple[str, tuple[Item, ...]], ...]:
+        """ Returns (item name, items) for each item the player holds. """
+        return self._inventory
+
+    def get_inventory_counts(self) -> dict[str, int]:
+        """ Returns the number of each item the player holds. """
+        return {name: len(items) for name, items in self._inventory}
+
+    def get_level_state(self) -> Optional[tuple[tuple[tuple[tuple[int, int], Item], ...], int, bool]]:
+        """ Returns the state of the current level from Level.get_state, or
+            None once the game has been won.
+        """
+        return self._level_state
+
+    def _key(self) -> tuple:
+        """ Returns the values that distinguish this snapshot from others. """
+        level_state = self._level_state
+        return (self._level_num, self._won, self._num_moves, self._position,
+                self._stats, tuple((name, len(items)) for name, items in self._inventory),
+                None if level_state is None else level_state[1:])
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Snapshot) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return (f'Snapshot(level={self._level_num}, position={self._position}, '
+                f'stats={self._stats}, moves={self._num_moves})')
+
+
 class Model:
-    """ The overall model for a game of MazeRunner """
+    """ The overall model for a game of MazeRunner
+
+        Each call to move_player, attempt_collect_item, level_up or use_item
+        records what it changed in a ChangeSet. Subscribers are sent the
+        changes after each call; otherwise they accumulate until pop_changes.
+    """
     def __init__(self, game_file: str) -> None:
         """ Constructs a new game.
         
         Parameters:
-            game_file: The file containing the levels for this game.
+            game_file: The file containing the levels for this game, either a
+                       text game file or a compiled level pack.
         """
-        self._levels = load_game(game_file)
+        if is_level_pack(game_file):
+            self._levels = LevelPack(game_file, Level)
+        else:
+            self._levels = load_game(game_file)
         self._level_num = 0
         self._player = Player(self.get_level().get_player_start())
         self._won = False
         self._did_level_up = False
         self._num_moves = 0
         self._game_file = game_file
+        self._changes = ChangeSet()
+        self._subscribers = []
+        self._recording = False
+        # Maps level indices to the state each level was entered in
+        self._level_starts = {}
+        self._prefetch_next_level()
+
+    def subscribe(self, callback: Callable[[ChangeSet], None]) -> None:
+        """ Calls callback with the changes made by each model update from now
+            on. Changes sent to subscribers are not returned by pop_changes.
+
+        Parameters:
+            callback: Called with a ChangeSet after each update.
+        """
+        self._subscribers.append(callback)
+
+    def pop_changes(self) -> ChangeSet:
+        """ Returns the changes made since the last call, and starts a new
+            change set.
+        """
+        changes, self._changes = self._changes, ChangeSet()
+        return changes
+
+    @contextmanager
+    def _record_changes(self):
+        """ Adds the changes made to the player and level within the block to
+            the current change set, and sends them to any subscribers. Nested
+            blocks are recorded as part of the outermost one.
+        """
+        if self._recording:
+            yield
+            return
+
+        player, inventory = self._player, self._player.get_inventory()
+        level_num = self._level_num
+        position = player.get_position()
+        stats = self.get_player_stats()
+        counts = {name: len(items) for name, items in inventory.get_items().items()}
+        was_unlocked = self.get_current_maze().is_unlocked()
+        self._recording = True
+        try:
+            yield
+        finally:
+            self._recording = False
+
+        changes = self._changes
+        if self._level_num != level_num:
+            changes.set_new_level()
+        elif not was_unlocked and self.get_current_maze().is_unlocked():
+            changes.add_unlocked_doors(self.get_current_maze().get_door_positions())
+        changes.add_move(PLAYER, position, player.get_position())
+        changes.add_stat_deltas(tuple(
+            new - old for new, old in zip(self.get_player_stats(), stats)
+        ))
+        new_counts = {name: len(items) for name, items in inventory.get_items().items()}
+        for name in counts.keys() | new_counts.keys():
+            if new_counts.get(name, 0) != counts.get(name, 0):
+                changes.add_inventory_delta(name, new_counts.get(name, 0) - counts.get(name, 0))
+
+        if self._subscribers and not changes.is_empty():
+            self._changes = ChangeSet()
+            for callback in self._subscribers:
+                callback(changes)
 
     def has_won(self) -> bool:
         """ Returns True iff the game has been won (i.e. all levels have been
@@ -547,6 +1278,18 @@ class Model:
     def get_level(self) -> Level:
         """ Returns the current level. """
         return self._levels[self._level_num]
+
+    def get_level_num(self) -> int:
+        """ Returns the index of the current level, which is the number of
+            levels in the game once it has been won.
+        """
+        return self._level_num
+
+    def get_num_moves(self) -> int:
+        """ Returns the number of moves the player has made. Hunger and thirst
+            increase on every fifth move.
+        """
+        return self._num_moves
     
     def did_level_up(self) -> True:
         """ Returns True if the player just moved to the next level on the
@@ -558,39 +1301,52 @@ class Model:
         """ Changes the level to the next level from the file. If no more levels
             remain, the player has won the game.
         """
-        self._level_num += 1
-        if self._level_num >= len(self._levels):
-            self._won = True
-        else:
-            self._player.set_position(self.get_level().get_player_start())
-            self._did_level_up = True
+        with self._record_changes():
+            self._level_num += 1
+            if self._level_num >= len(self._levels):
+                self._won = True
+            else:
+                self._player.set_position(self.get_level().get_player_start())
+                self._did_level_up = True
+                if self._level_num not in self._level_starts:
+                    self._level_starts[self._level_num] = self.get_level().get_state()
+                self._prefetch_next_level()
+
+    def _prefetch_next_level(self) -> None:
+        """ When playing from a level pack, drops the finished level and starts
+            loading the next one in the background.
+        """
+        if isinstance(self._levels, LevelPack):
+            self._levels.release(self._level_num - 1)
+            self._levels.prefetch(self._level_num + 1)
 
     def move_player(self, delta: tuple[int, int]) -> None:
         """ Tries to move the player by the requested amount. Levels up if the
             user finishes the maze, """
-        self._did_level_up = False
-        old_pos = self._player.get_position()
-        position = row, col = old_pos[0] + delta[0], old_pos[1] + delta[1]
-        max_row, max_col = self.get_level().get_dimensions()
-
-        # Check if player has escaped the maze
-        if (row < 0 or row >= max_row or col < 0 or col >= max_col) and \
-            isinstance(self.get_current_maze().get_tile(old_pos), Door):
-            self.level_up()
-
-        # Move player if tile is non-blocking and update stats
-        else:
-            tile = self.get_current_maze().get_tile(position)
-            if not tile.is_blocking():
-                self._num_moves += 1
-        
-                if self._num_moves % 5 == 0:
-                    self._player.change_hunger(1)
-                    self._player.change_thirst(1)
-                self._player.change_health(-1 - tile.damage())
-
-                self._player.set_position(position)
-                self.attempt_collect_item(position)
+        with self._record_changes():
+            self._did_level_up = False
+            old_pos = self._player.get_position()
+            position = row, col = old_pos[0] + delta[0], old_pos[1] + delta[1]
+            max_row, max_col = self.get_level().get_dimensions()
+
+            # Check if player has escaped the maze
+            if (row < 0 or row >= max_row or col < 0 or col >= max_col) and \
+                isinstance(self.get_current_maze().get_tile(old_pos), Door):
+                self.level_up()
+
+            # Move player if tile is non-blocking and update stats
+            else:
+                tile = self.get_current_maze().get_tile(position)
+                if not tile.is_blocking():
+                    self._num_moves += 1
+            
+                    if self._num_moves % 5 == 0:
+                        self._player.change_hunger(1)
+                        self._player.change_thirst(1)
+                    self._player.change_health(-1 - tile.damage())
+
+                    self._player.set_position(position)
+                    self.attempt_collect_item(position)
     
     def attempt_collect_item(self, position: tuple[int, int]) -> None:
         """ Collect the item at the given position if one exists. Unlock door if
@@ -599,12 +1355,88 @@ class Model:
         Parameters:
             position: The position from which to attempt to collect an item.
         """
-        item = self.get_level().get_items().get(position)
-        if item is not None:
-            self._player.add_item(item)
-            self.get_level().remove_item(position)
-        self.get_level().attempt_unlock_door()
+        with self._record_changes():
+            item = self.get_level().get_items().get(position)
+            if item is not None:
+                self._player.add_item(item)
+                self.get_level().remove_item(position)
+                self._changes.add_removed_item(position, item)
+            self.get_level().attempt_unlock_door()
+
+    def use_item(self, item_name: str) -> bool:
+        """ Applies an item from the player's inventory to the player.
+
+        Parameters:
+            item_name: The name of the item to use.
+
+        Returns:
+            True iff the player had an item with that name.
+        """
+        with self._record_changes():
+            item = self._player.get_inventory().remove_item(item_name)
+            if item is not None:
+                item.apply(self._player)
+        return item is not None
         
+    def snapshot(self) -> Snapshot:
+        """ Returns the current state of the game, which restore can return
+            the game to. Snapshots share the game's mazes and items, so are
+            cheap enough to take before every move of a search.
+        """
+        player = self._player
+        level_state = None if self._won else self.get_level().get_state()
+        return Snapshot(
+            self._level_num,
+            self._won,
+            self._did_level_up,
+            self._num_moves,
+            player.get_position(),
+            (player.get_health(), player.get_hunger(), player.get_thirst()),
+            tuple((name, tuple(items))
+                  for name, items in player.get_inventory().get_items().items()),
+            level_state,
+        )
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """ Returns the game to the state in a snapshot taken from this model.
+            Subscribers are sent a change set for a new level, so that views
+            redraw everything.
+
+        Parameters:
+            snapshot: A snapshot from this model's snapshot method.
+        """
+        level_num = snapshot.get_level_num()
+        # Levels after the snapshot's may have been played since, so are
+        # returned to the state they were entered in
+        for later in range(level_num + 1, min(self._level_num, len(self._levels) - 1) + 1):
+            start = self._level_starts.get(later)
+            if start is not None:
+                self._levels[later].set_state(start)
+        level_changed = level_num != self._level_num
+        self._level_num = level_num
+        if snapshot.get_level_state() is not None:
+            self.get_level().set_state(snapshot.get_level_state())
+        if level_changed:
+            self._prefetch_next_level()
+
+        self._won = snapshot.has_won()
+        self._did_level_up = snapshot.did_level_up()
+        self._num_moves = snapshot.get_num_moves()
+        player = self._player
+        player.set_position(snapshot.get_player_position())
+        health, hunger, thirst = snapshot.get_player_stats()
+        player.change_health(health - player.get_health())
+        player.change_hunger(hunger - player.get_hunger())
+        player.change_thirst(thirst - player.get_thirst())
+        player.get_inventory().set_items(dict(snapshot.get_inventory()))
+
+        changes = self._changes
+        changes.set_new_level()
+        if self._subscribers:
+            self._changes = ChangeSet()
+            for callback in self._subscribers:
+                callback(changes)
+
     def get_player(self) -> Player:
         """ Returns the player in the game. """
         return self._player
@@ -649,6 +1481,7 @@ class MazeRunner:
     def _redraw(self) -> None:
         """ Redraws the entire view based on the current model state. """
         model = self._model
+        model.pop_changes()
         self._view.draw(
             model.get_current_maze(),
             model.get_current_items(),
@@ -657,6 +1490,18 @@ class MazeRunner:
             model.get_player_stats()
         )
 
+    def _update_view(self) -> None:
+        """ Updates the view with the changes made since it was last drawn. """
+        model = self._model
+        self._view.apply_changes(
+            model.pop_changes(),
+            model.get_current_maze(),
+            model.get_current_items(),
+            model.get_player().get_position(),
+            model.get_player_inventory(),
+            model.get_player_stats()
+        )
+
     def _user_prompt(self) -> None:
         """ Prompts the user for a move and updates model state accordingly. """
         move = input('\nEnter a move: ')
@@ -676,10 +1521,7 @@ class MazeRunner:
         # Player has attempted to use an item
         elif len(move) > 1 and move.split()[0] == 'i':
             item_name = move.partition(' ')[-1]
-            item = self._model.get_player().get_inventory().remove_item(item_name)
-            if item is not None:
-                item.apply(self._model.get_player())
-            else:
+            if not self._model.use_item(item_name):
                 print('\nNo item with that name!\n')
     
         # Invalid; reprompt
@@ -688,8 +1530,8 @@ class MazeRunner:
 
     def play(self):
         """ Executes the entire game until a win or loss occurs. """
+        self._redraw()
         while True:
-            self._redraw()
             self._user_prompt()
 
             if self._model.has_won():
@@ -698,6 +1540,7 @@ class MazeRunner:
             elif self._model.has_lost():
                 print(LOSS_MESSAGE)
                 break
+            self._update_view()
 
 def main():
     """ Entry-point to gameplay """
@@ -1,3 +1,4 @@
+import sys
 from constants import PLAYER
 
 class UserInterface:
@@ -23,6 +24,29 @@ class UserInterface:
         self._draw_inventory(inventory)
         self._draw_player_stats(player_stats)
     
+    def apply_changes(
+        self,
+        changes: 'ChangeSet',
+        maze: 'Maze',
+        items: dict[tuple[int, int], 'Item'],
+        player_position: tuple[int, int],
+        inventory: 'Inventory',
+        player_stats: tuple[int, int, int]
+    ) -> None:
+        """ Updates the view after the game state changed. Views that can
+            redraw only what changed override this; by default everything is
+            drawn again.
+        
+        Parameters:
+            changes: What changed since the view was last drawn
+            maze: The current Maze instance
+            items: The items on the maze
+            player_position: The position of the player
+            inventory: The player's current inventory
+            player_stats: The (HP, hunger, thirst) of the player
+        """
+        self.draw(maze, items, player_position, inventory, player_stats)
+    
     def _draw_inventory(self, inventory: 'Inventory') -> None:
         """ Draws the inventory information.
         
@@ -55,29 +79,131 @@ class UserInterface:
         raise NotImplementedError
 
 class TextInterface(UserInterface):
-    """ A MazeRunner interface that uses ascii to present information. """
+    """ A MazeRunner interface that uses ascii to present information.
+
+        Each frame is built in memory from a cached copy of the maze's
+        characters and written with a single write. In diff mode, frames after
+        the first only rewrite the parts of an ANSI terminal that changed.
+    """
+    def __init__(self, diff: bool = False) -> None:
+        """ Sets up a text interface.
+        
+        Parameters:
+            diff: If True, redraw by rewriting changed characters in place
+                  using ANSI escape codes, rather than printing every frame.
+        """
+        self._diff = diff
+        self._maze = None  # The maze whose characters are cached
+        self._grid = b''  # The maze's characters, with a newline after each row
+        self._last_lines = None  # Lines of the last frame written in diff mode
+
+    def draw(
+        self,
+        maze: 'Maze',
+        items: dict[tuple[int, int], 'Item'],
+        player_position: tuple[int, int],
+        inventory: 'Inventory',
+        player_stats: tuple[int, int, int]
+    ) -> None:
+        self._maze = None
+        self._write_frame(maze, items, player_position, inventory, player_stats)
+
+    def apply_changes(
+        self,
+        changes: 'ChangeSet',
+        maze: 'Maze',
+        items: dict[tuple[int, int], 'Item'],
+        player_position: tuple[int, int],
+        inventory: 'Inventory',
+        player_stats: tuple[int, int, int]
+    ) -> None:
+        # The cached characters only go out of date when the tiles change
+        if changes.is_new_level() or changes.get_unlocked_doors():
+            self._maze = None
+        self._write_frame(maze, items, player_position, inventory, player_stats)
+
+    def _write_frame(
+        self,
+        maze: 'Maze',
+        items: dict[tuple[int, int], 'Item'],
+        player_position: tuple[int, int],
+        inventory: 'Inventory',
+        player_stats: tuple[int, int, int]
+    ) -> None:
+        """ Writes the level, inventory and stats with a single write. """
+        frame = (self._level_text(maze, items, player_position)
+                 + self._inventory_text(inventory)
+                 + self._player_stats_text(player_stats))
+        if self._diff:
+            frame = self._diff_frame(frame)
+        sys.stdout.write(frame)
+
+    def _diff_frame(self, frame: str) -> str:
+        """ Returns ANSI escape codes and text that turn the last frame written
+            in diff mode into frame, leaving the cursor below it.
+        """
+        lines = frame.splitlines()
+        last_lines, self._last_lines = self._last_lines, lines
+        if last_lines is None:
+            return '\x1b[H\x1b[2J' + frame
+
+        output = []
+        for line_num, line in enumerate(lines):
+            last_line = last_lines[line_num] if line_num < len(last_lines) else ''
+            if line == last_line:
+                continue
+            start, limit = 0, min(len(line), len(last_line))
+            while start < limit and line[start] == last_line[start]:
+                start += 1
+            end = len(line)
+            if len(line) == len(last_line):
+                while end > start and line[end - 1] == last_line[end - 1]:
+                    end -= 1
+            output.append(f'\x1b[{line_num + 1};{start + 1}H{line[start:end]}')
+            if len(line) < len(last_line):
+                output.append('\x1b[K')
+        # Clear anything written below the frame since, such as the prompt
+        output.append(f'\x1b[{len(lines) + 1};1H\x1b[J')
+        return ''.join(output)
+
+    def _level_text(
+        self,
+        maze: 'Maze',
+        items: dict[tuple[int, int], 'Item'],
+        player_position: tuple[int, int]
+    ) -> str:
+        """ Returns the rows of the maze with the items and player on top. """
+        if self._maze is not maze:
+            self._maze = maze
+            self._grid = (str(maze) + '\n').encode('ascii')
+        row_length = maze.get_dimensions()[1] + 1
+        frame = bytearray(self._grid)
+        for (row, col), item in items.items():
+            frame[row * row_length + col] = ord(item.get_id())
+        row, col = player_position
+        frame[row * row_length + col] = ord(PLAYER)
+        return frame.decode('ascii')
+
+    def _inventory_text(self, inventory: 'Inventory') -> str:
+        """ Returns the inventory information. """
+        text = str(inventory) if inventory.get_items() != {} else 'Empty'
+        return '---------------\nInventory\n' + text + '\n' + '---------------\n'
+
+    def _player_stats_text(self, player_stats: tuple[int, int, int]) -> str:
+        """ Returns the player's stats. """
+        hp, hunger, thirst = player_stats
+        return f'HP: {hp}\nhunger: {hunger}\nthirst: {thirst}\n'
+
     def _draw_level(
         self,
         maze: 'Maze',
         items: dict[tuple[int, int], 'Item'],
         player_position: tuple[int, int]
     ) -> None:
-        num_rows, num_cols = maze.get_dimensions()
-        for row in range(num_rows):
-            row_str = ''
-            for col in range(num_cols):
-                if (row, col) == player_position:
-                    row_str += PLAYER
-                elif (row, col) in items:
-                    row_str += items.get((row, col)).get_id()
-                else:
-                    row_str += maze.get_tile((row, col)).get_id()
-            print(row_str)
+        sys.stdout.write(self._level_text(maze, items, player_position))
     
     def _draw_inventory(self, inventory: 'Inventory') -> None:
-        text = str(inventory) if inventory.get_items() != {} else 'Empty'
-        print('---------------\nInventory\n' + text + '\n' + '---------------')
+        sys.stdout.write(self._inventory_text(inventory))
     
     def _draw_player_stats(self, player_stats: tuple[int, int, int]) -> None:
-        hp, hunger, thirst = player_stats
-        print(f'HP: {hp}\nhunger: {hunger}\nthirst: {thirst}')
+        sys.stdout.write(self._player_stats_text(player_stats))
@@ -1,25 +1,47 @@
 import sys
 import tkinter as tk
 from tkinter import messagebox
-from typing import Union, Callable
-from PIL import ImageTk, Image
+from time import perf_counter
+from typing import Union, Callable, Optional
+from PIL import ImageTk
 
 from a3_support import AbstractGrid
 from a2_solution import *
 from constants import *
+from image_cache import ImageCache
+
+SHOP_IMAGE_SIZE = (200, 200)
+SHOP_ITEMS = (APPLE, WATER, HONEY, POTION, CANDY)
+# Cells are never drawn smaller than this many pixels across; larger mazes
+# scroll to follow the player
+MIN_CELL_SIZE = 20
+# Number of cells around the visible area that also have canvas items
+VIEWPORT_MARGIN = 10
+# The level is redrawn at most this many times per second
+FRAME_RATE = 60
 
 
 # Write your classes here
 # Task 1
 # 3.2.1 LevelView
 class LevelView(AbstractGrid):
-    """ displays the maze (tiles) along with the entities."""
+    """ displays the maze (tiles) along with the entities.
+
+    Canvas items are created once per level and kept between draws. Each draw
+    only updates the cells whose tile, item or player has changed since the
+    last one.
+
+    Cells are never drawn smaller than a minimum size. If the maze does not fit
+    in the view at that size, the canvas scrolls to follow the player and only
+    the cells within a margin of the visible area have canvas items.
+    """
 
     def __init__(
             self,
             master: Union[tk.Tk, tk.Frame],
             dimensions: tuple[int, int],
             size: tuple[int, int],
+            min_cell_size: int = MIN_CELL_SIZE,
             **kwargs
     ) -> None:
         """ Constructor for LevelView.
@@ -28,10 +50,53 @@ class LevelView(AbstractGrid):
             master: The master frame of this Canvas
             dimensions: the dimension of current level
             size: the width and height of level frame
+            min_cell_size: the smallest width and height of a cell in pixels
         """
+        self._min_cell_size = min_cell_size
         super().__init__(master, dimensions, size, **kwargs)
         self._dimensions = dimensions
 
+    def set_dimensions(self, dimensions: tuple[int, int]) -> None:
+        """ Sets the dimensions of the grid. The canvas items are rebuilt on the
+            next draw.
+
+        Parameters:
+            dimensions: (#rows, #columns)
+        """
+        super().set_dimensions(dimensions)
+        self._reset()
+
+    def get_cell_size(self) -> tuple[int, int]:
+        """ Returns the size of the cells (width, height) in pixels, which is at
+            least the minimum cell size.
+        """
+        width, height = super().get_cell_size()
+        return max(width, self._min_cell_size), max(height, self._min_cell_size)
+
+    def clear(self) -> None:
+        """ Clears the canvas and forgets every drawn cell. """
+        self._reset()
+
+    def _reset(self) -> None:
+        """ Deletes every canvas item, so the next draw starts from scratch. """
+        self.delete('all')
+        self._tile_items = {}  # Maps positions to the canvas items of tiles
+        self._row_ids = {}  # Maps rows to their tile IDs as last drawn
+        self._entities = {}  # Maps positions to (entity ID, canvas items)
+        self._player = None  # (position, canvas items) of the player
+        # (first row, first column, end row, end column) of the cells with
+        # canvas items
+        self._region = (0, 0, 0, 0)
+
+        rows, columns = self._dimensions
+        cell_width, cell_height = self.get_cell_size()
+        width, height = self._size
+        self.configure(scrollregion=(
+            0, 0, max(width, columns * cell_width), max(height, rows * cell_height)
+        ))
+        self.xview_moveto(0)
+        self.yview_moveto(0)
+
     def draw(
             self,
             tiles: list[list[Tile]],
@@ -45,32 +110,209 @@ class LevelView(AbstractGrid):
             items: The items on the maze
             player_pos: The position of the player
         """
+        created = self._update_tiles(tiles, self._follow(player_pos))
+        created = self._update_items(items) or created
+        self._update_player(player_pos, created)
+
+    def apply_changes(
+            self,
+            changes: ChangeSet,
+            tiles: list[list[Tile]],
+            items: dict[tuple[int, int], Item],
+            player_pos: tuple[int, int]
+    ) -> None:
+        """ Updates only the cells affected by changes since the last draw.
+        Falls back to draw for a new level, or when scrolling needs new cells.
+
+        Parameters:
+            changes: What changed in the model since the last draw
+            tiles: The tiles of the maze
+            items: The items on the maze
+            player_pos: The position of the player
+        """
+        if (changes.is_new_level() or self._player is None
+                or self._follow(player_pos) != self._region):
+            self.draw(tiles, items, player_pos)
+            return
+
+        for position in changes.get_removed_items():
+            entity = self._entities.pop(position, None)
+            if entity is not None:
+                self._remove_entity(entity[1])
+        created = False
+        if changes.get_unlocked_doors():
+            created = self._update_tiles(tiles, self._region)
+        self._update_player(player_pos, created)
+
+    def _follow(self, player_pos: tuple[int, int]) -> tuple[int, int, int, int]:
+        """ Scrolls the canvas so the player is as close to the centre as the
+            maze allows.
+
+        Returns:
+            The (first row, first column, end row, end column) of the cells
+            that should have canvas items.
+        """
         rows, columns = self._dimensions
+        cell_width, cell_height = self.get_cell_size()
+        width, height = self._size
+        maze_width, maze_height = columns * cell_width, rows * cell_height
+        if maze_width <= width and maze_height <= height:
+            return 0, 0, rows, columns
+
+        x_min = (player_pos[1] * cell_width + cell_width // 2) - width // 2
+        x_min = max(0, min(x_min, maze_width - width))
+        y_min = (player_pos[0] * cell_height + cell_height // 2) - height // 2
+        y_min = max(0, min(y_min, maze_height - height))
+        self.xview_moveto(x_min / max(width, maze_width))
+        self.yview_moveto(y_min / max(height, maze_height))
+
+        first_row, first_column = y_min // cell_height, x_min // cell_width
+        end_row = min(rows, (y_min + height) // cell_height + 1)
+        end_column = min(columns, (x_min + width) // cell_width + 1)
+        region_row, region_column, region_end_row, region_end_column = self._region
+        if (region_row <= first_row and region_column <= first_column
+                and end_row <= region_end_row and end_column <= region_end_column):
+            return self._region
+
+        # Leave a margin around the visible cells, so new canvas items are
+        # only needed every few moves
+        return (
+            max(0, first_row - VIEWPORT_MARGIN),
+            max(0, first_column - VIEWPORT_MARGIN),
+            min(rows, end_row + VIEWPORT_MARGIN),
+            min(columns, end_column + VIEWPORT_MARGIN),
+        )
 
-        # redraw the level
-        # draw tiles of current level
-        for row in range(rows):
-            for column in range(columns):
-                tile_name = tiles[row][column].get_id()
-                color = TILE_COLOURS[tile_name]
-                self.create_rectangle(self.get_bbox((row, column)), fill=color)
+    def _update_tiles(
+            self,
+            tiles: list[list[Tile]],
+            region: tuple[int, int, int, int]
+    ) -> bool:
+        """ Updates the cells whose tile has changed, e.g. unlocked doors, and
+            moves the canvas items to a new region.
 
-        # draw items on the maze
+        Returns:
+            True iff any canvas item was created.
+        """
+        first_row, first_column, end_row, end_column = region
+        moved = region != self._region
+        if moved:
+            for position in [
+                position for position in self._tile_items
+                if not _in_region(position, region)
+            ]:
+                self.delete(self._tile_items.pop(position))
+            self._region = region
+
+        tile_items, old_row_ids, row_ids = self._tile_items, self._row_ids, {}
+        created = False
+        for row in range(first_row, end_row):
+            ids = row_ids[row] = tile_row_ids(tiles[row])
+            old_ids = old_row_ids.get(row)
+            if ids == old_ids and not moved:
+                continue
+            for column in range(first_column, end_column):
+                canvas_item = tile_items.get((row, column))
+                if canvas_item is None:
+                    tile_items[row, column] = self._create_tile((row, column), ids[column])
+                    created = True
+                elif old_ids[column] != ids[column]:
+                    self._configure_tile(canvas_item, (row, column), ids[column])
+        self._row_ids = row_ids
+        return created
+
+    def _update_items(self, items: dict[tuple[int, int], Item]) -> bool:
+        """ Removes items that are gone and draws new ones within the region.
+
+        Returns:
+            True iff any item was drawn.
+        """
+        region = first_row, first_column, end_row, end_column = self._region
+        if region != (0, 0) + tuple(self._dimensions):
+            if (end_row - first_row) * (end_column - first_column) < len(items):
+                positions = (
+                    (row, column)
+                    for row in range(first_row, end_row)
+                    for column in range(first_column, end_column)
+                )
+                items = {
+                    position: items[position] for position in positions
+                    if position in items
+                }
+            else:
+                items = {
+                    position: item for position, item in items.items()
+                    if _in_region(position, region)
+                }
+
+        drawn = self._entities
+        for position in [
+            position for position, (entity_id, _) in drawn.items()
+            if position not in items or items[position].get_id() != entity_id
+        ]:
+            self._remove_entity(drawn.pop(position)[1])
+
+        created = False
         for position, item in items.items():
-            item_id = item.get_id()
-            color = ENTITY_COLOURS[item_id]
-            self.create_oval(self.get_bbox(position), fill=color)
-            self.create_text(self.get_midpoint(position), text=item_id, font=TEXT_FONT)
+            if position not in drawn:
+                entity_id = item.get_id()
+                drawn[position] = entity_id, self._create_entity(position, entity_id)
+                created = True
+        return created
+
+    def _update_player(self, player_pos: tuple[int, int], raise_player: bool) -> None:
+        """ Moves the player to player_pos, keeping it above any items. """
+        if self._player is None:
+            self._player = player_pos, self._create_entity(player_pos, PLAYER)
+            return
+
+        old_pos, canvas_items = self._player
+        if old_pos != player_pos:
+            cell_width, cell_height = self.get_cell_size()
+            delta_x = (player_pos[1] - old_pos[1]) * cell_width
+            delta_y = (player_pos[0] - old_pos[0]) * cell_height
+            for canvas_item in canvas_items:
+                self.move(canvas_item, delta_x, delta_y)
+            self._player = player_pos, canvas_items
+        if raise_player:
+            for canvas_item in canvas_items:
+                self.tag_raise(canvas_item)
+
+    def _create_tile(self, position: tuple[int, int], tile_id: str) -> int:
+        """ Creates the canvas item for a tile and returns its ID. """
+        return self.create_rectangle(self.get_bbox(position), fill=TILE_COLOURS[tile_id])
+
+    def _configure_tile(self, canvas_item: int, position: tuple[int, int], tile_id: str) -> None:
+        """ Changes the tile drawn by an existing canvas item. """
+        self.itemconfigure(canvas_item, fill=TILE_COLOURS[tile_id])
+
+    def _create_entity(self, position: tuple[int, int], entity_id: str) -> tuple[int, ...]:
+        """ Creates the canvas items for an item or the player. """
+        return (
+            self.create_oval(self.get_bbox(position), fill=ENTITY_COLOURS[entity_id]),
+            self.create_text(self.get_midpoint(position), text=entity_id, font=TEXT_FONT),
+        )
+
+    def _remove_entity(self, canvas_items: tuple[int, ...]) -> None:
+        """ Deletes the canvas items of an item. """
+        self.delete(*canvas_items)
+
 
-        # draw player
-        color = ENTITY_COLOURS[PLAYER]
-        self.create_oval(self.get_bbox(player_pos), fill=color)
-        self.create_text(self.get_midpoint(player_pos), text='P', font=TEXT_FONT)
+def _in_region(position: tuple[int, int], region: tuple[int, int, int, int]) -> bool:
+    """ Returns True iff position is within the (first row, first column,
+        end row, end column) region.
+    """
+    first_row, first_column, end_row, end_column = region
+    return first_row <= position[0] < end_row and first_column <= position[1] < end_column
 
 
 # 3.2.2 StatsView
 class StatsView(AbstractGrid):
-    """ Displays the player’s stats (HP, health, thirst), along with the number of coins collected. """
+    """ Displays the player’s stats (HP, health, thirst), along with the number of coins collected.
+
+    Each annotation is a text item that is kept between draws and only
+    reconfigured when its text changes.
+    """
 
     def __init__(
             self,
@@ -86,6 +328,28 @@ class StatsView(AbstractGrid):
         """
         super().__init__(master, (2, 4), (width, STATS_HEIGHT), **kwargs)
         self.config(bg=THEME_COLOUR)
+        self._annotations = {}  # Maps positions to (text, canvas item)
+
+    def annotate_position(self, position: tuple[int, int], text: str) -> None:
+        """ Shows text in the cell at the given (row, col) position, replacing
+            any text already there.
+
+        Parameters:
+            position: The (row, col) cell position.
+            text: The text to draw.
+        """
+        annotation = self._annotations.get(position)
+        if annotation is None:
+            canvas_item = self.create_text(self.get_midpoint(position), text=text, font=TEXT_FONT)
+            self._annotations[position] = text, canvas_item
+        elif annotation[0] != text:
+            self.itemconfigure(annotation[1], text=text)
+            self._annotations[position] = text, annotation[1]
+
+    def clear(self) -> None:
+        """ Clears all text off the canvas. """
+        super().clear()
+        self._annotations = {}
 
     def draw_stats(self, player_stats: tuple[int, int, int]) -> None:
         """ Draw player stats: HP, hunger, thirst.
@@ -112,7 +376,11 @@ class StatsView(AbstractGrid):
 
 # 3.2.3 InventoryView
 class InventoryView(tk.Frame):
-    """ Displays the items in player inventory. """
+    """ Displays the items in player inventory.
+
+    Labels are kept between draws. Only the counts that change are updated,
+    and labels are only created or destroyed when an item is gained or used up.
+    """
 
     def __init__(self, master: Union[tk.Tk, tk.Frame], **kwargs) -> None:
         """ Creates a new InventoryView within master.
@@ -122,6 +390,9 @@ class InventoryView(tk.Frame):
         """
         self.master = master
         super().__init__(self.master, **kwargs)
+        self._callback = None
+        self._title = None
+        self._labels = {}  # Maps item names to (count, label, StringVar)
 
     def set_click_callback(self, callback: Callable[[str], None]) -> None:
         """ Sets the function to be called when an item is clicked.
@@ -136,21 +407,33 @@ class InventoryView(tk.Frame):
         """ Clears all child widgets from this InventoryView. """
         for widget in self.winfo_children():
             widget.destroy()
+        self._title = None
+        self._labels = {}
+
+    def _click(self, name: str) -> None:
+        """ Calls the click callback, if one has been set, with an item name. """
+        if self._callback:
+            self._callback(name)
 
     def _draw_item(self, name: str, num: int, colour: str) -> None:
-        """ Creates and binds a single tk.Label in the InventoryView frame.
+        """ Shows the quantity of an item, creating and binding a tk.Label
+        for it in the InventoryView frame if there is not one already.
 
         parameter:
             name: the name of the item
             num: the number of item in inventory
             colour: the background colour of item label.
         """
-        self.label = label = tk.Label(self, text=f"{name}: {num}", bg=colour, font=TEXT_FONT)
-        label.pack(fill=tk.X)
-
-        # binds if a callback exists
-        if self._callback:
-            label.bind("<Button>", lambda e: self._callback(name))
+        drawn = self._labels.get(name)
+        if drawn is None:
+            text = tk.StringVar(self, f"{name}: {num}")
+            self.label = label = tk.Label(self, textvariable=text, bg=colour, font=TEXT_FONT)
+            label.pack(fill=tk.X)
+            label.bind("<Button>", lambda e: self._click(name))
+            self._labels[name] = num, label, text
+        elif drawn[0] != num:
+            drawn[2].set(f"{name}: {num}")
+            self._labels[name] = num, drawn[1], drawn[2]
 
     def draw_inventory(self, inventory: Inventory) -> None:
         """ Draws any 'non-coin' inventory items with their quantities
@@ -159,13 +442,25 @@ class InventoryView(tk.Frame):
         Parameter:
             inventory: the player inventory
         """
-        inventory_title = tk.Label(self, text="Inventory", font=HEADING_FONT)
-        inventory_title.pack(fill=tk.X)
+        if self._title is None:
+            self._title = tk.Label(self, text="Inventory", font=HEADING_FONT)
+            self._title.pack(fill=tk.X)
         items = inventory.get_items()
-        for key in items:
-            if key != 'Coin':
-                colour = ENTITY_COLOURS[items[key][0].get_id()]
-                self._draw_item(key, len(items[key]), colour)
+
+        # Remove the labels of used up items, and of any that are out of
+        # order because they were used up and gained again since. New labels
+        # go at the end, so the labels stay in inventory order.
+        names = [key for key in items if key != 'Coin']
+        num_kept = 0
+        for name in list(self._labels):
+            if num_kept < len(names) and names[num_kept] == name:
+                num_kept += 1
+            else:
+                self._labels.pop(name)[1].destroy()
+
+        for key in names:
+            colour = ENTITY_COLOURS[items[key][0].get_id()]
+            self._draw_item(key, len(items[key]), colour)
 
 
 # 3.2.4 GraphicalInterface
@@ -177,6 +472,7 @@ class GraphicalInterface(UserInterface):
             master: the master frame of this canvas.
         """
         self.master = master
+        self.image_cache = ImageCache()
         title = tk.Label(master, text='MazeRunner', font=BANNER_FONT, background=THEME_COLOUR)
         title.pack(fill=tk.X)
 
@@ -186,6 +482,26 @@ class GraphicalInterface(UserInterface):
         self.control_view.draw_timer(self.timer)
         self.master.after(1000, self._step)
 
+    def preload_images(self, dimensions: tuple[int, int]) -> None:
+        """ Starts decoding the images the interface will need for a level of
+            the given dimensions in the background.
+
+        Parameter:
+            dimensions: (#rows, #columns) of the first level to be drawn
+        """
+        images = []
+        if TASK != 1:
+            # The same size as LevelView.get_cell_size, so that the images
+            # preloaded are the ones drawn
+            rows, columns = dimensions
+            cell_size = (max(MAZE_WIDTH // columns, MIN_CELL_SIZE),
+                         max(MAZE_HEIGHT // rows, MIN_CELL_SIZE))
+            for filename in list(TILE_IMAGES.values()) + list(ENTITY_IMAGES.values()):
+                images.append((filename, cell_size))
+        if TASK == 3:
+            images.extend((ENTITY_IMAGES[item], SHOP_IMAGE_SIZE) for item in SHOP_ITEMS)
+        self.image_cache.preload(self.master, images)
+
     def create_interface(self, dimensions: tuple[int, int]) -> None:
         """ Creates the components (level, inventory, stats view) in the master frame for this interface. """
         # frame for level & inventory
@@ -199,7 +515,7 @@ class GraphicalInterface(UserInterface):
         if TASK == 1:
             self.level_view = LevelView(frame, dimensions, size)
         else:
-            self.level_view = ImageLevelView(frame, dimensions, size)
+            self.level_view = ImageLevelView(frame, dimensions, size, self.image_cache)
         self.level_view.pack(side=tk.LEFT)
 
         # Inventory View
@@ -228,7 +544,8 @@ class GraphicalInterface(UserInterface):
             buy_item: the callback when buying an item in the shop.
         """
         self.timer = 0
-        self.control_view = ControlsFrame(self.master, restart, new_game, buy_item, self.timer)
+        self.control_view = ControlsFrame(
+            self.master, restart, new_game, buy_item, self.timer, self.image_cache)
         self.control_view.pack(fill=tk.X, expand=tk.TRUE)
         self.master.after(1000, self._step)
 
@@ -280,7 +597,8 @@ class GraphicalInterface(UserInterface):
             inventory: Inventory,
             player_stats: tuple[int, int, int]
     ) -> None:
-        """ Clear the three major components and redraw them with the new state.
+        """ Redraw the three major components with the new state. Each view
+        keeps its widgets and only updates what has changed.
 
         Parameter:
             maze: maze of current level
@@ -289,11 +607,35 @@ class GraphicalInterface(UserInterface):
             inventory: the player inventory
             player_stats: player (HP, hunger, thirst)
         """
-        self.clear_all()
         self._draw_level(maze, items, player_position)
         self._draw_player_stats(player_stats)
         self._draw_inventory(inventory)
 
+    def apply_changes(
+            self,
+            changes: ChangeSet,
+            maze: Maze,
+            items: dict[tuple[int, int], Item],
+            player_position: tuple[int, int],
+            inventory: Inventory,
+            player_stats: tuple[int, int, int]
+    ) -> None:
+        """ Update only the components affected by the changes since the last draw.
+
+        Parameter:
+            changes: what changed in the model since the last draw
+            maze: maze of current level
+            items: items on the maze
+            player_position: (#row, #column)
+            inventory: the player inventory
+            player_stats: player (HP, hunger, thirst)
+        """
+        self.level_view.apply_changes(changes, maze.get_tiles(), items, player_position)
+        if any(changes.get_stat_deltas()):
+            self._draw_player_stats(player_stats)
+        if changes.get_inventory_deltas():
+            self._draw_inventory(inventory)
+
     def _draw_inventory(self, inventory: Inventory) -> None:
         """ Draw both the non-coin items on the inventory view and the coins on the stats view.
 
@@ -330,6 +672,95 @@ class GraphicalInterface(UserInterface):
         self.stats_view.draw_stats(player_stats)
 
 
+class RedrawScheduler:
+    """ Coalesces requests to redraw into at most one redraw per frame.
+
+    A redraw waits until Tk is idle, so every queued key event is handled
+    first, and starts no sooner than one frame after the previous redraw.
+    Requests made while a redraw is already pending are counted as dropped
+    frames, since that redraw covers them.
+    """
+
+    def __init__(self, master: tk.Misc, redraw: Callable[[], None],
+                 frame_rate: int = FRAME_RATE) -> None:
+        """ Creates a scheduler with no redraw pending.
+
+        Parameter:
+            master: the widget whose event loop runs the redraws
+            redraw: the function that redraws the view
+            frame_rate: the maximum number of redraws per second
+        """
+        self._master = master
+        self._redraw = redraw
+        self._frame_time = 1 / frame_rate
+        self._pending = None  # The after ID of the pending redraw
+        self._last_redraw = None  # When the last redraw started
+        self._frames_drawn = 0
+        self._frames_dropped = 0
+        self._total_time = 0.0
+        self._max_time = 0.0
+
+    def request(self) -> None:
+        """ Marks the view as needing a redraw, scheduling one unless one is
+            already pending.
+        """
+        if self._pending is not None:
+            self._frames_dropped += 1
+            return
+        wait = 0
+        if self._last_redraw is not None:
+            wait = self._last_redraw + self._frame_time - perf_counter()
+        if wait > 0:
+            self._pending = self._master.after(max(1, round(1000 * wait)), self._run)
+        else:
+            self._pending = self._master.after_idle(self._run)
+
+    def flush(self) -> None:
+        """ Runs the pending redraw now, if there is one. """
+        if self._pending is not None:
+            self._master.after_cancel(self._pending)
+            self._run()
+
+    def cancel(self) -> None:
+        """ Cancels the pending redraw, e.g. when the view is redrawn in full. """
+        if self._pending is not None:
+            self._master.after_cancel(self._pending)
+            self._pending = None
+
+    def _run(self) -> None:
+        """ Redraws the view and records how long it took. """
+        self._pending = None
+        self._last_redraw = start = perf_counter()
+        self._redraw()
+        frame_time = perf_counter() - start
+        self._frames_drawn += 1
+        self._total_time += frame_time
+        self._max_time = max(self._max_time, frame_time)
+
+    def get_frames_drawn(self) -> int:
+        """ Returns the number of redraws run. """
+        return self._frames_drawn
+
+    def get_frames_dropped(self) -> int:
+        """ Returns the number of requests covered by an already pending redraw. """
+        return self._frames_dropped
+
+    def get_mean_frame_time(self) -> float:
+        """ Returns the mean time taken by a redraw in seconds. """
+        return self._total_time / self._frames_drawn if self._frames_drawn else 0.0
+
+    def get_max_frame_time(self) -> float:
+        """ Returns the longest time taken by a redraw in seconds. """
+        return self._max_time
+
+    def report(self) -> str:
+        """ Returns a summary of the frames drawn and dropped and their times. """
+        return (f'{self._frames_drawn} frames drawn, '
+                f'{self._frames_dropped} dropped, '
+                f'mean frame time {1000 * self.get_mean_frame_time():.2f}ms, '
+                f'max {1000 * self._max_time:.2f}ms')
+
+
 # 3.3 controller class
 # 3.3.1 GraphicalMazeRunner
 class GraphicalMazeRunner(MazeRunner):
@@ -345,8 +776,13 @@ class GraphicalMazeRunner(MazeRunner):
         """
         self.root = root
         self._game_file = game_file
-        self.model = Model(game_file)
+        # Moves are applied to the model as keys arrive, but the view is only
+        # redrawn once per frame, with every change since the last redraw
+        self.redraw_scheduler = RedrawScheduler(root, self._draw_changes)
+        self._set_model(game_file)
         self.graphical_interface = GraphicalInterface(root)
+        # Decode images while the rest of the window is built
+        self.graphical_interface.preload_images(self.model.get_level().get_dimensions())
 
     def _handle_keypress(self, e: tk.Event) -> None:
         """ Handles a keypress.
@@ -363,19 +799,42 @@ class GraphicalMazeRunner(MazeRunner):
                     new_dimensions = self.model.get_level().get_dimensions()
                     self.graphical_interface.set_maze_dimensions(new_dimensions)
 
-        # determine win or lose game
+        # determine win or lose game, without drawing the final move
         if self.model.has_won():
+            self.redraw_scheduler.cancel()
             messagebox.showinfo(message=WIN_MESSAGE)
         elif self.model.has_lost():
+            self.redraw_scheduler.cancel()
             messagebox.showinfo(message=LOSS_MESSAGE)
-        else:
-            self._draw()
+
+    def _set_model(self, game_file: str) -> None:
+        """ Starts a new model from game_file, whose changes are redrawn by the scheduler.
+
+        Parameter:
+            game_file: Path to the file from which the game levels are loaded
+        """
+        self.model = Model(game_file)
+        self._changes = ChangeSet()
+        self.model.subscribe(self._handle_changes)
+
+    def _handle_changes(self, changes: ChangeSet) -> None:
+        """ Keeps the changes from a model update to be drawn in the next frame.
+
+        Parameter:
+            changes: what changed in the model
+        """
+        self._changes.merge(changes)
+        # Once the game is over there is no level left to draw
+        if not (self.model.has_won() or self.model.has_lost()):
+            self.redraw_scheduler.request()
 
     def _draw(self) -> None:
         """ Redraw the graphical interface with updated information. """
         level = self.model.get_level()
         player = self.model.get_player()
 
+        self.redraw_scheduler.cancel()
+        self._changes = ChangeSet()
         self.graphical_interface.draw(
             level.get_maze(),
             level.get_items(),
@@ -383,19 +842,33 @@ class GraphicalMazeRunner(MazeRunner):
             player.get_inventory(),
             self.model.get_player_stats())
 
+    def _draw_changes(self) -> None:
+        """ Update the graphical interface with the changes made since it was last drawn. """
+        if self.model.has_won():
+            return
+        level = self.model.get_level()
+        player = self.model.get_player()
+
+        changes, self._changes = self._changes, ChangeSet()
+        self.graphical_interface.apply_changes(
+            changes,
+            level.get_maze(),
+            level.get_items(),
+            player.get_position(),
+            player.get_inventory(),
+            self.model.get_player_stats())
+
     def _apply_item(self, item_name: str) -> None:
         """ Attempts to apply an item with the given name to the player.
 
         Parameter:
             item_name: the name of item that will be applied.
         """
-        item = self.model.get_player().get_inventory().remove_item(item_name)
-        item.apply(self.model.get_player())
-        self._draw()
+        self.model.use_item(item_name)
 
     def _restart_game(self) -> None:
         """ Reset the model with current game_file. """
-        self.model = Model(self._game_file)
+        self._set_model(self._game_file)
         dimensions = self.model.get_current_maze().get_dimensions()
         self.graphical_interface.set_maze_dimensions(dimensions)
         self.graphical_interface.timer = 0
@@ -418,7 +891,7 @@ class GraphicalMazeRunner(MazeRunner):
         # start a new game if input file name is valid
         try:
             self._game_file = self.entry.get()
-            self.model = Model(self._game_file)
+            self._set_model(self._game_file)
             self.view.destroy()
             dimensions = self.model.get_current_maze().get_dimensions()
             self.graphical_interface.set_maze_dimensions(dimensions)
@@ -456,7 +929,7 @@ class GraphicalMazeRunner(MazeRunner):
                 line = line.strip()
                 if line.startswith('game_file'):
                     self._game_file = game_file = line.partition(": ")[2]
-                    self.model = Model(game_file)
+                    self._set_model(game_file)
                 if line.startswith('dimensions'):
                     dimensions = tuple(eval(line.partition(': ')[2]))
                 if line.startswith('level_num'):
@@ -466,7 +939,7 @@ class GraphicalMazeRunner(MazeRunner):
                     self.graphical_interface.timer = int(timer)
                 if line.startswith('items'):
                     items = eval(line.partition(": ")[2])
-                    self.model.get_level()._items = items
+                    self.model.get_level().set_items(items)
                 if line.startswith('player_pos'):
                     player_pos = eval(line.partition(": ")[2])
                     self.model.get_player()._position = player_pos
@@ -497,6 +970,9 @@ class GraphicalMazeRunner(MazeRunner):
             CANDY: Candy((0, 0))
         }
 
+        # draw any pending changes so that coin_num is up to date
+        self.redraw_scheduler.flush()
+
         # add item to inventory if player has enough coins
         # remove coins from inventory according to the price
         if item_name in (APPLE, WATER):
@@ -533,14 +1009,23 @@ class GraphicalMazeRunner(MazeRunner):
 
 
 # 4.1 ImageLevelView: work when TASK = 2
-class ImageLevelView(AbstractGrid):
-    """ This is an extension of existing LevelView and images will be used to display the tiles and entities. """
+class ImageLevelView(LevelView):
+    """ This is an extension of existing LevelView and images will be used to display the tiles and entities.
+
+    Images come from an ImageCache, so every cell showing the same tile or
+    entity shares one PhotoImage. The tiles of the level (or, on large mazes,
+    of the cells around the visible area) are composited into a single image
+    when first drawn. Only tiles that change after that, such as unlocked
+    doors, get canvas items of their own.
+    """
+    _cell_size = None
 
     def __init__(
             self,
             master: Union[tk.Tk, tk.Frame],
             dimensions: tuple[int, int],
             size: tuple[int, int],
+            image_cache: Optional[ImageCache] = None,
             **kwargs
     ) -> None:
         """ Constructor for ImageLevelView.
@@ -549,63 +1034,142 @@ class ImageLevelView(AbstractGrid):
             master: The master frame for this Canvas.
             dimensions: (#rows, #columns)
             size: The width and height in pixels of the LevelView.
+            image_cache: The cache to take images from. A new one is made if
+                         none is given.
         """
         super().__init__(master, dimensions, size, **kwargs)
         self.master = master
-        self._tiles_images, self._entities_images = {}, {}
         self._size = size
+        self._image_cache = image_cache if image_cache is not None else ImageCache()
 
-    def draw(
+    def set_dimensions(self, dimensions: tuple[int, int]) -> None:
+        """ Sets the dimensions of the grid, dropping cached images of the old
+            cell size if it has changed.
+
+        Parameters:
+            dimensions: (#rows, #columns)
+        """
+        super().set_dimensions(dimensions)
+        cell_size = self.get_cell_size()
+        if self._cell_size not in (None, cell_size):
+            self._image_cache.discard_size(self._cell_size)
+        self._cell_size = cell_size
+
+    def _reset(self) -> None:
+        """ Deletes every canvas item, including the tile layer. """
+        self._layer = None  # Canvas item showing the composited tiles
+        self._layer_photo = None
+        self._layer_ids = {}  # Maps rows to their tile IDs in the layer
+        super()._reset()
+
+    def _update_tiles(
             self,
             tiles: list[list[Tile]],
-            items: dict[tuple[int, int], Item],
-            player_pos: tuple[int, int]
-    ) -> None:
-        """ Draw current level using images.
+            region: tuple[int, int, int, int]
+    ) -> bool:
+        """ Shows the tiles of the region as one composited image, with images
+            on top for the cells whose tile has changed since it was made.
 
-        Parameters:
-            tiles: The tiles of current level.
-            items: The items on current maze.
-            player_pos: Current position of player.
+        Returns:
+            True iff any canvas item was created.
         """
-        rows, columns = self._dimensions
-        # draw tiles of current level
-        for row in range(rows):
-            for column in range(columns):
-                tile_id = tiles[row][column].get_id()
-                # draw with images
-                self._load_image(TILE_IMAGES, tile_id, (row, column))
-
-        # draw items on the maze
-        for position, item in items.items():
-            item_id = item.get_id()
-            self._load_image(ENTITY_IMAGES, item_id, position)
+        first_row, first_column, end_row, end_column = region
+        row_ids = {row: tile_row_ids(tiles[row]) for row in range(first_row, end_row)}
+        if region != self._region or self._layer is None:
+            self._create_layer(row_ids, region)
+            self._row_ids = row_ids
+            return True
+
+        created = False
+        for row, ids in row_ids.items():
+            old_ids, layer_ids = self._row_ids[row], self._layer_ids[row]
+            if ids == old_ids:
+                continue
+            for column in range(first_column, end_column):
+                tile_id = ids[column]
+                if tile_id == old_ids[column]:
+                    continue
+                position = row, column
+                canvas_item = self._tile_items.get(position)
+                if tile_id == layer_ids[column]:
+                    self.delete(self._tile_items.pop(position))
+                elif canvas_item is None:
+                    canvas_item = self._create_tile(position, tile_id)
+                    self._tile_items[position] = canvas_item
+                    self.tag_raise(canvas_item, self._layer)
+                    created = True
+                else:
+                    self._configure_tile(canvas_item, position, tile_id)
+        self._row_ids = row_ids
+        return created
+
+    def _create_layer(
+            self,
+            row_ids: dict[int, str],
+            region: tuple[int, int, int, int]
+    ) -> None:
+        """ Replaces the tile layer and any changed tiles with a new layer
+            covering region.
+        """
+        first_row, first_column, end_row, end_column = region
+        if self._tile_items:
+            self.delete(*self._tile_items.values())
+        self._tile_items = {}
+        if self._layer is not None:
+            self.delete(self._layer)
+
+        layout = tuple(ids[first_column:end_column] for ids in row_ids.values())
+        cell_width, cell_height = cell_size = self.get_cell_size()
+        self._layer_photo = self._image_cache.get_layer(layout, cell_size, TILE_IMAGES)
+        self._layer = self.create_image(
+            first_column * cell_width,
+            first_row * cell_height,
+            image=self._layer_photo,
+            anchor=tk.NW,
+        )
+        self.tag_lower(self._layer)
+        self._layer_ids = row_ids
+        self._region = region
+
+    def _create_tile(self, position: tuple[int, int], tile_id: str) -> int:
+        """ Creates the image of a tile and returns its canvas item. """
+        return self._load_image(TILE_IMAGES, tile_id, position)
+
+    def _configure_tile(self, canvas_item: int, position: tuple[int, int], tile_id: str) -> None:
+        """ Shows a different tile image in an existing canvas item. """
+        self.itemconfigure(canvas_item, image=self._open_image(TILE_IMAGES, tile_id))
 
-        # draw player
-        self._load_image(ENTITY_IMAGES, PLAYER, player_pos)
+    def _create_entity(self, position: tuple[int, int], entity_id: str) -> tuple[int, ...]:
+        """ Creates the image of an item or the player. """
+        return (self._load_image(ENTITY_IMAGES, entity_id, position),)
+
+    def _open_image(self, img_dict: dict, image_name: str) -> ImageTk.PhotoImage:
+        """ Returns the image of a tile or entity, scaled to the cell size.
+
+        Parameter:
+            img_dict: The image file name of tiles or entities.
+            image_name: The name of tile or entity that will be loaded.
+        """
+        return self._image_cache.get(img_dict[image_name], self.get_cell_size())
 
     def _load_image(
             self,
             img_dict: dict,
             image_name: str,
             position: tuple
-    ) -> None:
+    ) -> int:
         """ Load images of tiles and entities.
 
         Parameter:
             img_dict: The image file name of tiles or entities.
             image_name: The name of tile or entity that will be loaded.
             position: The position of loaded tile or entity.
-        """
-        img_open = Image.open("images/" + img_dict[image_name])
-        img_open = img_open.resize(self.get_cell_size())
-        img_png = ImageTk.PhotoImage(img_open)
-        if img_dict == TILE_IMAGES:
-            self._tiles_images[position] = img_png
-        else:
-            self._entities_images[position] = img_png
 
-        self.create_image(self.get_midpoint(position), image=img_png)
+        Returns:
+            The canvas item showing the image.
+        """
+        img_png = self._open_image(img_dict, image_name)
+        return self.create_image(self.get_midpoint(position), image=img_png)
 
 
 # 4.2 Controls Frame
@@ -617,6 +1181,7 @@ class ControlsFrame(tk.Frame):
             new_game: Callable,
             buy_item=None,
             time=0,
+            image_cache: Optional[ImageCache] = None,
             **kwargs
     ) -> None:
         """ Creates a new controls view within master.
@@ -627,12 +1192,14 @@ class ControlsFrame(tk.Frame):
             new_game: to be called when click on New game
             buy_item: to be called when the user click on items in the shop
             timer: the seconds that have elapsed since the current game began
+            image_cache: the cache to take shop images from
         """
         super().__init__(master, **kwargs)
         self.master = master
         self.restart = restart
         self.new_game = new_game
         self.buy_item = buy_item
+        self._image_cache = image_cache if image_cache is not None else ImageCache()
         self._shop_images = {}
         self.time = time
         self.draw()
@@ -657,7 +1224,8 @@ class ControlsFrame(tk.Frame):
         timer_title = tk.Label(self.time_frame, text="Timer")
         timer_title.pack()
 
-        self.time_label = tk.Label(self.time_frame, text=f"{minutes}m {seconds}s")
+        self._time_text = tk.StringVar(self, f"{minutes}m {seconds}s")
+        self.time_label = tk.Label(self.time_frame, textvariable=self._time_text)
         self.time_label.pack(side=tk.LEFT, expand=tk.TRUE)
 
     def shop_view(self) -> None:
@@ -668,11 +1236,8 @@ class ControlsFrame(tk.Frame):
         title.pack(fill=tk.X, expand=tk.TRUE)
 
         # load images of items in the shop
-        for item in (APPLE, WATER, HONEY, POTION, CANDY):
-            img_open = Image.open("images/" + ENTITY_IMAGES[item])
-            img_open = img_open.resize((200, 200))
-            img_png = ImageTk.PhotoImage(img_open)
-            self._shop_images[item] = img_png
+        for item in SHOP_ITEMS:
+            self._shop_images[item] = self._image_cache.get(ENTITY_IMAGES[item], SHOP_IMAGE_SIZE)
 
         frame1 = tk.Frame(view)
         frame1.pack(fill=tk.BOTH, expand=tk.TRUE)
@@ -711,9 +1276,7 @@ class ControlsFrame(tk.Frame):
         Parameter:
             time: the seconds that have elapsed since current game began
         """
-        self.time_label.destroy()
-        self.time_label = tk.Label(self.time_frame, text=f"{time // 60}m {time % 60}s")
-        self.time_label.pack(side=tk.LEFT, expand=tk.TRUE)
+        self._time_text.set(f"{time // 60}m {time % 60}s")
 
 
 # 5.2 Candy
@@ -760,16 +1323,26 @@ class FileMenu(GraphicalMazeRunner):
 
 
 # 3.4 play_game function
-def play_game(root: tk.Tk):
+def play_game(root: tk.Tk, show_stats: bool = False):
     """ 1. Construct the controller instance.
         2. Cause gameplay to commence.
         3. Ensure the root window stays opening listening for events.
+
+    Parameter:
+        root: the root of the GUI
+        show_stats: print the redraw scheduler's frame statistics on exit
     """
     # load game
     maze_runner = GraphicalMazeRunner(GAME_FILE, root)
     maze_runner.play()
 
-    root.mainloop()
+    if not show_stats:
+        root.mainloop()
+        return
+    try:
+        root.mainloop()
+    finally:
+        print(maze_runner.redraw_scheduler.report())
 
 
 def main():
@@ -777,7 +1350,8 @@ def main():
     """ 1. Construct the root tk.Tk instance.
         2. Call the play game function passing in the newly created root tk.Tk instance."""
     root = tk.Tk()
-    play_game(root)
+    # Run with --stats to see how many frames were drawn and dropped
+    play_game(root, '--stats' in sys.argv[1:])
 
 
 if __name__ == '__main__':
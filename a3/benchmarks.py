@@ -0,0 +1,485 @@
+"""
+Benchmarks for the MazeRunner model and views on large generated levels.
+
+Run this file to print every benchmark, or call the functions individually.
+"""
+
+from __future__ import annotations
+import os
+import tracemalloc
+from random import Random
+from time import perf_counter
+
+from a2_solution import *
+from maze_generator import generate_game, generate_level
+
+
+def benchmark_maze(dimensions: tuple[int, int] = (1001, 1001)) -> None:
+    """ Compares the memory used per cell and get_tile latency of Maze with
+        the list of Tile lists it replaced.
+
+    Parameters:
+        dimensions: The (#rows, #columns) of the generated maze.
+    """
+    rows = generate_level(*dimensions, Random(0))
+    num_cells = dimensions[0] * dimensions[1]
+
+    tracemalloc.start()
+    tile_lists = [[Maze.TILES.get(tile, Empty)() for tile in row] for row in rows]
+    list_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    maze = Maze(dimensions)
+    for row in rows:
+        maze.add_row(row)
+    maze_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    rng = Random(1)
+    positions = [(rng.randrange(dimensions[0]), rng.randrange(dimensions[1]))
+                 for _ in range(200_000)]
+
+    start = perf_counter()
+    for row, col in positions:
+        tile_lists[row][col]
+    list_time = perf_counter() - start
+
+    start = perf_counter()
+    for position in positions:
+        maze.get_tile(position)
+    maze_time = perf_counter() - start
+
+    print(f'{dimensions[0]}x{dimensions[1]} maze')
+    print(f'list of lists: {list_memory / num_cells:6.1f} bytes/cell, '
+          f'{1e9 * list_time / len(positions):6.0f}ns per lookup')
+    print(f'Maze:          {maze_memory / num_cells:6.1f} bytes/cell, '
+          f'{1e9 * maze_time / len(positions):6.0f}ns per get_tile')
+
+
+
+def _draw_immediate(view, tiles, items, player_pos) -> None:
+    """ Draws a level the way LevelView did before it kept its canvas items:
+        everything is deleted and created again.
+    """
+    view.delete('all')
+    for row, tile_row in enumerate(tiles):
+        for column, tile in enumerate(tile_row):
+            view.create_rectangle(view.get_bbox((row, column)),
+                                  fill=TILE_COLOURS[tile.get_id()])
+    for position, item in list(items.items()) + [(player_pos, None)]:
+        entity_id = PLAYER if item is None else item.get_id()
+        view.create_oval(view.get_bbox(position), fill=ENTITY_COLOURS[entity_id])
+        view.create_text(view.get_midpoint(position), text=entity_id,
+                         font=TEXT_FONT)
+
+
+def _corridor_moves(maze: Maze, start: tuple[int, int], num_moves: int,
+                    rng: Random) -> list[str]:
+    """ Returns moves that run along passages, turning at random only when
+        blocked, so that the player travels across the maze.
+    """
+    moves, (row, col) = [], start
+    move = rng.choice(tuple(MOVE_DELTAS))
+    while len(moves) < num_moves:
+        options = [
+            option for option, (drow, dcol) in MOVE_DELTAS.items()
+            if not maze.get_tile((row + drow, col + dcol)).is_blocking()
+        ]
+        if move not in options or rng.random() < 0.1:
+            move = rng.choice(options)
+        drow, dcol = MOVE_DELTAS[move]
+        row, col = row + drow, col + dcol
+        moves.append(move)
+    return moves
+
+
+def benchmark_level_view(
+    dimensions: tuple[int, int] = (101, 101),
+    num_moves: int = 200,
+) -> None:
+    """ Compares the redraw latency of LevelView after each move, with every
+        cell drawn and in viewport mode, against deleting and recreating every
+        canvas item. Needs a display.
+
+    Parameters:
+        dimensions: The (#rows, #columns) of the generated maze.
+        num_moves: The number of moves to draw.
+    """
+    import tkinter as tk
+    from a3 import LevelView, MIN_CELL_SIZE
+
+    game_file = 'benchmark_game.txt'
+    generate_game(game_file, 1, dimensions)
+    root = tk.Tk()
+    try:
+        for name, draw, min_cell_size in (
+            ('immediate', _draw_immediate, 0),
+            ('retained', LevelView.draw, 0),
+            ('viewport', LevelView.draw, MIN_CELL_SIZE),
+        ):
+            model = Model(game_file)
+            level = model.get_level()
+            view = LevelView(root, dimensions, (MAZE_WIDTH, MAZE_HEIGHT),
+                             min_cell_size)
+            view.pack()
+            moves = _corridor_moves(level.get_maze(), level.get_player_start(),
+                                    num_moves, Random(0))
+            times = []
+            for move in moves:
+                model.move_player(MOVE_DELTAS[move])
+                if model.has_won():
+                    break
+                start = perf_counter()
+                draw(view, level.get_maze().get_tiles(), level.get_items(),
+                     model.get_player().get_position())
+                root.update_idletasks()
+                times.append(perf_counter() - start)
+            # The first draw builds the canvas for every approach
+            steady = sorted(times[1:])
+            print(f'{name:>9}: first draw {1000 * times[0]:8.1f}ms, '
+                  f'median redraw {1000 * steady[len(steady) // 2]:8.2f}ms, '
+                  f'{len(view.find_all())} canvas items')
+            view.destroy()
+    finally:
+        root.destroy()
+        os.remove(game_file)
+
+
+def _draw_side_views_immediate(interface, inventory: Inventory,
+                               player_stats: tuple[int, int, int]) -> None:
+    """ Draws the stats and inventory views the way GraphicalInterface did
+        before they kept their widgets: everything is destroyed and created
+        again.
+    """
+    import tkinter as tk
+
+    stats_view, inventory_view = interface.stats_view, interface.inventory_view
+    stats_view.delete('all')
+    for column, (name, value) in enumerate(zip(
+        ('HP', 'Hunger', 'Thirst', 'Coins'),
+        player_stats + (len(inventory.get_items().get('Coin', ())),),
+    )):
+        for row, text in enumerate((name, str(value))):
+            stats_view.create_text(stats_view.get_midpoint((row, column)),
+                                   text=text, font=TEXT_FONT)
+
+    for widget in inventory_view.winfo_children():
+        widget.destroy()
+    tk.Label(inventory_view, text="Inventory", font=HEADING_FONT).pack(fill=tk.X)
+    for name, items in inventory.get_items().items():
+        if name != 'Coin':
+            tk.Label(inventory_view, text=f"{name}: {len(items)}",
+                     bg=ENTITY_COLOURS[items[0].get_id()],
+                     font=TEXT_FONT).pack(fill=tk.X)
+
+
+def benchmark_side_views(num_moves: int = 500) -> None:
+    """ Compares widget churn and the time to update the stats and inventory
+        views and process pending Tk events after each move, against
+        destroying and recreating their widgets. Needs a display.
+
+    Parameters:
+        num_moves: The number of moves to simulate. Stats change on every move
+                   and the inventory changes on some of them.
+    """
+    import tkinter as tk
+    from a3 import GraphicalInterface
+
+    def draw_incremental(interface, inventory, player_stats):
+        interface._draw_player_stats(player_stats)
+        interface._draw_inventory(inventory)
+
+    for name, draw in (('immediate', _draw_side_views_immediate),
+                       ('incremental', draw_incremental)):
+        root = tk.Tk()
+        interface = GraphicalInterface(root)
+        interface.create_interface((10, 10))
+        rng = Random(0)
+        inventory = Inventory()
+        health = MAX_HEALTH
+        times, created = [], 0
+        widgets = set(interface.inventory_view.winfo_children())
+        canvas_items = set(interface.stats_view.find_all())
+        for move in range(num_moves):
+            health = health - 1 if health > 1 else MAX_HEALTH
+            if rng.random() < 0.2:
+                inventory.add_item(rng.choice((Apple, Water, Honey, Potion, Coin))(
+                    (0, 0)))
+            elif rng.random() < 0.1 and inventory.get_items():
+                inventory.remove_item(rng.choice(tuple(inventory.get_items())))
+
+            start = perf_counter()
+            draw(interface, inventory, (health, move // 5 % 10, move // 5 % 10))
+            root.update()
+            times.append(perf_counter() - start)
+
+            new_widgets = set(interface.inventory_view.winfo_children())
+            new_canvas_items = set(interface.stats_view.find_all())
+            created += len(new_widgets - widgets) + len(new_canvas_items - canvas_items)
+            widgets, canvas_items = new_widgets, new_canvas_items
+        root.destroy()
+
+        times.sort()
+        print(f'{name:>11}: {created / num_moves:5.1f} widgets and canvas items '
+              f'created per move, median {1000 * times[len(times) // 2]:6.2f}ms '
+              f'per move')
+
+
+def _draw_text_by_cell(maze: Maze, items: dict[tuple[int, int], Item],
+                       player_position: tuple[int, int], inventory: Inventory,
+                       player_stats: tuple[int, int, int]) -> None:
+    """ Prints a frame the way TextInterface used to, building each row a cell
+        at a time and printing each row and section separately.
+    """
+    rows, cols = maze.get_dimensions()
+    for row in range(rows):
+        row_str = ''
+        for col in range(cols):
+            if (row, col) == player_position:
+                row_str += PLAYER
+            elif (row, col) in items:
+                row_str += items[(row, col)].get_id()
+            else:
+                row_str += maze.get_tile((row, col)).get_id()
+        print(row_str)
+    text = str(inventory) if inventory.get_items() != {} else 'Empty'
+    print('---------------\nInventory\n' + text + '\n' + '---------------')
+    hp, hunger, thirst = player_stats
+    print(f'HP: {hp}\nhunger: {hunger}\nthirst: {thirst}')
+
+
+def benchmark_text_interface(
+    dimensions: tuple[int, int] = (101, 101),
+    num_moves: int = 200,
+) -> None:
+    """ Compares the time to write each frame, and the characters written,
+        when printing every cell, writing whole frames from the cached maze
+        and rewriting only changed characters in diff mode.
+
+    Parameters:
+        dimensions: The (#rows, #columns) of the generated maze.
+        num_moves: The number of moves to draw.
+    """
+    import io
+    from contextlib import redirect_stdout
+
+    game_file = 'benchmark_game.txt'
+    generate_game(game_file, 1, dimensions)
+    try:
+        for name, interface in (
+            ('per cell', None),
+            ('frame', TextInterface()),
+            ('diff', TextInterface(diff=True)),
+        ):
+            model = Model(game_file)
+            level = model.get_level()
+            player = model.get_player()
+            moves = _corridor_moves(level.get_maze(), level.get_player_start(),
+                                    num_moves, Random(0))
+            times, written = [], 0
+            for move in moves:
+                model.move_player(MOVE_DELTAS[move])
+                if model.has_won():
+                    break
+                state = (level.get_maze(), level.get_items(),
+                         player.get_position(), player.get_inventory(),
+                         model.get_player_stats())
+                output = io.StringIO()
+                start = perf_counter()
+                with redirect_stdout(output):
+                    if interface is None:
+                        _draw_text_by_cell(*state)
+                    elif not times:
+                        interface.draw(*state)
+                    else:
+                        interface.apply_changes(model.pop_changes(), *state)
+                times.append(perf_counter() - start)
+                written += len(output.getvalue())
+            steady = sorted(times[1:])
+            print(f'{name:>8}: median frame {1000 * steady[len(steady) // 2]:7.3f}ms, '
+                  f'{written / len(times):8.0f} characters per frame')
+    finally:
+        os.remove(game_file)
+
+
+def benchmark_headless(
+    dimensions: tuple[int, int] = (21, 21),
+    size: tuple[int, int] = (105, 105),
+    num_moves: int = 2000,
+) -> None:
+    """ Measures the frames per second HeadlessLevelView draws thumbnails at,
+        with colours and with images. Needs no display.
+
+    Parameters:
+        dimensions: The (#rows, #columns) of the generated maze.
+        size: The (width, height) of each frame in pixels.
+        num_moves: The number of moves to draw.
+    """
+    from headless import HeadlessLevelView
+
+    game_file = 'benchmark_game.txt'
+    generate_game(game_file, 1, dimensions)
+    try:
+        model = Model(game_file)
+        level = model.get_level()
+        tiles, items = level.get_maze().get_tiles(), level.get_items()
+        # Walk the player along passages without playing, so the game cannot
+        # end before every frame is drawn
+        positions, (row, col) = [], level.get_player_start()
+        for move in _corridor_moves(level.get_maze(), (row, col), num_moves, Random(0)):
+            drow, dcol = MOVE_DELTAS[move]
+            row, col = row + drow, col + dcol
+            positions.append((row, col))
+
+        for name, use_images in (('colours', False), ('images', True)):
+            view = HeadlessLevelView(dimensions, size, use_images)
+            start = perf_counter()
+            view.draw(tiles, items, level.get_player_start())
+            first_frame = perf_counter() - start
+            start = perf_counter()
+            for position in positions:
+                view.draw(tiles, items, position)
+            elapsed = perf_counter() - start
+            print(f'{name:>7}: first frame {1000 * first_frame:6.1f}ms, then '
+                  f'{len(positions) / elapsed:6.0f} frames/s at {size[0]}x{size[1]} pixels')
+    finally:
+        os.remove(game_file)
+
+
+def _bfs_distance(maze: Maze, start: tuple[int, int], targets: set[tuple[int, int]]) -> Optional[int]:
+    """ Returns the fewest moves from start to any of targets by searching the
+        maze, as each query did before levels cached distance fields.
+    """
+    num_rows, num_cols = maze.get_dimensions()
+    distances, frontier = {start: 0}, [start]
+    while frontier:
+        next_frontier = []
+        for position in frontier:
+            if position in targets:
+                return distances[position]
+            row, col = position
+            for drow, dcol in MOVE_DELTAS.values():
+                neighbour = new_row, new_col = row + drow, col + dcol
+                if (0 <= new_row < num_rows and 0 <= new_col < num_cols
+                        and neighbour not in distances
+                        and (neighbour in targets
+                             or not maze.get_tile(neighbour).is_blocking())):
+                    distances[neighbour] = distances[position] + 1
+                    next_frontier.append(neighbour)
+        frontier = next_frontier
+    return None
+
+
+def benchmark_distance_fields(
+    dimensions: tuple[int, int] = (101, 101),
+    num_queries: int = 200,
+) -> None:
+    """ Compares answering distance-to-coin queries with a search per query
+        against the level's distance field, and updating the field as coins are
+        collected against rebuilding it.
+
+    Parameters:
+        dimensions: The (#rows, #columns) of the generated maze.
+        num_queries: The number of positions to query.
+    """
+    game_file = 'benchmark_game.txt'
+    generate_game(game_file, 1, dimensions)
+    try:
+        level = Model(game_file).get_level()
+        maze = level.get_maze()
+        rng = Random(0)
+        num_rows, num_cols = dimensions
+        open_positions = [
+            (row, col) for row in range(num_rows) for col in range(num_cols)
+            if not maze.get_tile((row, col)).is_blocking()
+        ]
+        for position in rng.sample(open_positions, len(open_positions) // 50):
+            if position not in level.get_items():
+                level.add_entity(position, COIN)
+        coins = [position for position, item in level.get_items().items()
+                 if item.get_id() == COIN]
+        queries = rng.sample(open_positions, num_queries)
+
+        start = perf_counter()
+        searched = [_bfs_distance(maze, position, set(coins)) for position in queries]
+        search = perf_counter() - start
+        start = perf_counter()
+        field = level.get_coin_field()
+        built = perf_counter() - start
+        start = perf_counter()
+        looked_up = [level.get_distance_to_coin(position) for position in queries]
+        lookup = perf_counter() - start
+        assert searched == looked_up
+        print(f'{len(coins)} coins: search {1e6 * search / num_queries:8.1f}us per query, '
+              f'field {1e6 * lookup / num_queries:5.2f}us per query '
+              f'after a {1000 * built:.1f}ms build')
+
+        start = perf_counter()
+        for _ in range(10):
+            DistanceField(maze, field.get_sources())
+        rebuild = (perf_counter() - start) / 10
+        rng.shuffle(coins)
+        start = perf_counter()
+        for position in coins:
+            level.remove_item(position)
+        incremental = perf_counter() - start
+        print(f'collecting a coin: update {1000 * incremental / len(coins):.3f}ms, '
+              f'rebuild {1000 * rebuild:.3f}ms')
+    finally:
+        os.remove(game_file)
+
+
+def benchmark_snapshots(
+    dimensions: tuple[int, int] = (101, 101),
+    num_states: int = 2000,
+) -> None:
+    """ Compares taking and restoring Model snapshots with deep copying the
+        levels and player, at states along a walk through a generated game.
+
+    Parameters:
+        dimensions: The (#rows, #columns) of the generated maze.
+        num_states: The number of states to take and restore.
+    """
+    import copy
+
+    game_file = 'benchmark_game.txt'
+    generate_game(game_file, 1, dimensions)
+    try:
+        model = Model(game_file)
+        level = model.get_level()
+        moves = _corridor_moves(level.get_maze(), level.get_player_start(),
+                                num_states, Random(0))
+        snapshots = []
+        for move in moves:
+            snapshots.append(model.snapshot())
+            model.move_player(MOVE_DELTAS[move])
+        start = perf_counter()
+        for _ in snapshots:
+            model.snapshot()
+        snapshot = (perf_counter() - start) / len(snapshots)
+
+        start = perf_counter()
+        for state in reversed(snapshots):
+            model.restore(state)
+        restore = (perf_counter() - start) / len(snapshots)
+
+        num_copies = 20
+        start = perf_counter()
+        for _ in range(num_copies):
+            copy.deepcopy((model.get_level(), model.get_player()))
+        deepcopy = (perf_counter() - start) / num_copies
+        print(f'snapshot {1e6 * snapshot:6.1f}us, restore {1e6 * restore:6.1f}us, '
+              f'deepcopy {1e6 * deepcopy:8.1f}us')
+    finally:
+        os.remove(game_file)
+
+
+if __name__ == '__main__':
+    benchmark_maze()
+    benchmark_level_view()
+    benchmark_side_views()
+    benchmark_text_interface()
+    benchmark_headless()
+    benchmark_distance_fields()
+    benchmark_snapshots()
@@ -0,0 +1,285 @@
+"""
+Rendering MazeRunner levels to PIL images, without Tk or a display.
+
+HeadlessLevelView has the same draw(tiles, items, player_pos) interface as
+LevelView and ImageLevelView, but composes each frame into an image that can be
+saved or converted to an array. The tiles of a level are drawn into a
+background once, and only drawn again when they change (e.g. doors unlock), so
+each frame only copies the background and pastes the items and player onto it.
+
+Run this file to render a game played with a string of moves:
+    python headless.py games/game1.txt ddssaw game1.gif
+"""
+
+from __future__ import annotations
+import os
+import sys
+from typing import Iterable, Iterator, Optional
+from PIL import Image, ImageColor, ImageDraw
+
+from a2_solution import *
+from image_cache import ImageCache
+from simulation import apply_move
+
+BACKGROUND_COLOUR = 'white'
+OUTLINE_COLOUR = 'black'
+FRAME_DURATION = 200  # Milliseconds each frame of a GIF is shown for
+
+
+class HeadlessLevelView:
+    """ Draws the maze and its entities into a PIL image of a fixed size. Cells
+        are drawn as coloured rectangles and ovals like LevelView, or with
+        images like ImageLevelView.
+    """
+
+    def __init__(
+        self,
+        dimensions: tuple[int, int],
+        size: tuple[int, int] = (MAZE_WIDTH, MAZE_HEIGHT),
+        use_images: bool = True,
+        image_cache: Optional[ImageCache] = None,
+    ) -> None:
+        """ Sets up a view with nothing drawn.
+
+        Parameters:
+            dimensions: (#rows, #columns)
+            size: (width in pixels, height in pixels) of every frame.
+            use_images: Draw cells with images rather than colours.
+            image_cache: The cache to take images from. A new one is made if
+                         none is given.
+        """
+        self._size = size
+        self._use_images = use_images
+        self._image_cache = image_cache if image_cache is not None else ImageCache()
+        self.set_dimensions(dimensions)
+
+    def set_dimensions(self, dimensions: tuple[int, int]) -> None:
+        """ Sets the dimensions of the grid.
+
+        Parameters:
+            dimensions: (#rows, #columns)
+        """
+        self._dimensions = dimensions
+        self._layout = None  # The tile IDs of each row in the background
+        self._background = None
+        self._sprites = {}  # Maps entity IDs to their images at the cell size
+        self._frame = Image.new('RGB', self._size, BACKGROUND_COLOUR)
+
+    def get_cell_size(self) -> tuple[int, int]:
+        """ Returns the size of the cells (width, height) in pixels. """
+        rows, columns = self._dimensions
+        width, height = self._size
+        return max(1, width // columns), max(1, height // rows)
+
+    def draw(
+        self,
+        tiles: list[list[Tile]],
+        items: dict[tuple[int, int], Item],
+        player_pos: tuple[int, int]
+    ) -> None:
+        """ Draws a new frame of the level.
+
+        Parameters:
+            tiles: The tiles of the maze
+            items: The items on the maze
+            player_pos: The position of the player
+        """
+        layout = tuple(tile_row_ids(row) for row in tiles)
+        if layout != self._layout:
+            self._background = self._draw_tiles(layout)
+            self._layout = layout
+
+        frame = self._background.copy()
+        cell_width, cell_height = self.get_cell_size()
+        for (row, column), item in items.items():
+            sprite = self._get_sprite(item.get_id())
+            frame.paste(sprite, (column * cell_width, row * cell_height), sprite)
+        sprite = self._get_sprite(PLAYER)
+        frame.paste(sprite, (player_pos[1] * cell_width, player_pos[0] * cell_height), sprite)
+        self._frame = frame
+
+    def apply_changes(
+        self,
+        changes: ChangeSet,
+        tiles: list[list[Tile]],
+        items: dict[tuple[int, int], Item],
+        player_pos: tuple[int, int]
+    ) -> None:
+        """ Draws a new frame of the level. Every frame starts from the cached
+            tiles, so the changes are not needed.
+
+        Parameters:
+            changes: What changed in the model since the last draw
+            tiles: The tiles of the maze
+            items: The items on the maze
+            player_pos: The position of the player
+        """
+        self.draw(tiles, items, player_pos)
+
+    def get_image(self) -> Image.Image:
+        """ Returns the last frame drawn. Each draw makes a new image, so the
+            image returned is never changed by later draws.
+        """
+        return self._frame
+
+    def to_array(self):
+        """ Returns the last frame drawn as a (height, width, channels) NumPy
+            array. Needs NumPy to be installed.
+        """
+        import numpy
+        return numpy.asarray(self._frame)
+
+    def _draw_tiles(self, layout: tuple[str, ...]) -> Image.Image:
+        """ Returns a frame with only the tiles drawn. """
+        rows, columns = len(layout), len(layout[0])
+        cell_width, cell_height = cell_size = self.get_cell_size()
+        maze_size = columns * cell_width, rows * cell_height
+        background = Image.new('RGB', self._size, BACKGROUND_COLOUR)
+
+        if self._use_images:
+            tiles = self._image_cache.compose(layout, cell_size, TILE_IMAGES)
+            background.paste(tiles, (0, 0), tiles)
+            return background
+
+        # Draw one pixel per cell, then scale it up to the cell size
+        tile_ids = list(TILE_COLOURS)
+        palette = []
+        for tile_id in tile_ids:
+            palette.extend(ImageColor.getrgb(TILE_COLOURS[tile_id]))
+        indices = str.maketrans({tile_id: chr(i) for i, tile_id in enumerate(tile_ids)})
+        cells = Image.frombytes(
+            'P', (columns, rows), ''.join(layout).translate(indices).encode('latin-1'))
+        cells.putpalette(palette)
+        background.paste(cells.resize(maze_size, Image.NEAREST).convert('RGB'))
+
+        draw = ImageDraw.Draw(background)
+        for row in range(rows + 1):
+            draw.line((0, row * cell_height, maze_size[0], row * cell_height),
+                      fill=OUTLINE_COLOUR)
+        for column in range(columns + 1):
+            draw.line((column * cell_width, 0, column * cell_width, maze_size[1]),
+                      fill=OUTLINE_COLOUR)
+        return background
+
+    def _get_sprite(self, entity_id: str) -> Image.Image:
+        """ Returns the image of an item or the player at the cell size, with
+            transparent space around it.
+        """
+        sprite = self._sprites.get(entity_id)
+        if sprite is not None:
+            return sprite
+
+        cell_width, cell_height = cell_size = self.get_cell_size()
+        if self._use_images:
+            sprite = self._image_cache.scale(ENTITY_IMAGES[entity_id], cell_size)
+            sprite = sprite.convert('RGBA')
+        else:
+            sprite = Image.new('RGBA', (cell_width + 1, cell_height + 1))
+            draw = ImageDraw.Draw(sprite)
+            draw.ellipse((0, 0, cell_width, cell_height),
+                         fill=ENTITY_COLOURS[entity_id], outline=OUTLINE_COLOUR)
+            draw.text((cell_width // 2, cell_height // 2), entity_id,
+                      fill=OUTLINE_COLOUR, anchor='mm')
+        self._sprites[entity_id] = sprite
+        return sprite
+
+
+def render_game(
+    game_file: str,
+    moves: Iterable[str],
+    size: tuple[int, int] = (MAZE_WIDTH, MAZE_HEIGHT),
+    use_images: bool = True,
+) -> Iterator[Image.Image]:
+    """ Plays a game and yields a frame for the start and after every move, up
+        to the move that wins or loses the game.
+
+    Parameters:
+        game_file: Path to the file from which the game levels are loaded.
+        moves: Moves as entered in MazeRunner, e.g. 'w', or 'i Apple' to use
+               an item. Invalid moves are skipped.
+        size: (width in pixels, height in pixels) of every frame.
+        use_images: Draw cells with images rather than colours.
+    """
+    model = Model(game_file)
+    view = HeadlessLevelView(model.get_level().get_dimensions(), size, use_images)
+
+    def draw_frame() -> Image.Image:
+        level = model.get_level()
+        view.draw(level.get_maze().get_tiles(), level.get_items(),
+                  model.get_player().get_position())
+        return view.get_image()
+
+    yield draw_frame()
+    for move in moves:
+        if not apply_move(model, move):
+            continue
+
+        if model.has_won() or model.has_lost():
+            return
+        if model.did_level_up():
+            view.set_dimensions(model.get_level().get_dimensions())
+        yield draw_frame()
+
+
+def save_png_sequence(
+    frames: Iterable[Image.Image],
+    directory: str,
+    prefix: str = 'frame',
+) -> int:
+    """ Saves each frame as a numbered PNG file, e.g. frame00000.png.
+
+    Parameters:
+        frames: The frames to save, in order.
+        directory: The directory to save them in, which is made if needed.
+        prefix: The start of each file name.
+
+    Returns:
+        The number of frames saved.
+    """
+    os.makedirs(directory, exist_ok=True)
+    num_frames = 0
+    for num_frames, frame in enumerate(frames, 1):
+        frame.save(os.path.join(directory, f'{prefix}{num_frames - 1:05}.png'))
+    return num_frames
+
+
+def save_gif(
+    frames: Iterable[Image.Image],
+    path: str,
+    duration: int = FRAME_DURATION,
+) -> int:
+    """ Saves the frames as a looping animated GIF.
+
+    Parameters:
+        frames: The frames to save, in order.
+        path: The GIF file to write.
+        duration: The milliseconds each frame is shown for.
+
+    Returns:
+        The number of frames saved.
+    """
+    frames = list(frames)
+    if frames:
+        frames[0].save(path, save_all=True, append_images=frames[1:],
+                       duration=duration, loop=0)
+    return len(frames)
+
+
+def main() -> None:
+    """ Renders the game file played with the given moves to a GIF, or to a
+        directory of PNGs.
+    """
+    if len(sys.argv) != 4:
+        print('Usage: python headless.py GAME_FILE MOVES OUTPUT(.gif|DIRECTORY)')
+        return
+    game_file, moves, output = sys.argv[1:]
+    frames = render_game(game_file, moves)
+    if output.lower().endswith('.gif'):
+        num_frames = save_gif(frames, output)
+    else:
+        num_frames = save_png_sequence(frames, output)
+    print(f'Saved {num_frames} frames to {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+"""
+Decoded and resized images for the MazeRunner GUI.
+
+Decoding the PNGs in images/ is slow (lava.png alone takes tens of
+milliseconds), so each file is decoded once and every size it is shown at is
+scaled once. All cells showing the same image at the same size share a single
+PhotoImage.
+
+Whole layers of tiles can also be composited into a single image, which is
+cached by its layout and cell size.
+
+Images can also be preloaded: worker threads decode and scale them, and hand
+the results to the Tk thread through a queue that is polled with after(), as
+PhotoImages may only be created on the Tk thread.
+"""
+
+from __future__ import annotations
+import os
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from time import perf_counter
+from typing import Iterable, Optional
+from PIL import Image, ImageTk
+
+IMAGE_DIR = 'images'
+POLL_INTERVAL = 10  # Milliseconds between checks for preloaded images
+LAYER_CACHE_SIZE = 8  # Number of composited tile layers kept
+
+
+class ImageCache:
+    """ PhotoImages keyed by (file name, size), built from decoded files that
+        are kept for as long as the cache.
+    """
+    def __init__(self, directory: str = IMAGE_DIR) -> None:
+        """ Sets up an empty cache.
+
+        Parameters:
+            directory: The directory containing the image files.
+        """
+        self._directory = directory
+        self._decoded = {}  # Maps file names to decoded images
+        self._photos = {}  # Maps (file name, size) to PhotoImages
+        # Maps (layout, cell size, file names) to composited PhotoImages, least
+        # recently used first
+        self._layers = OrderedDict()
+        # (file name, decoded image, {size: scaled image}) from preload workers
+        self._ready = queue.Queue()
+        self._preloading = {}  # Maps files still being prepared to their workers' futures
+        self._loader = None
+        self._polling = False
+
+    def decode(self, filename: str) -> Image.Image:
+        """ Returns the full size image in filename, decoding it the first time
+            it is requested.
+
+        Parameters:
+            filename: The name of the file within the image directory.
+        """
+        image = self._decoded.get(filename)
+        if image is None:
+            with Image.open(os.path.join(self._directory, filename)) as image:
+                image.load()
+            self._decoded[filename] = image
+        return image
+
+    def scale(self, filename: str, size: tuple[int, int]) -> Image.Image:
+        """ Returns the image in filename resized to size.
+
+        Parameters:
+            filename: The name of the file within the image directory.
+            size: The (width, height) in pixels.
+        """
+        return self.decode(filename).resize(size)
+
+    def get(self, filename: str, size: tuple[int, int]) -> ImageTk.PhotoImage:
+        """ Returns the shared PhotoImage of filename at the given size.
+
+        Parameters:
+            filename: The name of the file within the image directory.
+            size: The (width, height) in pixels.
+        """
+        key = filename, size
+        photo = self._photos.get(key)
+        if photo is None:
+            # Rather than decoding a file a second time, wait for a worker
+            # that is already preparing it
+            future = self._preloading.get(filename)
+            if future is not None:
+                wait([future])
+                self._receive_ready()
+                if filename in self._preloading:
+                    # The worker stopped without handing over its result
+                    self._receive(filename, None, {})
+            photo = self._photos.get(key)
+        if photo is None:
+            photo = self._photos[key] = ImageTk.PhotoImage(self.scale(filename, size))
+        return photo
+
+    def compose(
+        self,
+        layout: tuple[str, ...],
+        size: tuple[int, int],
+        filenames: dict[str, str],
+    ) -> Image.Image:
+        """ Returns a single image of a grid of tiles.
+
+        Parameters:
+            layout: The tile IDs of each row of the grid.
+            size: The (width, height) of each cell in pixels.
+            filenames: Maps tile IDs to the files they are drawn with.
+        """
+        width, height = size
+        layer = Image.new('RGBA', (width * len(layout[0]), height * len(layout)))
+        tiles = {}
+        for row, ids in enumerate(layout):
+            for column, tile_id in enumerate(ids):
+                tile = tiles.get(tile_id)
+                if tile is None:
+                    tile = tiles[tile_id] = self.scale(filenames[tile_id], size)
+                layer.paste(tile, (column * width, row * height))
+        return layer
+
+    def get_layer(
+        self,
+        layout: tuple[str, ...],
+        size: tuple[int, int],
+        filenames: dict[str, str],
+    ) -> ImageTk.PhotoImage:
+        """ Returns the PhotoImage of a grid of tiles, compositing it unless it
+            is one of the last LAYER_CACHE_SIZE layers requested. Layers may be
+            dropped from the cache while still shown, so callers must hold
+            their own reference.
+
+        Parameters:
+            layout: The tile IDs of each row of the grid.
+            size: The (width, height) of each cell in pixels.
+            filenames: Maps tile IDs to the files they are drawn with.
+        """
+        key = layout, size, tuple(filenames.items())
+        photo = self._layers.get(key)
+        if photo is None:
+            photo = ImageTk.PhotoImage(self.compose(layout, size, filenames))
+            self._layers[key] = photo
+            if len(self._layers) > LAYER_CACHE_SIZE:
+                self._layers.popitem(last=False)
+        else:
+            self._layers.move_to_end(key)
+        return photo
+
+    def preload(
+        self,
+        master,
+        images: Iterable[tuple[str, tuple[int, int]]],
+        workers: Optional[int] = None,
+    ) -> None:
+        """ Starts decoding and scaling images on background threads. Finished
+            images are turned into PhotoImages on the Tk thread as master's
+            event loop runs, or as soon as get asks for them.
+
+        Parameters:
+            master: A widget whose after() polls for finished images.
+            images: The (file name, size) of each image to prepare.
+            workers: The number of threads. Defaults to the executor default.
+        """
+        sizes = {}
+        for filename, size in images:
+            if (filename, size) not in self._photos:
+                sizes.setdefault(filename, set()).add(size)
+        sizes = {
+            filename: file_sizes for filename, file_sizes in sizes.items()
+            if filename not in self._preloading
+        }
+        if not sizes:
+            return
+
+        if self._loader is None:
+            self._loader = ThreadPoolExecutor(
+                workers, thread_name_prefix='image-preload')
+        for filename, file_sizes in sizes.items():
+            self._preloading[filename] = self._loader.submit(
+                self._prepare, filename, tuple(file_sizes))
+        if not self._polling:
+            self._polling = True
+            master.after(POLL_INTERVAL, self._poll, master)
+
+    def _prepare(self, filename: str, sizes: tuple[tuple[int, int], ...]) -> None:
+        """ Decodes and scales one file on a worker thread. Only the queue is
+            shared with the Tk thread.
+        """
+        image, scaled = None, {}
+        try:
+            with Image.open(os.path.join(self._directory, filename)) as image:
+                image.load()
+            scaled = {size: image.resize(size) for size in sizes}
+        except Exception:
+            # Leave the file to be loaded, and the error raised, by get
+            image, scaled = None, {}
+        finally:
+            # Always hand something back, so the file stops being waited for
+            self._ready.put((filename, image, scaled))
+
+    def _receive(
+        self,
+        filename: str,
+        image: Optional[Image.Image],
+        scaled: dict[tuple[int, int], Image.Image],
+    ) -> None:
+        """ Stores an image prepared by a worker. Must run on the Tk thread. """
+        self._preloading.pop(filename, None)
+        if image is not None:
+            self._decoded.setdefault(filename, image)
+        for size, scaled_image in scaled.items():
+            if (filename, size) not in self._photos:
+                self._photos[filename, size] = ImageTk.PhotoImage(scaled_image)
+        if not self._preloading and self._loader is not None:
+            self._loader.shutdown(wait=False)
+            self._loader = None
+
+    def _receive_ready(self) -> None:
+        """ Stores every image the workers have finished so far. """
+        while True:
+            try:
+                self._receive(*self._ready.get_nowait())
+            except queue.Empty:
+                break
+
+    def _poll(self, master) -> None:
+        """ Stores every finished image, polling again while any remain. """
+        self._receive_ready()
+        if self._preloading:
+            master.after(POLL_INTERVAL, self._poll, master)
+        else:
+            self._polling = False
+
+    def discard_size(self, size: tuple[int, int]) -> None:
+        """ Forgets every PhotoImage of the given size, e.g. once cells are no
+            longer drawn at that size. Tk blanks an image once nothing
+            references it, so widgets still showing one must hold their own
+            reference.
+
+        Parameters:
+            size: The (width, height) in pixels.
+        """
+        for key in [key for key in self._photos if key[1] == size]:
+            del self._photos[key]
+        for key in [key for key in self._layers if key[1] == size]:
+            del self._layers[key]
+
+    def __len__(self) -> int:
+        return len(self._photos)
+
+    def __repr__(self) -> str:
+        return f"ImageCache('{self._directory}')"
+
+
+def benchmark(size: tuple[int, int] = (40, 40), num_cells: int = 100) -> None:
+    """ Compares decoding and resizing an image for every cell with scaling
+        each file once. Creating the PhotoImages needs a display, so only the
+        PIL work is timed.
+
+    Parameters:
+        size: The cell size in pixels.
+        num_cells: The number of cells drawn with each image.
+    """
+    from constants import TILE_IMAGES
+
+    for filename in TILE_IMAGES.values():
+        path = os.path.join(IMAGE_DIR, filename)
+        start = perf_counter()
+        for _ in range(num_cells):
+            Image.open(path).resize(size)
+        uncached = perf_counter() - start
+
+        cache = ImageCache()
+        start = perf_counter()
+        cache.scale(filename, size)
+        cached = perf_counter() - start
+        print(f'{filename:>10}, {num_cells} cells: {1000 * uncached:8.1f}ms '
+              f'decoding every cell, {1000 * cached:6.1f}ms decoding once')
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,233 @@
+"""
+Compiled binary level packs for MazeRunner games.
+
+A pack stores every level of a game file with one byte per cell (the same
+character used in the text format) behind a small header:
+
+    magic b'MZPK', version (uint16), number of levels (uint16)
+    for each level: data offset (uint32), #rows (uint16), #columns (uint16)
+    the cells of each level, row by row
+
+LevelPack only reads the header when opened. Levels are built the first time
+they are requested, and the next level can be built ahead of time on a
+background thread while the current one is being played.
+"""
+
+from __future__ import annotations
+import os
+import struct
+import sys
+import tracemalloc
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import perf_counter
+from typing import Callable, Optional
+
+PACK_EXTENSION = '.mzp'
+MAGIC = b'MZPK'
+VERSION = 1
+HEADER = struct.Struct('<4sHH')
+LEVEL_ENTRY = struct.Struct('<IHH')
+
+
+def is_level_pack(filename: str) -> bool:
+    """ Returns True iff filename is a compiled level pack.
+
+    Parameters:
+        filename: Path to a game file or level pack.
+    """
+    with open(filename, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def read_text_levels(filename: str) -> list[tuple[tuple[int, int], list[str]]]:
+    """ Reads the levels of a text game file without building Level instances.
+
+    Parameters:
+        filename: The path to the game file.
+
+    Returns:
+        The (dimensions, rows) of each level, in order.
+    """
+    levels = []
+    with open(filename, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if line.startswith('Maze'):
+                _, _, dimensions = line[5:].partition(' - ')
+                rows, cols = [int(item) for item in dimensions.split()]
+                levels.append(((rows, cols), []))
+            elif len(line) > 0 and len(levels) > 0:
+                levels[-1][1].append(line)
+    return levels
+
+
+def convert(text_file: str, pack_file: Optional[str] = None) -> str:
+    """ Compiles a text game file into a level pack.
+
+    Parameters:
+        text_file: The path to the game file.
+        pack_file: Where to write the pack. Defaults to text_file with its
+                   extension replaced by PACK_EXTENSION.
+
+    Returns:
+        The path of the written pack.
+    """
+    if pack_file is None:
+        pack_file = os.path.splitext(text_file)[0] + PACK_EXTENSION
+    levels = read_text_levels(text_file)
+
+    offset = HEADER.size + LEVEL_ENTRY.size * len(levels)
+    entries = []
+    for (rows, cols), level_rows in levels:
+        if len(level_rows) != rows or any(len(row) != cols for row in level_rows):
+            raise ValueError(f'{text_file}: level does not match its '
+                             f'dimensions {rows} x {cols}')
+        entries.append(LEVEL_ENTRY.pack(offset, rows, cols))
+        offset += rows * cols
+
+    with open(pack_file, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(levels)))
+        file.write(b''.join(entries))
+        for _, level_rows in levels:
+            file.write(''.join(level_rows).encode('ascii'))
+    return pack_file
+
+
+class LevelPack:
+    """ The levels of a compiled pack, built on demand. Supports len() and
+        indexing like the list returned by load_game.
+    """
+    def __init__(self, filename: str, build_level: Callable) -> None:
+        """ Reads the header and level index of a pack.
+
+        Parameters:
+            filename: The path to the pack.
+            build_level: Constructs an empty level from its dimensions. The
+                         level must provide add_row(row), as Level does.
+        """
+        self._filename = filename
+        self._build_level = build_level
+        with open(filename, 'rb') as file:
+            magic, version, num_levels = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f'{filename} is not a version {VERSION} '
+                                 f'level pack')
+            self._index = [
+                LEVEL_ENTRY.unpack(file.read(LEVEL_ENTRY.size))
+                for _ in range(num_levels)
+            ]
+        self._levels = {}
+        self._pending = {}
+        self._loader = None
+
+    def get_dimensions(self, level_num: int) -> tuple[int, int]:
+        """ Returns the (#rows, #columns) of a level without loading it. """
+        _, rows, cols = self._index[level_num]
+        return rows, cols
+
+    def _load(self, level_num: int) -> 'Level':
+        """ Reads and builds a single level from the pack. """
+        offset, rows, cols = self._index[level_num]
+        with open(self._filename, 'rb') as file:
+            file.seek(offset)
+            cells = file.read(rows * cols).decode('ascii')
+        level = self._build_level((rows, cols))
+        for start in range(0, rows * cols, cols):
+            level.add_row(cells[start:start + cols])
+        return level
+
+    def prefetch(self, level_num: int) -> None:
+        """ Starts building a level on a background thread, if it exists and is
+            not already loaded.
+
+        Parameters:
+            level_num: The index of the level to load ahead of time.
+        """
+        if (not 0 <= level_num < len(self) or level_num in self._levels
+                or level_num in self._pending):
+            return
+        if self._loader is None:
+            self._loader = ThreadPoolExecutor(max_workers=1)
+        self._pending[level_num] = self._loader.submit(self._load, level_num)
+
+    def release(self, level_num: int) -> None:
+        """ Forgets a loaded level so its memory can be reclaimed. """
+        self._levels.pop(level_num, None)
+        self._pending.pop(level_num, None)
+
+    def __getitem__(self, level_num: int) -> 'Level':
+        level = self._levels.get(level_num)
+        if level is None:
+            if not 0 <= level_num < len(self):
+                raise IndexError('level index out of range')
+            pending: Optional[Future] = self._pending.pop(level_num, None)
+            level = pending.result() if pending is not None \
+                else self._load(level_num)
+            self._levels[level_num] = level
+            if level_num == len(self) - 1:
+                # No level is left to prefetch, so the loader thread can stop
+                self.close()
+        return level
+
+    def close(self) -> None:
+        """ Stops the background loader thread, cancelling any levels still
+            waiting to be built. Levels are still built on demand afterwards,
+            and a later prefetch starts a new loader.
+        """
+        if self._loader is not None:
+            self._loader.shutdown(wait=False, cancel_futures=True)
+            self._loader = None
+        self._pending.clear()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f"LevelPack('{self._filename}')"
+
+
+def benchmark(dimensions: tuple[int, int] = (501, 501), num_levels: int = 4) \
+        -> None:
+    """ Compares starting a game from a text file and from a level pack on
+        large generated mazes.
+
+    Parameters:
+        dimensions: The (#rows, #columns) of each generated level.
+        num_levels: The number of levels in the generated game.
+    """
+    from a2_solution import Model
+    from maze_generator import generate_game
+
+    text_file = 'benchmark_game.txt'
+    generate_game(text_file, num_levels, dimensions)
+    pack_file = convert(text_file)
+    try:
+        for game_file in (text_file, pack_file):
+            tracemalloc.start()
+            start = perf_counter()
+            model = Model(game_file)
+            model.get_level()
+            elapsed = perf_counter() - start
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f'{game_file:>20}: first level ready in '
+                  f'{1000 * elapsed:8.1f}ms, {retained / 2 ** 20:7.1f} MiB '
+                  f'retained, {peak / 2 ** 20:7.1f} MiB peak')
+            del model
+    finally:
+        os.remove(text_file)
+        os.remove(pack_file)
+
+
+def main() -> None:
+    """ Converts each game file named on the command line into a pack, or runs
+        the benchmark if none are given.
+    """
+    if len(sys.argv) == 1:
+        benchmark()
+    for text_file in sys.argv[1:]:
+        print(f'{text_file} -> {convert(text_file)}')
+
+
+if __name__ == '__main__':
+    main()
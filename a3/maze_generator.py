@@ -0,0 +1,95 @@
+"""
+Random MazeRunner game files for benchmarking large levels.
+
+Levels are perfect mazes carved by a depth-first search, with a door on the
+right-hand edge, the player in the top-left corner and coins, food, water,
+potions and lava scattered along the passages. The output uses the same text
+format as the files in games/.
+"""
+
+from __future__ import annotations
+from random import Random
+
+from constants import *
+
+ITEM_CHANCES = (
+    (COIN, 0.01),
+    (APPLE, 0.004),
+    (WATER, 0.004),
+    (HONEY, 0.002),
+    (POTION, 0.002),
+    (LAVA, 0.02),
+)
+
+
+def generate_level(rows: int, cols: int, rng: Random) -> list[str]:
+    """ Generates the rows of a single random level.
+
+    Parameters:
+        rows: Number of rows in the maze (at least 3).
+        cols: Number of columns in the maze (at least 3).
+        rng: The random generator to draw from.
+
+    Returns:
+        The rows of the level, as they would appear in a game file.
+    """
+    grid = [[WALL] * cols for _ in range(rows)]
+    # Passages are carved between cells at odd coordinates
+    stack = [(1, 1)]
+    grid[1][1] = EMPTY
+    while stack:
+        row, col = stack[-1]
+        neighbours = [
+            (row + 2 * drow, col + 2 * dcol, row + drow, col + dcol)
+            for drow, dcol in MOVE_DELTAS.values()
+            if 0 < row + 2 * drow < rows - 1 and 0 < col + 2 * dcol < cols - 1
+            and grid[row + 2 * drow][col + 2 * dcol] == WALL
+        ]
+        if not neighbours:
+            stack.pop()
+            continue
+        next_row, next_col, wall_row, wall_col = rng.choice(neighbours)
+        grid[wall_row][wall_col] = grid[next_row][next_col] = EMPTY
+        stack.append((next_row, next_col))
+
+    for row in range(1, rows - 1):
+        for col in range(1, cols - 1):
+            if grid[row][col] != EMPTY or (row, col) == (1, 1):
+                continue
+            roll = rng.random()
+            for entity_id, chance in ITEM_CHANCES:
+                if roll < chance:
+                    grid[row][col] = entity_id
+                    break
+                roll -= chance
+
+    # Open a door on the right edge next to a passage; the player starts at
+    # the top-left corner of the passages
+    door_rows = [row for row in range(1, rows - 1)
+                 if grid[row][cols - 2] not in (WALL, LAVA)]
+    grid[rng.choice(door_rows)][cols - 1] = DOOR
+    grid[1][1] = PLAYER
+    return [''.join(row) for row in grid]
+
+
+def generate_game(
+    filename: str,
+    num_levels: int,
+    dimensions: tuple[int, int],
+    seed: int = 0,
+) -> None:
+    """ Writes a game file of random levels.
+
+    Parameters:
+        filename: Where to write the game.
+        num_levels: The number of levels in the game.
+        dimensions: The (#rows, #columns) of every level.
+        seed: Seed for the random generator, so the same game can be rebuilt.
+    """
+    rng = Random(seed)
+    rows, cols = dimensions
+    with open(filename, 'w') as file:
+        for level_num in range(1, num_levels + 1):
+            file.write(f'Maze {level_num} - {rows} {cols}\n')
+            file.write('\n'.join(generate_level(rows, cols, rng)))
+            file.write('\n\n')
@@ -0,0 +1,357 @@
+"""
+Replaying recorded MazeRunner transcripts through Model, as a fast regression
+test of the game engine.
+
+A transcript is everything a text game printed, such as those in
+a2/game_examples/, which also contain the moves typed, and a2/testdata/,
+which do not. Moves that were not recorded are worked out from how the next
+frame differs from the current state. Each move is applied to a Model
+directly, and the output MazeRunner would print is only rendered when the
+model has changed, and only diffed against the transcript when it differs.
+
+Run this file to replay every transcript in parallel:
+    python replay.py [TRANSCRIPT ...]
+"""
+
+from __future__ import annotations
+import difflib
+import glob
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from time import perf_counter
+from typing import Iterable, Optional
+
+from a2_solution import *
+from simulation import apply_move
+
+TRANSCRIPT_DIRS = (
+    os.path.join('..', 'a2', 'testdata'),
+    os.path.join('..', 'a2', 'game_examples'),
+)
+GAME_PROMPT = 'Enter game file: '
+MOVE_PROMPT = '\nEnter a move: '
+NO_ITEM_MESSAGE = '\nNo item with that name!\n\n'
+DIVIDER = '---------------'
+ENTITY_IDS = {PLAYER, COIN, POTION, HONEY, APPLE, WATER, CANDY, LAVA_SHOES}
+
+
+class Transcript:
+    """ The game file, moves and output of a recorded game. """
+    def __init__(self, path: str, game_dir: Optional[str] = None) -> None:
+        """ Reads a transcript.
+
+        Parameters:
+            path: The transcript file.
+            game_dir: The directory that game file paths are relative to.
+                      Defaults to the parent of the transcript's directory.
+        """
+        if game_dir is None:
+            game_dir = os.path.dirname(os.path.dirname(os.path.abspath(path)))
+        with open(path) as file:
+            text = file.read()
+
+        self._path = path
+        self._game_dir = game_dir
+        parts = text[len(GAME_PROMPT):].split(MOVE_PROMPT)
+        game_file, _, start = parts[0].partition('\n')
+        # Moves typed in a terminal are echoed after the prompt
+        self._echoed = os.path.isfile(os.path.join(game_dir, game_file))
+        if self._echoed:
+            self._game_file = os.path.join(game_dir, game_file)
+            self._start = start
+            self._moves, self._outputs = [], []
+            for part in parts[1:]:
+                move, newline, output = part.partition('\n')
+                if not newline:
+                    # The transcript stops at a prompt
+                    break
+                self._moves.append(move)
+                self._outputs.append(output)
+        else:
+            self._game_file = None
+            self._start = parts[0]
+            self._moves = None
+            self._outputs = parts[1:]
+
+    def get_path(self) -> str:
+        """ Returns the transcript file. """
+        return self._path
+
+    def get_game_file(self) -> str:
+        """ Returns the game file that was played, finding the file in the
+            games directory whose first frame matches if it was not recorded.
+        """
+        if self._game_file is None:
+            name = os.path.basename(self._path)
+            candidates = sorted(
+                glob.glob(os.path.join(self._game_dir, 'games', '*.txt')),
+                key=lambda game_file: not name.startswith(
+                    os.path.splitext(os.path.basename(game_file))[0]),
+            )
+            for game_file in candidates:
+                model = Model(game_file)
+                if _render(TextInterface(), model, None) == self._start:
+                    self._game_file = game_file
+                    break
+            else:
+                raise ValueError(f'No game in {self._game_dir} matches {self._path}')
+        return self._game_file
+
+    def get_start(self) -> str:
+        """ Returns the output before the first move. """
+        return self._start
+
+    def get_moves(self) -> Optional[list[str]]:
+        """ Returns the moves typed, or None if they were not recorded. """
+        return self._moves
+
+    def get_outputs(self) -> list[str]:
+        """ Returns the output after each move. """
+        return self._outputs
+
+
+class ReplayResult:
+    """ The outcome of replaying a transcript. The diff of the first output
+        that differed is only built when asked for.
+    """
+    def __init__(
+        self,
+        path: str,
+        num_steps: int,
+        elapsed: float,
+        mismatch: Optional[tuple[int, str, str]] = None,
+    ) -> None:
+        """ Records the outcome of a replay.
+
+        Parameters:
+            path: The transcript file.
+            num_steps: The number of moves replayed.
+            elapsed: The seconds the replay took.
+            mismatch: (step, expected output, replayed output) of the first
+                      output that differed, where step 0 is the start.
+        """
+        self._path = path
+        self._num_steps = num_steps
+        self._elapsed = elapsed
+        self._mismatch = mismatch
+
+    def get_path(self) -> str:
+        """ Returns the transcript file. """
+        return self._path
+
+    def passed(self) -> bool:
+        """ Returns True iff every output matched the transcript. """
+        return self._mismatch is None
+
+    def get_num_steps(self) -> int:
+        """ Returns the number of moves replayed. """
+        return self._num_steps
+
+    def get_elapsed(self) -> float:
+        """ Returns the seconds the replay took. """
+        return self._elapsed
+
+    def get_diff(self) -> str:
+        """ Returns a unified diff of the first output that differed, or an
+            empty string if every output matched.
+        """
+        if self._mismatch is None:
+            return ''
+        step, expected, replayed = self._mismatch
+        return ''.join(difflib.unified_diff(
+            expected.splitlines(keepends=True),
+            replayed.splitlines(keepends=True),
+            f'{self._path} step {step}',
+            'replayed',
+        ))
+
+    def __repr__(self) -> str:
+        outcome = 'passed' if self.passed() else f'failed at step {self._mismatch[0]}'
+        return f"ReplayResult('{self._path}', {outcome}, steps={self._num_steps})"
+
+
+def _render(view: TextInterface, model: Model, changes: Optional[ChangeSet]) -> str:
+    """ Returns what view prints for the model, drawing it in full if changes
+        is None.
+    """
+    output = io.StringIO()
+    with redirect_stdout(output):
+        state = (model.get_current_maze(), model.get_current_items(),
+                 model.get_player().get_position(),
+                 model.get_player_inventory(), model.get_player_stats())
+        if changes is None:
+            view.draw(*state)
+        else:
+            view.apply_changes(changes, *state)
+    return output.getvalue()
+
+
+def _infer_move(model: Model, output: str) -> str:
+    """ Returns a move that turns the model's game into the one shown by
+        output, the next output of a transcript without recorded moves.
+    """
+    if output == '':
+        # The move was invalid, so the player was prompted again
+        return ''
+    if output.startswith(NO_ITEM_MESSAGE):
+        return 'i Nothing'
+
+    maze = model.get_current_maze()
+    num_rows, num_cols = maze.get_dimensions()
+    row, col = position = model.get_player().get_position()
+    exits, open_moves, blocked = [], {}, []
+    for move, (drow, dcol) in MOVE_DELTAS.items():
+        new_position = new_row, new_col = row + drow, col + dcol
+        if not (0 <= new_row < num_rows and 0 <= new_col < num_cols):
+            if isinstance(maze.get_tile(position), Door):
+                exits.append(move)
+        elif maze.get_tile(new_position).is_blocking():
+            blocked.append(move)
+        else:
+            open_moves[new_position] = move
+
+    if output.startswith(WIN_MESSAGE):
+        return exits[0] if exits else ''
+    if output.startswith(LOSS_MESSAGE):
+        # Every move that changes the player's stats could have been the last
+        return next(iter(open_moves.values()), exits[0] if exits else '')
+
+    lines = output.split('\n')
+    frame = lines[:lines.index(DIVIDER)]
+    new_position = next(
+        ((frame_row, line.index(PLAYER)) for frame_row, line in enumerate(frame)
+         if PLAYER in line),
+        None,
+    )
+    if exits and (new_position not in open_moves or not _same_maze(frame, maze)):
+        return exits[0]
+    if new_position in open_moves:
+        return open_moves[new_position]
+
+    # The player did not move, so either used an item or walked into a wall
+    inventory = lines[lines.index('Inventory') + 1:]
+    inventory = inventory[:inventory.index(DIVIDER)]
+    counts = dict(line.split(': ') for line in inventory if line != 'Empty')
+    for name, items in model.get_player_inventory().get_items().items():
+        if int(counts.get(name, 0)) < len(items):
+            return f'i {name}'
+    return blocked[0] if blocked else ''
+
+
+def _same_maze(frame: list[str], maze: Maze) -> bool:
+    """ Returns True iff the rows of frame show maze, with entities on top. """
+    rows = str(maze).split('\n')
+    if len(rows) != len(frame):
+        return False
+    for row, frame_row in zip(rows, frame):
+        if row != frame_row and (len(row) != len(frame_row) or any(
+            tile != shown and shown not in ENTITY_IDS
+            for tile, shown in zip(row, frame_row)
+        )):
+            return False
+    return True
+
+
+def replay(path: str, game_dir: Optional[str] = None) -> ReplayResult:
+    """ Replays a transcript through Model, comparing the output MazeRunner
+        would print after each move with the transcript. Stops at the first
+        output that differs.
+
+    Parameters:
+        path: The transcript file.
+        game_dir: The directory that game file paths are relative to.
+                  Defaults to the parent of the transcript's directory.
+    """
+    start = perf_counter()
+    transcript = Transcript(path, game_dir)
+    model = Model(transcript.get_game_file())
+    view = TextInterface()
+    frame = _render(view, model, None)
+    if frame != transcript.get_start():
+        return ReplayResult(path, 0, perf_counter() - start,
+                            (0, transcript.get_start(), frame))
+
+    moves = transcript.get_moves()
+    outputs = transcript.get_outputs()
+    for step, expected in enumerate(outputs, 1):
+        move = moves[step - 1] if moves is not None else _infer_move(model, expected)
+        item_name = move.partition(' ')[-1] if move.split()[:1] == ['i'] else None
+        has_item = item_name in model.get_player_inventory().get_items()
+        if not apply_move(model, move):
+            # MazeRunner prompts again without printing anything
+            replayed = ''
+        else:
+            replayed = NO_ITEM_MESSAGE if item_name is not None and not has_item else ''
+            if model.has_won():
+                replayed += WIN_MESSAGE + '\n'
+            elif model.has_lost():
+                replayed += LOSS_MESSAGE + '\n'
+            else:
+                changes = model.pop_changes()
+                # Only render the frame if the game has changed since the last one
+                if not changes.is_empty():
+                    frame = _render(view, model, changes)
+                replayed += frame
+
+        if step == len(outputs):
+            expected, replayed = expected.rstrip('\n'), replayed.rstrip('\n')
+        if replayed != expected:
+            return ReplayResult(path, step, perf_counter() - start,
+                                (step, expected, replayed))
+    return ReplayResult(path, len(outputs), perf_counter() - start)
+
+
+def find_transcripts(directories: Iterable[str] = TRANSCRIPT_DIRS) -> list[str]:
+    """ Returns every transcript in the given directories. """
+    return sorted(
+        path for directory in directories
+        for path in glob.glob(os.path.join(directory, '*.txt'))
+    )
+
+
+def replay_all(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+) -> list[ReplayResult]:
+    """ Replays transcripts in a pool of processes, returning their results in
+        the same order.
+
+    Parameters:
+        paths: The transcript files.
+        workers: The number of processes. Defaults to the number of CPUs.
+    """
+    paths = list(paths)
+    if not paths:
+        return []
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(replay, paths))
+
+
+def main() -> None:
+    """ Replays the transcripts given, or every transcript, printing the time
+        each took and a diff for each that failed.
+    """
+    paths = sys.argv[1:] or find_transcripts()
+    start = perf_counter()
+    results = replay_all(paths)
+    elapsed = perf_counter() - start
+
+    for result in results:
+        outcome = 'ok' if result.passed() else 'FAILED'
+        print(f'{result.get_path():<50} {outcome:>6} {result.get_num_steps():5} steps '
+              f'{1000 * result.get_elapsed():8.2f}ms')
+    for result in results:
+        if not result.passed():
+            print()
+            print(result.get_diff(), end='')
+    num_passed = sum(result.passed() for result in results)
+    print(f'\n{num_passed}/{len(results)} transcripts passed in {elapsed:.2f}s')
+    if num_passed != len(results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
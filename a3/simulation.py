@@ -0,0 +1,278 @@
+"""
+Playing MazeRunner games without any interface, for evaluating many games.
+
+simulate plays one game on a Model, with moves taken from a sequence or chosen
+by a policy, and returns a GameResult. Nothing is drawn, printed or prompted
+for. run_batch plays many games across a pool of processes.
+
+Run this file to report games and steps per second on the games in games/ and
+on generated levels.
+"""
+
+from __future__ import annotations
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from random import Random
+from time import perf_counter
+from typing import Callable, Iterable, Optional, Sequence, Union
+
+from a2_solution import *
+from maze_generator import generate_game
+
+MAX_STEPS = 10_000  # Games still running after this many moves are stopped
+
+# Chooses the next move, as entered in MazeRunner, for the game in a model.
+# Returning None ends the game early.
+Policy = Callable[[Model], Optional[str]]
+
+
+class GameResult:
+    """ The final state of a simulated game, and optionally the state after
+        each step.
+    """
+    def __init__(
+        self,
+        game_file: str,
+        model: Model,
+        num_steps: int,
+        steps: Optional[list[tuple[str, int, tuple[int, int], tuple[int, int, int]]]],
+    ) -> None:
+        """ Records the final state of the game in model.
+
+        Parameters:
+            game_file: The file the game was loaded from.
+            model: The model after the last step.
+            num_steps: The number of valid moves made.
+            steps: (move, level index, player position, player stats) after
+                   each valid move, or None if steps were not recorded.
+        """
+        self._game_file = game_file
+        self._won = model.has_won()
+        self._lost = model.has_lost()
+        self._level_num = model.get_level_num()
+        self._position = model.get_player().get_position()
+        self._stats = model.get_player_stats()
+        self._inventory = {
+            name: len(items) for name, items in model.get_player_inventory().get_items().items()
+        }
+        self._num_steps = num_steps
+        self._steps = steps
+
+    def get_game_file(self) -> str:
+        """ Returns the file the game was loaded from. """
+        return self._game_file
+
+    def has_won(self) -> bool:
+        """ Returns True iff every level was completed. """
+        return self._won
+
+    def has_lost(self) -> bool:
+        """ Returns True iff the player lost the game. """
+        return self._lost
+
+    def get_level_num(self) -> int:
+        """ Returns the index of the level the game ended on. """
+        return self._level_num
+
+    def get_player_position(self) -> tuple[int, int]:
+        """ Returns the player's final (row, column) position. """
+        return self._position
+
+    def get_player_stats(self) -> tuple[int, int, int]:
+        """ Returns the player's final (HP, hunger, thirst). """
+        return self._stats
+
+    def get_inventory(self) -> dict[str, int]:
+        """ Returns the number of each item in the player's final inventory. """
+        return self._inventory
+
+    def get_num_steps(self) -> int:
+        """ Returns the number of valid moves made. """
+        return self._num_steps
+
+    def get_steps(self) -> Optional[list[tuple[str, int, tuple[int, int], tuple[int, int, int]]]]:
+        """ Returns (move, level index, player position, player stats) after
+            each valid move, or None if steps were not recorded.
+        """
+        return self._steps
+
+    def __repr__(self) -> str:
+        outcome = 'won' if self._won else 'lost' if self._lost else 'unfinished'
+        return (f"GameResult('{self._game_file}', {outcome}, "
+                f"level={self._level_num}, steps={self._num_steps}, "
+                f"stats={self._stats})")
+
+
+class RandomPolicy:
+    """ Moves in a random direction that is not blocked, including out of the
+        maze through an unlocked door. Instances can be sent to other
+        processes.
+    """
+    def __init__(self, seed: int = 0) -> None:
+        """ Sets up a policy with its own random generator.
+
+        Parameters:
+            seed: Seed for the random generator, so games can be repeated.
+        """
+        self._seed = seed
+        self._rng = Random(seed)
+
+    def __call__(self, model: Model) -> str:
+        maze = model.get_current_maze()
+        num_rows, num_cols = maze.get_dimensions()
+        row, col = model.get_player().get_position()
+        on_door = isinstance(maze.get_tile((row, col)), Door)
+        options = []
+        for move, (drow, dcol) in MOVE_DELTAS.items():
+            new_row, new_col = row + drow, col + dcol
+            if not (0 <= new_row < num_rows and 0 <= new_col < num_cols):
+                if on_door:
+                    options.append(move)
+            elif not maze.get_tile((new_row, new_col)).is_blocking():
+                options.append(move)
+        return self._rng.choice(options) if options else None
+
+    def __repr__(self) -> str:
+        return f'RandomPolicy({self._seed})'
+
+
+def apply_move(model: Model, move: str) -> bool:
+    """ Applies a move as entered in MazeRunner: a direction, or 'i' followed
+        by the name of an item to use.
+
+    Parameters:
+        model: The game to apply the move to.
+        move: The move to apply.
+
+    Returns:
+        True iff move was a valid move. Using an item the player does not
+        have is valid, but has no effect.
+    """
+    if move in MOVE_DELTAS:
+        model.move_player(MOVE_DELTAS[move])
+    elif len(move) > 1 and move.split()[0] == 'i':
+        model.use_item(move.partition(' ')[-1])
+    else:
+        return False
+    return True
+
+
+def simulate(
+    game_file: str,
+    moves: Union[Iterable[str], Policy],
+    max_steps: int = MAX_STEPS,
+    record_steps: bool = True,
+) -> GameResult:
+    """ Plays a game until it is won or lost, the moves run out, or max_steps
+        moves have been made.
+
+    Parameters:
+        game_file: Path to the file from which the game levels are loaded.
+        moves: The moves to make, or a policy that chooses each move. Invalid
+               moves are skipped, but count towards max_steps.
+        max_steps: The most moves to make.
+        record_steps: Record the state after every move in the result.
+    """
+    model = Model(game_file)
+    # Nothing draws the game, so there is no need to keep what changed
+    model.subscribe(lambda changes: None)
+    if callable(moves):
+        next_move = partial(moves, model)
+    else:
+        next_move = partial(next, iter(moves), None)
+
+    steps = [] if record_steps else None
+    num_steps = 0
+    player = model.get_player()
+    for _ in range(max_steps):
+        if model.has_won() or model.has_lost():
+            break
+        move = next_move()
+        if move is None:
+            break
+        if not apply_move(model, move):
+            continue
+        num_steps += 1
+        if record_steps:
+            steps.append((move, model.get_level_num(), player.get_position(),
+                          model.get_player_stats()))
+    return GameResult(game_file, model, num_steps, steps)
+
+
+def run_batch(
+    games: Iterable[tuple[str, Union[Sequence[str], Policy]]],
+    workers: Optional[int] = None,
+    max_steps: int = MAX_STEPS,
+    record_steps: bool = False,
+) -> list[GameResult]:
+    """ Simulates games in a pool of processes, returning their results in
+        the same order.
+
+    Parameters:
+        games: (game file, moves or policy) of each game. The moves and
+               policies are sent to other processes, so must be picklable,
+               e.g. a string or list of moves or a RandomPolicy.
+        workers: The number of processes. Defaults to the number of CPUs.
+        max_steps: The most moves to make in each game.
+        record_steps: Record the state after every move in each result.
+    """
+    games = list(games)
+    if not games:
+        return []
+    workers = workers or os.cpu_count() or 1
+    game_files, moves = zip(*games)
+    play = partial(simulate, max_steps=max_steps, record_steps=record_steps)
+    with ProcessPoolExecutor(workers) as executor:
+        # Send games in chunks, so each process is sent a few large batches
+        chunksize = max(1, len(games) // (4 * workers))
+        return list(executor.map(play, game_files, moves, chunksize=chunksize))
+
+
+def benchmark(
+    games_per_file: int = 200,
+    max_steps: int = 500,
+    workers: Optional[int] = None,
+) -> None:
+    """ Prints the games and steps per second simulated with random policies,
+        in this process and across a process pool, on the games in games/ and
+        on generated levels.
+
+    Parameters:
+        games_per_file: The number of games played on each game file.
+        max_steps: The most moves to make in each game.
+        workers: The number of processes. Defaults to the number of CPUs.
+    """
+    generated = [('generated_small.txt', (21, 21)), ('generated_large.txt', (101, 101))]
+    for filename, dimensions in generated:
+        generate_game(filename, 3, dimensions)
+    try:
+        game_files = sorted(glob.glob(os.path.join('games', '*.txt')))
+        game_files += [filename for filename, _ in generated]
+        for game_file in game_files:
+            games = [(game_file, RandomPolicy(seed)) for seed in range(games_per_file)]
+
+            start = perf_counter()
+            results = [simulate(*game, max_steps, record_steps=False) for game in games]
+            serial = perf_counter() - start
+
+            start = perf_counter()
+            run_batch(games, workers, max_steps)
+            pooled = perf_counter() - start
+
+            num_steps = sum(result.get_num_steps() for result in results)
+            num_won = sum(result.has_won() for result in results)
+            num_lost = sum(result.has_lost() for result in results)
+            print(f'{game_file}: {num_won} won, {num_lost} lost, '
+                  f'{num_steps / len(games):.0f} steps per game')
+            for name, elapsed in (('serial', serial), ('pool', pooled)):
+                print(f'    {name:>6}: {len(games) / elapsed:8.0f} games/s, '
+                      f'{num_steps / elapsed:9.0f} steps/s')
+    finally:
+        for filename, _ in generated:
+            os.remove(filename)
+
+
+if __name__ == '__main__':
+    benchmark()
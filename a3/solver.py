@@ -0,0 +1,518 @@
+"""
+Shortest routes through MazeRunner levels: collect every coin, then leave
+through a door.
+
+LevelSolver runs a shortest path search over the tiles from the player, each
+coin and each supply (food, water and potions), and keeps the results. The
+order to collect the coins in is found exactly with a dynamic program over
+subsets of coins when there are few, or with a nearest neighbour tour
+improved by 2-opt otherwise. The route is then walked with the player's
+stats, using items before hunger, thirst or HP would end the game, and
+detouring to the cheapest supply when none is held.
+
+Moving onto lava costs the HP it takes, scaled by a weight, so routes avoid
+lava unless going around it costs more.
+
+Run this file to solve every level in games/:
+    python solver.py
+"""
+
+from __future__ import annotations
+import copy
+import glob
+import os
+from heapq import heappop, heappush
+from time import perf_counter
+from typing import Optional
+
+from a2_solution import *
+
+DP_COIN_LIMIT = 10  # Most coins ordered exactly; more are ordered heuristically
+INFINITY = float('inf')
+# The items that can save the player, by the stat they restore
+THIRST_ITEMS = (WATER,)
+HUNGER_ITEMS = (APPLE, HONEY)
+HEALTH_ITEMS = (POTION,)
+SUPPLY_IDS = THIRST_ITEMS + HUNGER_ITEMS + HEALTH_ITEMS
+MOVES = {delta: move for move, delta in MOVE_DELTAS.items()}
+
+
+class Plan:
+    """ The moves that take the player from a position through a level. """
+    def __init__(
+        self,
+        moves: list[str],
+        route: list[tuple[int, int]],
+        feasible: bool,
+        player_stats: tuple[int, int, int],
+        num_moves: int,
+    ) -> None:
+        """ Records a plan.
+
+        Parameters:
+            moves: The moves to enter, as in MazeRunner, e.g. 'w' or 'i Water'.
+            route: The positions of the coins, supplies and door visited, in
+                   order.
+            feasible: True iff the moves finish the level without losing.
+            player_stats: The (HP, hunger, thirst) after the moves.
+            num_moves: The number of steps taken through the maze.
+        """
+        self._moves = moves
+        self._route = route
+        self._feasible = feasible
+        self._player_stats = player_stats
+        self._num_moves = num_moves
+
+    def get_moves(self) -> list[str]:
+        """ Returns the moves to enter, including items to use. """
+        return self._moves
+
+    def get_route(self) -> list[tuple[int, int]]:
+        """ Returns the coins, supplies and door visited, in order. """
+        return self._route
+
+    def is_feasible(self) -> bool:
+        """ Returns True iff the moves finish the level without losing. """
+        return self._feasible
+
+    def get_player_stats(self) -> tuple[int, int, int]:
+        """ Returns the player's (HP, hunger, thirst) after the moves. """
+        return self._player_stats
+
+    def get_num_moves(self) -> int:
+        """ Returns the number of steps taken through the maze. """
+        return self._num_moves
+
+    def __repr__(self) -> str:
+        return (f'Plan({len(self._moves)} moves, feasible={self._feasible}, '
+                f'stats={self._player_stats})')
+
+
+class LevelSolver:
+    """ Plans routes through a level, reusing the shortest path searches from
+        each position between plans.
+    """
+    def __init__(self, level: Level, lava_weight: float = 1.0) -> None:
+        """ Sets up a solver for the level's maze.
+
+        Parameters:
+            level: The level to solve.
+            lava_weight: How many steps each HP lost to lava is worth avoiding.
+                         0 finds the routes with the fewest moves.
+        """
+        maze = level.get_maze()
+        self._level = level
+        self._num_rows, self._num_cols = maze.get_dimensions()
+        tiles = str(maze).replace('\n', '')
+        lava_cost = 1 + lava_weight * LAVA_DAMAGE
+        self._open = [tile != WALL for tile in tiles]
+        self._costs = [lava_cost if tile == LAVA else 1 for tile in tiles]
+        self._damage = [LAVA_DAMAGE if tile == LAVA else 0 for tile in tiles]
+        # Doors are locked until the last coin is collected, so paths can end
+        # on a door but never pass through one
+        self._doors = [row * self._num_cols + col for row, col in maze.get_door_positions()]
+        self._searches = {}  # Maps cells to (cost to each cell, previous cell)
+
+    def get_level(self) -> Level:
+        """ Returns the level being solved. """
+        return self._level
+
+    def get_distance(self, source: tuple[int, int], target: tuple[int, int]) -> float:
+        """ Returns the cost of the cheapest path between two positions, which
+            is infinite if target cannot be reached.
+        """
+        costs, _ = self._search(self._cell(source))
+        return costs[self._cell(target)]
+
+    def get_path(
+        self,
+        source: tuple[int, int],
+        target: tuple[int, int],
+    ) -> Optional[list[tuple[int, int]]]:
+        """ Returns the positions along the cheapest path from source to
+            target, excluding source, or None if target cannot be reached.
+        """
+        source_cell, cell = self._cell(source), self._cell(target)
+        costs, previous = self._search(source_cell)
+        if costs[cell] == INFINITY:
+            return None
+        path = []
+        while cell != source_cell:
+            path.append(divmod(cell, self._num_cols))
+            cell = previous[cell]
+        path.reverse()
+        return path
+
+    def solve(
+        self,
+        start: Optional[tuple[int, int]] = None,
+        player_stats: tuple[int, int, int] = (MAX_HEALTH, 0, 0),
+        inventory: Optional[Inventory] = None,
+        num_moves: int = 0,
+    ) -> Plan:
+        """ Plans the moves that collect the coins left in the level and leave
+            through a door.
+
+        Parameters:
+            start: The player's position. Defaults to the level's start.
+            player_stats: The player's (HP, hunger, thirst).
+            inventory: The player's inventory. Defaults to an empty one.
+            num_moves: The moves made so far in the game, since hunger and
+                       thirst increase every fifth move.
+        """
+        if start is None:
+            start = self._level.get_player_start()
+        items = self._level.get_items()
+        coins = [position for position, item in items.items() if item.get_id() == COIN]
+        pending = self._order_coins(start, coins)
+        route = list(pending)
+
+        player = Player(start)
+        health, hunger, thirst = player_stats
+        player.change_health(health - MAX_HEALTH)
+        player.change_hunger(hunger)
+        player.change_thirst(thirst)
+        if inventory is not None:
+            for item_list in inventory.get_items().values():
+                for item in item_list:
+                    player.add_item(item)
+
+        moves, collected, position = [], set(), start
+        start_moves = num_moves
+        tried = set()  # Supplies that did not help with the current leg
+        feasible = bool(pending)
+        while pending:
+            target = pending[0]
+            if target in collected:
+                pending.pop(0)
+                continue
+            path = self.get_path(position, target)
+            if path is None:
+                feasible = False
+                break
+
+            state = copy.deepcopy((player, num_moves, collected))
+            leg_moves = []
+            num_moves, survived = self._walk(
+                position, path, player, num_moves, collected, items, leg_moves)
+            if survived:
+                moves.extend(leg_moves)
+                position = pending.pop(0)
+                tried = set()
+                continue
+
+            # Go back and fetch the cheapest supply on the way instead
+            supply = self._choose_supply(position, target, items, state[2] | tried)
+            if supply is None:
+                # Keep the moves up to the loss, so the plan shows how far it gets
+                moves.extend(leg_moves)
+                feasible = False
+                break
+            player, num_moves, collected = state
+            tried.add(supply)
+            pending.insert(0, supply)
+            route.insert(route.index(target), supply)
+
+        if feasible:
+            row, col = position
+            for (drow, dcol), move in MOVES.items():
+                if not (0 <= row + drow < self._num_rows and 0 <= col + dcol < self._num_cols):
+                    moves.append(move)
+                    break
+        stats = player.get_health(), player.get_hunger(), player.get_thirst()
+        return Plan(moves, route, feasible, stats, num_moves - start_moves)
+
+    def _cell(self, position: tuple[int, int]) -> int:
+        """ Returns the index of position in the flattened grid. """
+        return position[0] * self._num_cols + position[1]
+
+    def _search(self, source: int) -> tuple[list[float], list[int]]:
+        """ Returns the cost of the cheapest path from source to every cell,
+            and the cell before each on that path.
+        """
+        search = self._searches.get(source)
+        if search is not None:
+            return search
+
+        num_rows, num_cols = self._num_rows, self._num_cols
+        is_open, step_costs, doors = self._open, self._costs, set(self._doors)
+        costs = [INFINITY] * (num_rows * num_cols)
+        previous = [-1] * (num_rows * num_cols)
+        costs[source] = 0
+        queue = [(0, source)]
+        while queue:
+            cost, cell = heappop(queue)
+            if cost > costs[cell] or (cell in doors and cell != source):
+                continue
+            row, col = divmod(cell, num_cols)
+            for neighbour, inside in (
+                (cell - num_cols, row > 0),
+                (cell + num_cols, row < num_rows - 1),
+                (cell - 1, col > 0),
+                (cell + 1, col < num_cols - 1),
+            ):
+                if inside and is_open[neighbour]:
+                    new_cost = cost + step_costs[neighbour]
+                    if new_cost < costs[neighbour]:
+                        costs[neighbour] = new_cost
+                        previous[neighbour] = cell
+                        heappush(queue, (new_cost, neighbour))
+        search = self._searches[source] = costs, previous
+        return search
+
+    def _order_coins(
+        self,
+        start: tuple[int, int],
+        coins: list[tuple[int, int]],
+    ) -> list[tuple[int, int]]:
+        """ Returns the coins in the order to collect them, followed by the
+            door to leave through. Returns an empty list if no door can be
+            reached.
+        """
+        doors = [divmod(door, self._num_cols) for door in self._doors]
+        points = [start] + coins
+        # The cost between each pair of points, and to the nearest door
+        distances = [[self.get_distance(point, coin) for coin in coins] for point in points]
+        exits = []
+        for point in points:
+            costs = [(self.get_distance(point, door), door) for door in doors]
+            exits.append(min(costs, default=(INFINITY, None)))
+
+        if len(coins) <= DP_COIN_LIMIT:
+            order = _order_exactly(distances, exits)
+        else:
+            order = _order_heuristically(distances, exits)
+        points = [0] + [coin + 1 for coin in order]
+        cost = exits[points[-1]][0]
+        for point, coin in zip(points, order):
+            cost += distances[point][coin]
+        if cost == INFINITY:
+            return []
+        return [coins[coin] for coin in order] + [exits[points[-1]][1]]
+
+    def _walk(
+        self,
+        position: tuple[int, int],
+        path: list[tuple[int, int]],
+        player: Player,
+        num_moves: int,
+        collected: set[tuple[int, int]],
+        items: dict[tuple[int, int], Item],
+        moves: list[str],
+    ) -> tuple[int, bool]:
+        """ Walks the player along path as Model would, adding each move and
+            any item used to survive it to moves.
+
+        Returns:
+            The number of moves made, and whether the player survived.
+        """
+        for new_position in path:
+            damage = self._damage[self._cell(new_position)]
+            if not _use_items(player, num_moves, damage, moves):
+                return num_moves, False
+            num_moves += 1
+            if num_moves % 5 == 0:
+                player.change_hunger(1)
+                player.change_thirst(1)
+            player.change_health(-1 - damage)
+            moves.append(MOVES[new_position[0] - position[0], new_position[1] - position[1]])
+            position = new_position
+
+            item = items.get(position)
+            if item is not None and position not in collected:
+                collected.add(position)
+                player.add_item(item)
+        return num_moves, True
+
+    def _choose_supply(
+        self,
+        position: tuple[int, int],
+        target: tuple[int, int],
+        items: dict[tuple[int, int], Item],
+        excluded: set[tuple[int, int]],
+    ) -> Optional[tuple[int, int]]:
+        """ Returns the supply that adds the least to the cost of getting from
+            position to target, or None if none can be reached.
+        """
+        best, best_cost = None, INFINITY
+        for supply, item in items.items():
+            if item.get_id() in SUPPLY_IDS and supply not in excluded:
+                cost = self.get_distance(position, supply) + self.get_distance(supply, target)
+                if cost < best_cost:
+                    best, best_cost = supply, cost
+        return best
+
+
+def _order_exactly(distances: list[list[float]], exits: list[tuple[float, tuple]]) -> list[int]:
+    """ Returns the cheapest order to visit every coin from the start and then
+        leave, found by a dynamic program over the subsets of coins visited.
+
+    Parameters:
+        distances: distances[i][j] is the cost from point i to coin j, where
+                   point 0 is the start and point j + 1 is coin j.
+        exits: The (cost, door) of the nearest door from each point.
+    """
+    num_coins = len(distances[0]) if distances else 0
+    if num_coins == 0:
+        return []
+    full = (1 << num_coins) - 1
+    # best[subset][coin] is the cheapest cost to visit subset, ending at coin
+    best = [[INFINITY] * num_coins for _ in range(full + 1)]
+    previous = [[-1] * num_coins for _ in range(full + 1)]
+    for coin in range(num_coins):
+        best[1 << coin][coin] = distances[0][coin]
+    for subset in range(1, full + 1):
+        subset_costs = best[subset]
+        for last in range(num_coins):
+            cost = subset_costs[last]
+            if cost == INFINITY:
+                continue
+            from_last = distances[last + 1]
+            for coin in range(num_coins):
+                bit = 1 << coin
+                if subset & bit:
+                    continue
+                new_cost = cost + from_last[coin]
+                if new_cost < best[subset | bit][coin]:
+                    best[subset | bit][coin] = new_cost
+                    previous[subset | bit][coin] = last
+
+    last = min(range(num_coins), key=lambda coin: best[full][coin] + exits[coin + 1][0])
+    order, subset = [], full
+    while last != -1:
+        order.append(last)
+        last, subset = previous[subset][last], subset & ~(1 << last)
+    order.reverse()
+    return order
+
+
+def _order_heuristically(distances: list[list[float]], exits: list[tuple[float, tuple]]) -> list[int]:
+    """ Returns a cheap order to visit every coin from the start and then
+        leave: a nearest neighbour tour improved by reversing segments (2-opt)
+        until no reversal helps.
+
+    Parameters:
+        distances: distances[i][j] is the cost from point i to coin j, where
+                   point 0 is the start and point j + 1 is coin j.
+        exits: The (cost, door) of the nearest door from each point.
+    """
+    num_coins = len(distances[0])
+    remaining, order, point = set(range(num_coins)), [], 0
+    while remaining:
+        coin = min(remaining, key=lambda coin: distances[point][coin])
+        remaining.remove(coin)
+        order.append(coin)
+        point = coin + 1
+
+    def cost(source: int, coin: Optional[int]) -> float:
+        """ The cost from a point to a coin, or to the nearest door. """
+        return exits[source][0] if coin is None else distances[source][coin]
+
+    improved = True
+    while improved:
+        improved = False
+        # Costs along the tour, forwards and backwards, so a reversed segment
+        # can be costed in constant time even where costs are not symmetric
+        forwards, backwards = [0], [0]
+        for coin, next_coin in zip(order, order[1:]):
+            forwards.append(forwards[-1] + distances[coin + 1][next_coin])
+            backwards.append(backwards[-1] + distances[next_coin + 1][coin])
+        for first in range(num_coins - 1):
+            before = order[first - 1] + 1 if first else 0
+            for last in range(first + 1, num_coins):
+                after = order[last + 1] if last + 1 < num_coins else None
+                old = (cost(before, order[first]) + forwards[last] - forwards[first]
+                       + cost(order[last] + 1, after))
+                new = (cost(before, order[last]) + backwards[last] - backwards[first]
+                       + cost(order[first] + 1, after))
+                if new < old - 1e-9:
+                    order[first:last + 1] = reversed(order[first:last + 1])
+                    improved = True
+                    break
+            if improved:
+                break
+    return order
+
+
+def _use_items(player: Player, num_moves: int, damage: int, moves: list[str]) -> bool:
+    """ Uses items from the player's inventory until the next move, onto a
+        tile doing damage, would not lose the game, adding each item used to
+        moves.
+
+    Returns:
+        True iff the player survives the next move.
+    """
+    tick = (num_moves + 1) % 5 == 0
+    while True:
+        if player.get_thirst() + tick >= MAX_THIRST:
+            choices = THIRST_ITEMS
+        elif player.get_hunger() + tick >= MAX_HUNGER:
+            choices = HUNGER_ITEMS
+        elif player.get_health() - 1 - damage <= 0:
+            choices = HEALTH_ITEMS
+        else:
+            return True
+
+        inventory = player.get_inventory().get_items()
+        name = next(
+            (name for item_id in choices for name, items in inventory.items()
+             if items and items[0].get_id() == item_id),
+            None,
+        )
+        if name is None:
+            return False
+        player.get_inventory().remove_item(name).apply(player)
+        moves.append(f'i {name}')
+
+
+def hint_next_move(model: Model, solver: Optional[LevelSolver] = None) -> Optional[str]:
+    """ Returns the next move of the best plan from the current state of the
+        game, or None if the level cannot be finished.
+
+    Parameters:
+        model: The game to give a hint for.
+        solver: A solver to reuse between hints. It is only used if it is
+                solving the current level.
+    """
+    level = model.get_level()
+    if solver is None or solver.get_level() is not level:
+        solver = LevelSolver(level)
+    player = model.get_player()
+    plan = solver.solve(player.get_position(), model.get_player_stats(),
+                        player.get_inventory(), model.get_num_moves())
+    if not plan.is_feasible() or not plan.get_moves():
+        return None
+    return plan.get_moves()[0]
+
+
+def benchmark() -> None:
+    """ Solves every level in games/, prints how long each took, and checks
+        the plan by playing it on the game.
+    """
+    for game_file in sorted(glob.glob(os.path.join('games', '*.txt'))):
+        model = Model(game_file)
+        while not model.has_won() and not model.has_lost():
+            level_num = model.get_level_num()
+            start = perf_counter()
+            player = model.get_player()
+            plan = LevelSolver(model.get_level()).solve(
+                player.get_position(), model.get_player_stats(),
+                player.get_inventory(), model.get_num_moves())
+            elapsed = perf_counter() - start
+            for move in plan.get_moves():
+                if move in MOVE_DELTAS:
+                    model.move_player(MOVE_DELTAS[move])
+                else:
+                    model.use_item(move.partition(' ')[-1])
+            outcome = ('won' if model.has_won() else 'lost' if model.has_lost()
+                       else 'next level' if model.get_level_num() != level_num
+                       else 'stuck')
+            print(f'{game_file} level {level_num + 1}: {1000 * elapsed:7.2f}ms, '
+                  f'{plan.get_num_moves()} steps, feasible={plan.is_feasible()}, '
+                  f'played: {outcome}')
+            if model.get_level_num() == level_num:
+                break
+
+
+if __name__ == '__main__':
+    benchmark()